@@ -1,21 +1,90 @@
+import bisect
 import csv
+import hashlib
 import heapq
+import json
+import math
+import mmap
+import multiprocessing
 import os
-from queue import PriorityQueue
 import sys
 import random
-from collections import defaultdict
+import re
+import tempfile
+import threading
+import unicodedata
+import weakref
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from collections.abc import Mapping
+from itertools import count, islice
+from typing import NamedTuple
 
 import geopy.distance
-import copy
+import numpy as np
 
 AIRCRAFT_SPEED = 860
 PASSENGER_SIZE_747 = 440
-random.seed(50)
+# seed for the random fares and waiting times drawn by parse_routes
+ROUTE_SEED = 50
 KM_TO_MILE = 0.621371
 
+# route distance modes, see routeDistances()
+DISTANCE_HAVERSINE = "HAVERSINE"
+DISTANCE_ELLIPSOIDAL = "ELLIPSOIDAL"
+EARTH_RADIUS_KM = 6371.009  # mean radius, same as geopy.distance.great_circle
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = (1 - WGS84_F) * WGS84_A
+# defaults for getNearestAirport / getAlternativePath
+NEAREST_AIRPORT_COUNT = 3
+NEAREST_AIRPORT_RADIUS_KM = 100
+# routes listed by getKShortestPaths unless told otherwise
+POSSIBLE_ROUTE_COUNT = 5
+# memory budget for the shortest-path trees Dijkstra keeps per source airport
+SHORTEST_PATH_TREE_CACHE_BYTES = 64 * 1024 * 1024
+# bounds of the route cache shared by all engines; weights closer than
+# ROUTE_CACHE_WEIGHT_STEP share an entry
+ROUTE_CACHE_ENTRIES = 4096
+ROUTE_CACHE_BYTES = 16 * 1024 * 1024
+ROUTE_CACHE_WEIGHT_STEP = 1e-6
+# timetable defaults; schedule times are minutes from 00:00 UTC on the first day
+MINUTES_PER_DAY = 24 * 60
+TIMETABLE_DAYS = 2  # the daily pattern is repeated so overnight journeys find next-day flights
+TIMETABLE_SEED = 50
+TIMETABLE_BLOCK_MINUTES = 30  # taxi, climb and descent on top of the cruise time
+MIN_CONNECTION_MINUTES = 45
+# combined edge weight arrays kept per graph, one per recent SearchParameter
+EDGE_WEIGHT_CACHE_ENTRIES = 4
+# Pareto fronts kept by ParetoSearch, one per recent (src, dst, airlines)
+PARETO_FRONT_CACHE_ENTRIES = 1024
+# sources handed to a worker at a time by getDistanceMatrix
+MATRIX_CHUNKS_PER_PROCESS = 4
+# airports returned per searchAirports() call, e.g. per autocomplete keystroke
+AIRPORT_SEARCH_LIMIT = 10
+
+# Alliance members by IATA code, for FlightPathing.airlineFilter(alliances=...).
+# airlines.dat has no alliance column; this is the membership as of 2024.
+AIRLINE_ALLIANCES = {
+    "Star Alliance": frozenset({"A3", "AC", "CA", "AI", "NZ", "NH", "OZ", "OS", "AV", "SN", "CM", "OU", "MS", "ET",
+                                "BR", "LO", "LH", "SK", "ZH", "SQ", "SA", "LX", "TP", "TG", "TK", "UA"}),
+    "oneworld": frozenset({"AS", "AA", "BA", "CX", "AY", "IB", "JL", "MH", "QF", "QR", "AT", "RJ", "UL"}),
+    "SkyTeam": frozenset({"AR", "AM", "UX", "AF", "CI", "MU", "OK", "DL", "GA", "KQ", "KL", "KE", "ME", "SV", "RO",
+                          "VN", "VS", "MF"}),
+}
+
+# relative drift of the live medians that makes route updates renormalise every
+# edge weight (and drop every cache built on them); 0 renormalises on any change
+MEDIAN_REFRESH_TOLERANCE = 0.01
+
 
 class Airport:
+    # Stand-alone airport record, e.g. for FlightPathing.addAirport(). Loaded
+    # airports live in an AirportTable and are handed out as AirportView.
+    __slots__ = ("airportId", "name", "city", "country", "IATA", "ICAO", "latitude", "longitude", "altitude",
+                 "timezone", "DST", "type", "source")
 
     def __init__(self, airportId, name, city, country, IATA, ICAO, latitude, longitude, altitude, timezone, DST, type,
                  source):
@@ -37,6 +106,338 @@ class Airport:
         return f"\nairportId: {self.airportId}\nname: {self.name}\ncity: {self.city}\ncountry: {self.country}\nIATA: {self.IATA}\nICAO: {self.ICAO}\nlatitude: {self.latitude}\nlongitude: {self.longitude}\naltitude: {self.altitude}\ntimezone: {self.timezone}\nDST: {self.DST}\ntype: {self.type}"
 
 
+class AirportTable:
+    # Columnar airport store: a NumPy array per numeric field and a list of
+    # interned strings per text field, so an airport costs one row rather than
+    # one object. Text that repeats across airports (INTERNED_FIELDS) is stored
+    # once. Row r is the airport at graph index r. A removed airport keeps its
+    # row, marked dead, so rows never shift. Ids, IATA and ICAO codes have
+    # hash indexes; names repeat in OpenFlights, so the name index keeps every
+    # row with that name, in load order.
+    FLOAT_FIELDS = ("latitude", "longitude", "altitude", "timezone")
+    STRING_FIELDS = ("name", "city", "country", "IATA", "ICAO", "DST", "type", "source")
+    INTERNED_FIELDS = ("city", "country", "DST", "type", "source")
+
+    def __init__(self, airportIds=(), columns: dict = None):
+        columns = columns or {}
+        self.ids = np.asarray(airportIds, dtype=np.int64)
+        for field in self.FLOAT_FIELDS:
+            setattr(self, field, np.asarray(columns.get(field, ()), dtype=np.float64))
+        for field in self.STRING_FIELDS:
+            values = columns.get(field, ())
+            setattr(self, field, [sys.intern(value) for value in values] if field in self.INTERNED_FIELDS
+                    else list(values))
+        self.alive = np.ones(len(self.ids), dtype=bool)
+        self.idToRow = {}
+        self.iataToRow = {}
+        self.icaoToRow = {}
+        self.nameToRows = {}  # name -> tuple of rows
+        for row in range(len(self.ids)):
+            self._index(row)
+
+    def _index(self, row: int):
+        self.idToRow[int(self.ids[row])] = row
+        if self.IATA[row] not in ("", "\\N"):
+            self.iataToRow.setdefault(self.IATA[row], row)
+        if self.ICAO[row] not in ("", "\\N"):
+            self.icaoToRow.setdefault(self.ICAO[row], row)
+        self.nameToRows[self.name[row]] = self.nameToRows.get(self.name[row], ()) + (row,)
+
+    def __len__(self) -> int:
+        return len(self.idToRow)
+
+    def __contains__(self, airportId) -> bool:
+        return airportId in self.idToRow
+
+    def __iter__(self):
+        # AirportView of every live airport, in row order
+        return (AirportView(self, row) for row in self.liveRows().tolist())
+
+    def liveRows(self) -> np.ndarray:
+        return np.flatnonzero(self.alive)
+
+    def get(self, airportId: int) -> "AirportView":
+        row = self.idToRow.get(airportId)
+        return AirportView(self, row) if row is not None else None
+
+    def byIata(self, code: str) -> "AirportView":
+        row = self.iataToRow.get(code)
+        return AirportView(self, row) if row is not None else None
+
+    def byIcao(self, code: str) -> "AirportView":
+        row = self.icaoToRow.get(code)
+        return AirportView(self, row) if row is not None else None
+
+    def byCode(self, code: str) -> "AirportView":
+        # IATA codes are three letters and ICAO codes four, so one lookup each way is unambiguous
+        return self.byIata(code) or self.byIcao(code)
+
+    def byName(self, name: str) -> list["AirportView"]:
+        return [AirportView(self, row) for row in self.nameToRows.get(name, ())]
+
+    def append(self, airport: Airport) -> int:
+        # adds the airport as a new row and returns it
+        row = len(self.ids)
+        self.ids = np.append(self.ids, airport.airportId)
+        for field in self.FLOAT_FIELDS:
+            setattr(self, field, np.append(getattr(self, field), float(getattr(airport, field))))
+        for field in self.STRING_FIELDS:
+            value = getattr(airport, field)
+            getattr(self, field).append(sys.intern(value) if field in self.INTERNED_FIELDS else value)
+        self.alive = np.append(self.alive, True)
+        self._index(row)
+        return row
+
+    def remove(self, airportId: int):
+        row = self.idToRow.pop(airportId)
+        self.alive[row] = False
+        for index, code in ((self.iataToRow, self.IATA[row]), (self.icaoToRow, self.ICAO[row])):
+            if index.get(code) == row:
+                del index[code]
+        rows = tuple(other for other in self.nameToRows[self.name[row]] if other != row)
+        if rows:
+            self.nameToRows[self.name[row]] = rows
+        else:
+            del self.nameToRows[self.name[row]]
+
+
+class AirportView:
+    # Read-only Airport backed by one AirportTable row; two slots, no __dict__
+    __slots__ = ("table", "row")
+
+    def __init__(self, table: AirportTable, row: int):
+        self.table = table
+        self.row = row
+
+    @property
+    def airportId(self) -> int:
+        return int(self.table.ids[self.row])
+
+    def __getattr__(self, field: str):
+        if field in AirportTable.FLOAT_FIELDS:
+            return float(getattr(self.table, field)[self.row])
+        if field in AirportTable.STRING_FIELDS:
+            return getattr(self.table, field)[self.row]
+        raise AttributeError(field)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, AirportView) and self.table is other.table and self.row == other.row
+
+    def __hash__(self) -> int:
+        return hash((id(self.table), self.row))
+
+    __repr__ = Airport.__repr__
+
+
+class AirportIdMapView(Mapping):
+    # Read-only view of an AirportTable shaped like the old idToAirportMap (id -> airport)
+
+    def __init__(self, table: AirportTable):
+        self.table = table
+
+    def __getitem__(self, airportId: int) -> AirportView:
+        airport = self.table.get(airportId)
+        if airport is None:
+            raise KeyError(airportId)
+        return airport
+
+    def __contains__(self, airportId) -> bool:
+        return airportId in self.table
+
+    def __iter__(self):
+        return iter(self.table.idToRow)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+
+class AirportNameMapView(Mapping):
+    # Read-only view shaped like the old airportToIdMap (name -> airport). When
+    # several airports share a name this gives the last one loaded, as the
+    # old dict did; AirportTable.byName() returns all of them.
+
+    def __init__(self, table: AirportTable):
+        self.table = table
+
+    def __getitem__(self, name: str) -> AirportView:
+        rows = self.table.nameToRows.get(name)
+        if not rows:
+            raise KeyError(name)
+        return AirportView(self.table, rows[-1])
+
+    def __contains__(self, name) -> bool:
+        return name in self.table.nameToRows
+
+    def __iter__(self):
+        return iter(self.table.nameToRows)
+
+    def __len__(self) -> int:
+        return len(self.table.nameToRows)
+
+
+class AirlineTable:
+    # Columnar airlines.dat: row r is one airline. Routes name their airline by
+    # OpenFlights id or by code; a code with no row of its own (or no
+    # airlines.dat at all) gets a row holding just that code. Many defunct
+    # airlines share an IATA code with an active one, so the code index
+    # prefers the active airline.
+    STRING_FIELDS = ("name", "IATA", "ICAO", "country")
+
+    def __init__(self, airlineIds=(), columns: dict = None):
+        columns = columns or {}
+        self.ids = np.asarray(airlineIds, dtype=np.int32)
+        self.name = list(columns.get("name", ()))
+        self.IATA = [sys.intern(code) for code in columns.get("IATA", ())]
+        self.ICAO = [sys.intern(code) for code in columns.get("ICAO", ())]
+        self.country = [sys.intern(country) for country in columns.get("country", ())]
+        self.active = np.asarray(columns.get("active", ()), dtype=bool)
+        self.idToRow = {}
+        self.codeToRow = {}
+        for row in range(len(self.ids)):
+            self._index(row)
+
+    def _index(self, row: int):
+        self.idToRow[int(self.ids[row])] = row
+        for code in (self.IATA[row], self.ICAO[row]):
+            if code in ("", "-", "\\N", "N/A"):
+                continue
+            other = self.codeToRow.get(code)
+            if other is None or (self.active[row] and not self.active[other]):
+                self.codeToRow[code] = row
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def find(self, airline) -> int:
+        # row of an airline given by OpenFlights id (int) or IATA / ICAO code, or None
+        if isinstance(airline, (int, np.integer)):
+            return self.idToRow.get(int(airline))
+        return self.codeToRow.get(airline)
+
+    def rowForRoute(self, code: str, airlineId: str) -> int:
+        # the airline of a routes.dat row, added by code if the table lacks it
+        if airlineId.isdigit():
+            row = self.idToRow.get(int(airlineId))
+            if row is not None:
+                return row
+        row = self.codeToRow.get(code)
+        if row is None:
+            row = len(self.ids)
+            newId = min(int(self.ids.min(initial=0)), 0) - 1  # OpenFlights ids are positive, -1 is "Unknown"
+            self.ids = np.append(self.ids, np.int32(newId))
+            self.name.append(code)
+            self.IATA.append(sys.intern(code if len(code) == 2 else ""))
+            self.ICAO.append(sys.intern(code if len(code) == 3 else ""))
+            self.country.append("")
+            self.active = np.append(self.active, True)  # it flies a listed route
+            self._index(row)
+            self.codeToRow.setdefault(code, row)
+        return row
+
+    def code(self, row: int) -> str:
+        return self.IATA[row] or self.ICAO[row]
+
+
+class AirlineFilter:
+    # Set of allowed airlines, one flag per AirlineTable row, built by
+    # FlightPathing.airlineFilter(). Carried on SearchParameter.airlines; equal
+    # filters compare and hash equal, so they share cached weights and routes.
+
+    def __init__(self, allowed: np.ndarray):
+        self.allowed = np.asarray(allowed, dtype=bool)
+        self.allowed.flags.writeable = False
+        self.key = np.packbits(self.allowed).tobytes()
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, AirlineFilter) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"AirlineFilter({int(self.allowed.sum())} of {len(self.allowed)} airlines)"
+
+
+class RouteCarriers:
+    # The parallel per-airline routes behind each edge of a RouteGraph: the
+    # carriers of edge position e are rows offsets[e]:offsets[e + 1], each with
+    # its airline row, codeshare flag, stops and equipment. Cost and time stay
+    # per edge, so a filter only decides which edges may be used.
+
+    def __init__(self, offsets, airline, codeshare, stops, equipment: list[str]):
+        self.offsets = np.asarray(offsets, dtype=np.int32)
+        self.airline = np.asarray(airline, dtype=np.int32)
+        self.codeshare = np.asarray(codeshare, dtype=bool)
+        self.stops = np.asarray(stops, dtype=np.int8)
+        self.equipment = equipment
+        self._edges = None  # edge position of every carrier row, built on first use
+
+    def permuted(self, order: np.ndarray) -> "RouteCarriers":
+        # carriers for the edges reordered so that new edge i is old edge order[i]
+        sizes = np.diff(self.offsets)[order]
+        offsets = np.zeros(len(order) + 1, dtype=np.int32)
+        np.cumsum(sizes, out=offsets[1:])
+        rows = np.repeat(self.offsets[:-1][order] - offsets[:-1], sizes) + np.arange(offsets[-1], dtype=np.int32)
+        return RouteCarriers(offsets, self.airline[rows], self.codeshare[rows], self.stops[rows],
+                             [self.equipment[row] for row in rows.tolist()])
+
+    def rowEdges(self) -> np.ndarray:
+        # edge position of every carrier row
+        if self._edges is None:
+            self._edges = np.repeat(np.arange(len(self.offsets) - 1, dtype=np.int32), np.diff(self.offsets))
+        return self._edges
+
+    def edgeMask(self, airlineFilter: AirlineFilter) -> np.ndarray:
+        # true for every edge that at least one allowed airline flies
+        mask = np.zeros(len(self.offsets) - 1, dtype=bool)
+        mask[self.rowEdges()[airlineFilter.allowed[self.airline]]] = True
+        return mask
+
+    def edgeStops(self, airlineFilter: AirlineFilter = None) -> np.ndarray:
+        # fewest intermediate stops on every edge among its (allowed) carriers;
+        # 0 for an edge without any, which a filter masks out anyway
+        rows = slice(None) if airlineFilter is None else airlineFilter.allowed[self.airline]
+        stops = np.full(len(self.offsets) - 1, np.iinfo(np.int8).max, dtype=np.int8)
+        np.minimum.at(stops, self.rowEdges()[rows], self.stops[rows])
+        stops[stops == np.iinfo(np.int8).max] = 0
+        return stops
+
+    def insertEdge(self, edge: int):
+        # a route added by a live update has no known carrier
+        self.offsets = np.insert(self.offsets, edge, self.offsets[edge])
+        self._edges = None
+
+    def removeEdge(self, edge: int):
+        start, end = int(self.offsets[edge]), int(self.offsets[edge + 1])
+        self.airline = np.delete(self.airline, np.s_[start:end])
+        self.codeshare = np.delete(self.codeshare, np.s_[start:end])
+        self.stops = np.delete(self.stops, np.s_[start:end])
+        self.equipment = self.equipment[:start] + self.equipment[end:]
+        self.offsets = np.delete(self.offsets, edge)
+        self.offsets[edge:] -= end - start
+        self._edges = None
+
+
+class RouteCarrier(NamedTuple):
+    # one airline's service on a route, from FlightPathing.getRouteCarriers()
+    airlineId: int
+    airline: str  # IATA code, or ICAO where the airline has none
+    airlineName: str
+    codeshare: bool
+    stops: int
+    equipment: tuple[str, ...]
+
+
+class Connection(NamedTuple):
+    # one scheduled flight of a journey from FlightPathing.getEarliestArrival()
+    # or getProfile(); times are minutes from 00:00 UTC on the first day
+    srcId: int
+    dstId: int
+    departure: int
+    arrival: int
+    airline: str  # IATA code, or ICAO where the airline has none; "" when unknown
+
+
 class Route:
     # https://www.statista.com/statistics/978646/cost-per-available-seat-mile-united-airlines/
     def __init__(self, srcId, dstId):
@@ -62,561 +463,3831 @@ class Vertex:
 
 class SearchParameter:
 
-    def __init__(self, cost, time):
+    def __init__(self, cost, time, airlines: AirlineFilter = None):
         self.cost = cost
         self.time = time
+        # None searches every route; a filter allowing every airline is the same search
+        self.airlines = None if airlines is not None and airlines.allowed.all() else airlines
 
     def __eq__(self, other: object):
         if not isinstance(other, SearchParameter):
             return False
-        return True if self.cost == other.cost and self.time == other.time else False
+        return self.cost == other.cost and self.time == other.time and self.airlines == other.airlines
 
     def __ne__(self, other: object) -> bool:
-        if not isinstance(other, SearchParameter):
-            return True
-        return False if self.cost == other.cost and self.time == other.time else True
+        return not self == other
     
     def __hash__(self) -> int:
-        return hash(repr(self))
+        # must agree with __eq__, so hash the weights rather than the identity
+        return hash((self.cost, self.time, self.airlines))
 
 
-class FlightPathing:
+class QueryStats:
+    # Counters for a single query, filled in by the engine that runs it. Each
+    # query gets its own, so concurrent queries never share one. The engines
+    # count in local variables and add them here once per query, so collecting
+    # them costs next to nothing.
 
-    def __init__(self, airportsFile, routesFile):
-        self.totalAirports = 0
-        self.airportToIdMap = {}
-        self.idToAirportMap = {}  # id to airport
-        self.routeIdMap = defaultdict(dict)  # id to route
-        self.parse_airports(airportsFile)
-        self.parse_routes(routesFile)
-        self.searchParameter = None
-        self.median = MedianCostAndTime(self.routeIdMap)
-        self.medianCost = self.median.getMedianCost()
-        self.medianTime = self.median.getMedianTime()
-        self.totalTime = 0
-        self.totalCost = 0
-        self.dijkstra = Dijkstra(self.routeIdMap, self.medianCost, self.medianTime, self.getTotalAirports())
-        self.astar = Astar(self.idToAirportMap, self.routeIdMap, self.medianCost, self.medianTime,
-                           self.getTotalAirports())
-        self.bellmanford = bellmanford(self.idToAirportMap, self.routeIdMap, self.medianCost, self.medianTime, self.getTotalAirports())
-        self.shortestPaths = {}
-
-    def parse_airports(self, fileLocation: str):
-
-        file = open(fileLocation, "r", encoding="utf8")
-        airports = list(csv.reader(file, delimiter=","))
-        file.close()
-        for airport in airports:
-            if airport[9] == "\\N":
-                continue
-            ap = Airport(int(airport[0]), airport[1], airport[2],
-                         airport[3], airport[4], airport[5],
-                         float(airport[6]), float(airport[7]), float(airport[8]),
-                         float(airport[9]), airport[11], airport[12],
-                         airport[13])
-            self.idToAirportMap[int(airport[0])] = ap
-            self.airportToIdMap[airport[1]] = ap
-            self.totalAirports = max(int(airport[0]), self.totalAirports)
+    def __init__(self):
+        self.wallTime = 0.0  # seconds, for the whole FlightPathing.query()
+        self.heuristicTime = 0.0  # seconds spent building A* / ALT estimates
+        self.heapPushes = 0
+        self.heapPops = 0
+        self.nodesVisited = 0  # airports (or labels) settled
+        self.edgesRelaxed = 0
+        self.cacheHits = 0  # route, shortest-path tree and Pareto front caches
 
-    def parse_routes(self, fileLocation: str):
+    def asDict(self) -> dict:
+        return dict(vars(self))
 
-        file = open(fileLocation, "r", encoding="utf8")
-        routes = list(csv.reader(file, delimiter=","))
-        file.close()
+    def freeze(self) -> "FrozenQueryStats":
+        return FrozenQueryStats(**vars(self))
 
-        for route in routes:
-            if route[3] == "\\N" or route[5] == "\\N":
-                continue
-            src_id = int(route[3])
-            dst_id = int(route[5])
 
-            if self.idToAirportMap.get(src_id) is None or self.idToAirportMap.get(dst_id) is None:
-                continue
+class FrozenQueryStats(NamedTuple):
+    # Read-only copy of a finished query's QueryStats, as handed out in RouteResult
+    wallTime: float
+    heuristicTime: float
+    heapPushes: int
+    heapPops: int
+    nodesVisited: int
+    edgesRelaxed: int
+    cacheHits: int
 
-            self.routeIdMap[src_id][dst_id] = Route(src_id, dst_id)
-            self.routeIdMap[src_id][dst_id].dist = self._setDist(src_id, dst_id)
-            self.routeIdMap[src_id][dst_id].cost = self._setCost(src_id, dst_id)
-            self.routeIdMap[src_id][dst_id].time = self._setTime(src_id, dst_id)
-
-    def _setDist(self, srcId: int, dstId: int) -> float:
-        src_airport = self.idToAirportMap.get(srcId)
-        dst_airport = self.idToAirportMap.get(dstId)
-        src_coord = (src_airport.latitude, src_airport.longitude)
-        dst_coord = (dst_airport.latitude, dst_airport.longitude)
-        return geopy.distance.distance(src_coord, dst_coord).km
-
-    def _setTime(self, srcId, dstId):
-        route = self.routeIdMap.get(srcId).get(dstId)
-        waitingTime = round(random.uniform(0.5, 4), 2)
-        travellingTime = route.dist / AIRCRAFT_SPEED
-        return waitingTime + travellingTime
+    def asDict(self) -> dict:
+        return self._asdict()
 
-    def _setCost(self, srcId, dstId):
-        route = self.routeIdMap[srcId][dstId]
-        baseFare = round(random.uniform(100, 200), 2)
-        fuelCost = round(random.uniform(12.7, 17.68), 2) / PASSENGER_SIZE_747 * route.dist * KM_TO_MILE
-        return baseFare + fuelCost
 
-    def getTotalAirports(self):
-        return self.totalAirports
+class QueryHistograms:
+    # Ready-made query hook (see FlightPathing.addQueryHook): counts each
+    # QueryStats field per algorithm into fixed buckets, e.g. for export to a
+    # metrics service. counts[algorithm][field][i] is the number of queries
+    # with value <= bounds[field][i]; the last slot counts everything larger.
+    DEFAULT_BOUNDS = {
+        "wallTime": (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+        "nodesVisited": (10, 100, 1000, 10000, 100000),
+        "edgesRelaxed": (100, 1000, 10000, 100000, 1000000),
+    }
 
-    def createSearchParameter(self, cost: float, time: float) -> SearchParameter:
-        return SearchParameter(cost, time)
+    def __init__(self, bounds: dict = None):
+        self.bounds = bounds or self.DEFAULT_BOUNDS
+        self.counts = {}
+        self.lock = threading.Lock()
 
-    def _idPathToAirport(self, shortestPath: list[int]) -> list[Airport]:
-        airports = []
-        if shortestPath is not None:
-            for id in shortestPath:
-                airports.append(self.idToAirportMap.get(id).name)
-        return airports
+    def __call__(self, result: "RouteResult"):
+        with self.lock:
+            histograms = self.counts.setdefault(result.algorithm, {
+                field: [0] * (len(bounds) + 1) for field, bounds in self.bounds.items()})
+            for field, bounds in self.bounds.items():
+                value = getattr(result.stats, field)
+                slot = next((i for i, bound in enumerate(bounds) if value <= bound), len(bounds))
+                histograms[field][slot] += 1
 
-    # returns airport objects in a list
-    def _idPathtoAirportObjects(self, shortestPath: list[int]) -> list[Airport]:
-        airports = []
-        if shortestPath is not None:
-            for id in shortestPath:
-                airports.append(self.idToAirportMap.get(id))
-        return airports
 
-    def _airportPathToId(self, shortestPath: list[str]) -> list[int]:
-        if shortestPath is None:
-            return None
-        airports = []
-        for airport in shortestPath:
-            airports.append(self.airportToIdMap.get(airport).airportId)
-        return airports
+def haversineDistances(lat1, lon1, lat2, lon2) -> np.ndarray:
+    # great-circle distance in km on a sphere of radius EARTH_RADIUS_KM, for
+    # whole arrays of coordinates (in degrees) at once
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
 
-    def getShortestPathId(self, srcAirport: str, dstAirport: str, searchParameter: SearchParameter, algorithm: str) -> list[int]:
-        # Check for valid algorithm: dijkstra/astar/bellmanford
-        algorithm = algorithm.upper()
-        if not algorithm == "DIJKSTRA" and not algorithm == "ASTAR" and not algorithm == "BELLMAN-FORD":
-            raise TypeError("No such algorithm supported.")
 
-        # get airport id
-        if not self.existsByAirportName(srcAirport) or not self.existsByAirportName(dstAirport):
-            raise TypeError("Method getShortestPath(): srcAirport / dstAirport cannot be None")
-        srcId = self.airportToIdMap.get(srcAirport).airportId
-        dstId = self.airportToIdMap.get(dstAirport).airportId
-
-        # get the shortest path
-        shortestPathId = []
-        if algorithm == "ASTAR":
-            shortestPathId = self.astar.getShortestPath(srcId, dstId, searchParameter)
-        elif algorithm == "BELLMAN-FORD":
-            shortestPathId = self.bellmanford.bellmanford(srcId, dstId, searchParameter)
-        elif algorithm == "DIJKSTRA":
-            shortestPathId = self.dijkstra.getShortestPath(srcId, dstId, searchParameter)
-        return shortestPathId
-
-    def getShortestPathStr(self, srcAirport: str, dstAirport: str, searchParameter: SearchParameter, algorithm: str):
-        calculatedPathId = self.getShortestPathId(srcAirport, dstAirport, searchParameter, algorithm)
-        return self._idPathToAirport(calculatedPathId)
+def ellipsoidalDistances(lat1, lon1, lat2, lon2, maxIterations: int = 200, tolerance: float = 1e-12) -> np.ndarray:
+    # Vincenty's inverse formula on the WGS-84 ellipsoid in km, iterated on all
+    # pairs at once. Where it converges it agrees with geopy.distance.distance
+    # (Karney's geodesic) to well under a millimetre. Nearly antipodal pairs can
+    # fail to converge; those few fall back to geopy so the result stays within
+    # that tolerance everywhere.
+    lat1, lon1, lat2, lon2 = (np.asarray(x, dtype=np.float64) for x in (lat1, lon1, lat2, lon2))
+    L = np.radians(lon2 - lon1)
+    U1 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat1)))
+    U2 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat2)))
+    sinU1, cosU1, sinU2, cosU2 = np.sin(U1), np.cos(U1), np.sin(U2), np.cos(U2)
 
-    # returns airport objects in a list
-    def getShortestPathWithObjects(self, srcAirport: str, dstAirport: str, searchParameter: SearchParameter, algorithm: str):
-        calculatedPathId = self.getShortestPathId(srcAirport, dstAirport, searchParameter, algorithm)
-        return self._idPathtoAirportObjects(calculatedPathId)
-    
-    def getAlternativePath(self, srcAirport: str, dstAirport: str, searchParameter: SearchParameter):
-        if not self.existsByAirportName(srcAirport) or not self.existsByAirportName(dstAirport):
-            raise TypeError("Method getShortestPath(): srcAirport / dstAirport cannot be None")
-        
-        srcIds = self.getNearestAirport(srcAirport)
-        dstIds = self.getNearestAirport(dstAirport)
-
-        shortestPathId = self.dijkstra.getShortestPathWithSets(srcIds, dstIds, searchParameter)
-        shortestPathString = self._idPathToAirport(shortestPathId)
-        return shortestPathString
-
-    def getNearestAirport(self, srcAirportName: str):
-        if not self.existsByAirportName(srcAirportName):
-            raise TypeError("Method getNearestAirport(): srcAirport cannot be None")
-        
-        nearestAirport = set()
-        srcAirport: Airport = self.airportToIdMap.get(srcAirportName)
-        pq = []
-        airportId: int
-        airport: Airport
-        for airportId, airport in self.airportToIdMap.items():
-            dist: float = self._setDist(srcAirport.airportId, airport.airportId)  
-            heapq.heappush(pq, (dist, airport.airportId))
-        for i in range(3):
-            dist, airportId = heapq.heappop(pq)
-            if dist < 100:
-                nearestAirport.add(airportId)
-        return frozenset(nearestAirport)
+    # iterate only on the pairs that have not converged yet
+    lam = L.copy()
+    sinSigma, cosSigma, sigma = np.zeros_like(L), np.zeros_like(L), np.zeros_like(L)
+    cos2Alpha, cos2SigmaM = np.zeros_like(L), np.zeros_like(L)
+    active = np.arange(len(L))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(maxIterations):
+            if len(active) == 0:
+                break
+            l, lm = L[active], lam[active]
+            u1s, u1c, u2s, u2c = sinU1[active], cosU1[active], sinU2[active], cosU2[active]
+            sinLam, cosLam = np.sin(lm), np.cos(lm)
+            sS = np.sqrt((u2c * sinLam) ** 2 + (u1c * u2s - u1s * u2c * cosLam) ** 2)
+            cS = u1s * u2s + u1c * u2c * cosLam
+            s = np.arctan2(sS, cS)
+            sinAlpha = np.where(sS == 0, 0.0, u1c * u2c * sinLam / sS)
+            c2A = 1 - sinAlpha ** 2
+            c2SM = np.where(c2A == 0, 0.0, cS - 2 * u1s * u2s / c2A)
+            C = WGS84_F / 16 * c2A * (4 + WGS84_F * (4 - 3 * c2A))
+            newLam = l + (1 - C) * WGS84_F * sinAlpha * (s + C * sS * (c2SM + C * cS * (-1 + 2 * c2SM ** 2)))
+            sinSigma[active], cosSigma[active], sigma[active] = sS, cS, s
+            cos2Alpha[active], cos2SigmaM[active], lam[active] = c2A, c2SM, newLam
+            active = active[~(np.abs(newLam - lm) <= tolerance)]
 
-    def existsByAirportName(self, airportName: str) -> bool:
-        if airportName is None:
-            raise TypeError("Method existByAirportName(): Airport name cannot be None")
-        return airportName in self.airportToIdMap
+        u2 = cos2Alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+        A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+        B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+        deltaSigma = B * sinSigma * (cos2SigmaM + B / 4 * (
+            cosSigma * (-1 + 2 * cos2SigmaM ** 2)
+            - B / 6 * cos2SigmaM * (-3 + 4 * sinSigma ** 2) * (-3 + 4 * cos2SigmaM ** 2)))
+        distances = WGS84_B * A * (sigma - deltaSigma) / 1000
 
-    def existsByAirportId(self, airportName: int) -> bool:
-        if airportName is None:
-            raise TypeError("Method existByAirportId(): Airport name cannot be None")
-        return airportName in self.idToAirportMap
+    failed = np.union1d(active, np.flatnonzero(~np.isfinite(distances)))
+    for i in failed.tolist():
+        distances[i] = geopy.distance.distance((lat1[i], lon1[i]), (lat2[i], lon2[i])).km
+    return distances
 
-    def _calculateTotalMetric(self, routePathId: list[int], metric: str) -> float:
-        totalMetric = 0
 
-        if routePathId is not None:
-            for i in range(1, len(routePathId)):
-                currId = routePathId[i - 1]
-                nextId = routePathId[i]
-                route = self.routeIdMap.get(currId).get(nextId)
-                if metric == "cost":
-                    totalMetric += route.cost
-                elif metric == "time":
-                    totalMetric += route.time
-        return totalMetric
+def routeDistances(lat1, lon1, lat2, lon2, mode: str = DISTANCE_ELLIPSOIDAL) -> np.ndarray:
+    # Batched distance stage used when loading routes. HAVERSINE is the fastest
+    # and is within 0.6% of the ellipsoidal distance; ELLIPSOIDAL matches
+    # geopy.distance.distance.
+    mode = mode.upper()
+    if mode == DISTANCE_HAVERSINE:
+        return haversineDistances(lat1, lon1, lat2, lon2)
+    if mode == DISTANCE_ELLIPSOIDAL:
+        return ellipsoidalDistances(lat1, lon1, lat2, lon2)
+    raise TypeError("No such distance mode supported.")
 
-    def getTotalCost(self, routePathId: list[int]) -> float:
-        return self._calculateTotalMetric(routePathId, "cost")
 
-    def getTotalTime(self, routePathId: list[int]) -> float:
-        return self._calculateTotalMetric(routePathId, "time")
+def routeWeight(cost: float, time: float, medianCost, medianTime, searchParameter: SearchParameter) -> float:
+    # same combined weight as EdgeWeights gives an edge position
+    return (cost / medianCost) * searchParameter.cost + (time / medianTime) * searchParameter.time
 
 
-class MedianCostAndTime:
-    def __init__(self, routeIdMap):
-        self.costs = []
-        self.time = []
-        self.routeIdMap = routeIdMap
-        self.calculateMedians()
+# Route updates pass the (cost, time) of the route before and after the change,
+# None where the route does not exist. A change can be both dearer and cheaper,
+# e.g. a lower fare on a slower schedule.
 
-    def calculateMedians(self):
-        for routes in self.routeIdMap.values():
-            for route in routes.values():
-                self.costs.append(route.cost)
-                self.time.append(route.time)
+def _routeGotWorse(old: tuple, new: tuple) -> bool:
+    return old is not None and (new is None or new[0] > old[0] or new[1] > old[1])
 
-    def getMedianCost(self) -> float:
-        median1, median2 = self.getMedianIndices(self.costs)
-        return (self.costs[median1] + self.costs[median2]) / 2
 
-    def getMedianTime(self) -> float:
-        median1, median2 = self.getMedianIndices(self.time)
-        return (self.time[median1] + self.time[median2]) / 2
+def _routeGotBetter(old: tuple, new: tuple) -> bool:
+    return new is not None and (old is None or new[0] < old[0] or new[1] < old[1])
 
-    def getMedianIndices(self, arr: list) -> tuple[int, int]:
-        arr.sort()
-        # if Array is even length, return the average of the two middle elements
-        if len(arr) % 2 == 0:  # 0 - 5, median is 2.
-            return len(arr) // 2, len(arr) // 2 + 1
-        # if Array is odd length, return the middle element
-        else:
-            return len(arr) // 2, len(arr) // 2
 
+def _usesRoute(path, srcId: int, dstId: int) -> bool:
+    return any(a == srcId and b == dstId for a, b in zip(path, path[1:]))
 
-class Dijkstra:
 
-    def __init__(self, routeIdMap, medianCost, medianTime, totalAirports):
-        self.routeIdMap = routeIdMap
-        self.shortestPaths = {}
-        self.medianCost = medianCost
-        self.medianTime = medianTime
-        self.totalAirports = totalAirports
-        self.nodes_visited = 0
+class RouteGraph:
+    # Compressed sparse row adjacency. Airports are remapped to dense indices
+    # 0..n-1; the routes leaving airport index i are the edge positions
+    # offsets[i]..offsets[i + 1] - 1, and targets/cost/time/distance hold the
+    # per-edge values at those positions.
 
-    def _dijkstra(self, srcId: int, dstId: int, searchParameter: SearchParameter) -> list[int]:
-        weights = [sys.maxsize for i in range(self.totalAirports + 2)]
-        edgeTo = {}
-        pq = [Vertex(srcId, -1, 0.0)]
-        while pq:
-            currVertex = heapq.heappop(pq)
-            self.nodes_visited += 1
-            currId, currWeight = currVertex.currId, currVertex.weight
-            if currWeight >= weights[currId]:
-                continue
-            weights[currId] = currWeight
-            edgeTo[currId] = currVertex.prevId
-            if currId == dstId:
-                return self._traverseToSrc(edgeTo, dstId)
-            nextRoute: Route
-            for nextRoute in self.routeIdMap.get(currId, {}).values():
-                nextId = nextRoute.dstId
-                nextWeight = currWeight + self.getWeight(currId, nextId, searchParameter)
-                heapq.heappush(pq, Vertex(nextId, currId, nextWeight))
-        return None
+    def __init__(self, airportIds, offsets, targets, cost, time, distance):
+        self.airportIds = airportIds  # dense index to airport id
+        self.idToIndex = {airportId: index for index, airportId in enumerate(airportIds.tolist())}
+        self.offsets = offsets
+        self.targets = targets
+        self.cost = cost
+        self.time = time
+        self.distance = distance
+        self.carriers: RouteCarriers = None  # set when the airline of each route is known
+        self._edgeWeights = {}
 
-    def _dijkstraWithSets(self, srcIds: frozenset[int], dstIds: frozenset[int], searchParameter: SearchParameter) -> list[int]:
-        syncSrc = self.totalAirports 
-        syncDst = self.totalAirports + 1
-        self._addSuperSync(srcIds, syncSrc, dstIds, syncDst)
-        shortestPath = self._dijkstra(syncSrc, syncDst, searchParameter)
-        if shortestPath:
-            del shortestPath[0]
-            del shortestPath[-1]
-        self._removeSuperSync(syncSrc, syncDst, dstIds)
-        return shortestPath
-    
-    def _addSuperSync(self, srcIds: frozenset[int], syncSrc: int, dstIds: frozenset[int], syncDst: int):
-        for airportId in srcIds:  
-            route = Route(syncSrc, airportId)
-            route.cost = 0
-            route.distance = 0
-            route.time = 0
-            self.routeIdMap[syncSrc][airportId] = route
-        for airportId in dstIds:  
-            route = Route(airportId, syncDst)
-            route.cost = 0
-            route.distance = 0
-            route.time = 0
-            self.routeIdMap[airportId][syncDst] = route
-
-    def _removeSuperSync(self, syncSrc: int, syncDst: int, dstIds: frozenset[int]):
-        del self.routeIdMap[syncSrc]
-        for airportIds in dstIds:
-            del self.routeIdMap[airportIds][syncDst]
+    @classmethod
+    def fromRoutes(cls, airportIds: list[int], routes: dict) -> "RouteGraph":
+        # routes maps (srcId, dstId) to (cost, time, distance); the dict order is
+        # kept as the order of the edges leaving each airport
+        edgeCount = len(routes)
+        values = np.array(list(routes.values()), dtype=np.float64).reshape(edgeCount, 3)
+        return cls.fromArrays(airportIds, np.fromiter((srcId for srcId, _ in routes), dtype=np.int64, count=edgeCount),
+                              np.fromiter((dstId for _, dstId in routes), dtype=np.int64, count=edgeCount),
+                              values[:, 0], values[:, 1], values[:, 2])
 
-    def _traverseToSrc(self, spTree: dict, dstId: int) -> list[int]:
-        res = []
-        currId = dstId
-        while currId != -1:
-            res.append(currId)
-            currId = spTree.get(currId)
-        res.reverse()
-        return res
+    @classmethod
+    def fromArrays(cls, airportIds: list[int], srcIds, dstIds, cost, time, distance,
+                   carriers: RouteCarriers = None) -> "RouteGraph":
+        # one entry per route, by airport id; routes leaving the same airport
+        # keep their relative order
+        idToIndex = {airportId: index for index, airportId in enumerate(airportIds)}
+        srcIndices = np.fromiter((idToIndex[srcId] for srcId in srcIds), dtype=np.int32, count=len(srcIds))
+        dstIndices = np.fromiter((idToIndex[dstId] for dstId in dstIds), dtype=np.int32, count=len(dstIds))
 
-    def getShortestPath(self, srcId: int, dstId: int, searchParameter: SearchParameter) -> list[int]:
-        # get airport id
-        if (srcId, dstId, searchParameter) not in self.shortestPaths:
-            self.shortestPath = self._dijkstra(srcId, dstId, searchParameter)
+        order = np.argsort(srcIndices, kind="stable")
+        offsets = np.zeros(len(airportIds) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(srcIndices, minlength=len(airportIds)), out=offsets[1:])
+        graph = cls(np.asarray(airportIds, dtype=np.int32), offsets, dstIndices[order],
+                    np.ascontiguousarray(np.asarray(cost, dtype=np.float64)[order]),
+                    np.ascontiguousarray(np.asarray(time, dtype=np.float64)[order]),
+                    np.ascontiguousarray(np.asarray(distance, dtype=np.float64)[order]))
+        if carriers is not None:
+            graph.carriers = carriers.permuted(order)
+        return graph
 
-        # get the shortest path
-        shortestPath = self.shortestPaths.get((srcId, dstId, searchParameter))
-        return self.shortestPath
-    
-    def getShortestPathWithSets(self, srcIds: frozenset[int], dstIds: frozenset[int], searchParameter: SearchParameter) -> list[str]:
-        # get airport id
-        if (srcIds, dstIds, searchParameter) not in self.shortestPaths:
-            self.shortestPaths[(srcIds, dstIds, searchParameter)] = self._dijkstraWithSets(srcIds, dstIds, searchParameter)
+    def getNumAirports(self) -> int:
+        return len(self.airportIds)
 
-        # get shortest path
-        shortestPath = self.shortestPaths.get((srcIds, dstIds, searchParameter))
-        return shortestPath
+    def getNumRoutes(self) -> int:
+        return len(self.targets)
 
-    def getWeight(self, srcId: int, dstId: int, searchParameter: SearchParameter):
-        route = self.routeIdMap.get(srcId).get(dstId)
-        costWeightage = (route.cost / self.medianCost) * searchParameter.cost
-        timeWeightage = (route.time / self.medianTime) * searchParameter.time
-        weight = costWeightage + timeWeightage
-        return weight
+    def getDegree(self, index: int) -> int:
+        return int(self.offsets[index + 1] - self.offsets[index])
 
+    def findEdge(self, srcIndex: int, dstIndex: int) -> int:
+        # returns the edge position of srcIndex -> dstIndex, or -1 if there is no such route
+        start, end = int(self.offsets[srcIndex]), int(self.offsets[srcIndex + 1])
+        matches = np.flatnonzero(self.targets[start:end] == dstIndex)
+        return start + int(matches[0]) if len(matches) else -1
 
-class Astar:
-    def __init__(self, idToAirportMap, routeIdMap, medianCost, medianTime, totalAirports):
-        self.idToAirportMap = idToAirportMap
-        self.routeIdMap = routeIdMap
-        self.srcId = None
-        self.dstId = None
-        self.medianCost = medianCost
-        self.medianTime = medianTime
-        self.totalAirport = totalAirports
-        self.shortestPath = []
-        self.searchParameter = None
-        self.nodes_visited = 0
+    def pathToIds(self, indexPath: list[int]) -> list[int]:
+        return [int(self.airportIds[index]) for index in indexPath]
 
-    def getWeight(self, srcId: int, dstId: int, searchParameter: SearchParameter):
-        route = self.routeIdMap.get(srcId).get(dstId)
-        costWeightage = (route.cost / self.medianCost) * searchParameter.cost
-        timeWeightage = (route.time / self.medianTime) * searchParameter.time
-        weight = costWeightage + timeWeightage
-        return weight
-
-    def heuristic_cost_estimate(self, srcId: int, dstId: int, searchParameter: SearchParameter):
-        src_airport = self.idToAirportMap.get(srcId)
-        dst_airport = self.idToAirportMap.get(dstId)
-        src_coord = (src_airport.latitude, src_airport.longitude)
-        dst_coord = (dst_airport.latitude, dst_airport.longitude)
-        dist = geopy.distance.distance(src_coord, dst_coord).km
-
-        baseFare = round(random.uniform(100, 200), 2)
-        fuelCost = round(random.uniform(12.7, 17.68), 2) / PASSENGER_SIZE_747 * dist * KM_TO_MILE
-        cost = baseFare + fuelCost
-
-        waitingTime = random.uniform(0.5, 4)
-        travellingTime = dist / AIRCRAFT_SPEED
-        time = waitingTime + travellingTime
+    def contentHash(self) -> str:
+        digest = hashlib.sha256()
+        for array in (self.airportIds, self.offsets, self.targets, self.cost, self.time):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
 
-        costWeightage = (cost / self.medianCost) * searchParameter.cost
-        timeWeightage = (time / self.medianTime) * searchParameter.time
-        return costWeightage + timeWeightage
+    def edgeWeights(self, medianCost, medianTime) -> "EdgeWeights":
+        # shared by every engine searching this graph with the same medians
+        edgeWeights = self._edgeWeights.get((medianCost, medianTime))
+        if edgeWeights is None:
+            edgeWeights = self._edgeWeights.setdefault((medianCost, medianTime),
+                                                      EdgeWeights(self, medianCost, medianTime))
+        return edgeWeights
 
-    def getShortestPath(self, srcId: int, dstId: int, searchParameter: SearchParameter) -> list[int]:
-        open_list = PriorityQueue()
-        open_list.put((0, srcId))  # Priority queue for which airport to next search
-        came_from = {}  # Dictionary that contains the shortest path so far
-        g_score = {srcId: 0}  # stores the actual cost from the source node to each node encountered so far.
+    def clearEdgeWeights(self):
+        self._edgeWeights = {}
 
-        while not open_list.empty():
-            self.nodes_visited += 1
-            current_cost, current_airport_id = open_list.get()
+    def edgeMask(self, airlineFilter: AirlineFilter) -> np.ndarray:
+        # edge positions the filter lets a search use; without carriers every edge is allowed
+        if self.carriers is None:
+            return np.ones(self.getNumRoutes(), dtype=bool)
+        return self.carriers.edgeMask(airlineFilter)
 
-            if current_airport_id == dstId:
-                path = [current_airport_id]
-                while current_airport_id in came_from:
-                    current_airport_id = came_from[current_airport_id]
-                    path.append(current_airport_id)
-                path.reverse()
-                self.shortestPath = path
-                return self.shortestPath
+    def setRoute(self, srcIndex: int, dstIndex: int, cost: float, time: float, distance: float) -> tuple:
+        # Adds srcIndex -> dstIndex, or reprices it in place, and patches the
+        # cached edge weights to match. Returns the previous (cost, time), or
+        # None if the route is new. A new route goes at the end of the routes
+        # leaving srcIndex, so the positions of every later edge shift by one.
+        edge = self.findEdge(srcIndex, dstIndex)
+        if edge != -1:
+            old = (float(self.cost[edge]), float(self.time[edge]))
+            if not self.cost.flags.writeable:  # memory-mapped from a snapshot
+                self.cost, self.time, self.distance = self.cost.copy(), self.time.copy(), self.distance.copy()
+            self.cost[edge], self.time[edge], self.distance[edge] = cost, time, distance
+            for edgeWeights in list(self._edgeWeights.values()):
+                edgeWeights.setEdge(edge, cost, time)
+            return old
+        edge = int(self.offsets[srcIndex + 1])
+        if self.carriers is not None:
+            self.carriers.insertEdge(edge)
+        self.targets = np.insert(self.targets, edge, dstIndex)
+        self.cost = np.insert(self.cost, edge, cost)
+        self.time = np.insert(self.time, edge, time)
+        self.distance = np.insert(self.distance, edge, distance)
+        offsets = self.offsets.copy()
+        offsets[srcIndex + 1:] += 1
+        self.offsets = offsets
+        for edgeWeights in list(self._edgeWeights.values()):
+            edgeWeights.insertEdge(edge, cost, time)
+        return None
 
-            for neighbor in self.routeIdMap.get(current_airport_id, {}):
-                tentative_g_score = g_score[current_airport_id] + self.getWeight(current_airport_id, neighbor, searchParameter)  # Cost to reach neighbour from current node (cost to go to current node plus cost to travel to neighbour node) (will be updated as it goes by)
-                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:  # Updates the cost to reach the neighbour if it is less than the current cost to reach the neighbour that is recorded in g_score
-                    came_from[neighbor] = current_airport_id
-                    g_score[neighbor] = tentative_g_score
-                    priority = tentative_g_score + self.heuristic_cost_estimate(neighbor, dstId, searchParameter)  # Calculates priority by adding the cost to reach the neighbour from the current node and the heuristic cost and time based off of euclidean distance between destination and neighbour
-                    open_list.put((priority, neighbor))
-        return []
-    
+    def removeRoute(self, srcIndex: int, dstIndex: int) -> tuple:
+        # returns the removed route's (cost, time), or None if there was no such route
+        edge = self.findEdge(srcIndex, dstIndex)
+        if edge == -1:
+            return None
+        old = (float(self.cost[edge]), float(self.time[edge]))
+        if self.carriers is not None:
+            self.carriers.removeEdge(edge)
+        self.targets = np.delete(self.targets, edge)
+        self.cost = np.delete(self.cost, edge)
+        self.time = np.delete(self.time, edge)
+        self.distance = np.delete(self.distance, edge)
+        offsets = self.offsets.copy()
+        offsets[srcIndex + 1:] -= 1
+        self.offsets = offsets
+        for edgeWeights in list(self._edgeWeights.values()):
+            edgeWeights.removeEdge(edge)
+        return old
 
-class bellmanford: 
+    def addAirport(self, airportId: int) -> int:
+        # appends an airport without routes and returns its index
+        index = self.getNumAirports()
+        self.airportIds = np.concatenate((self.airportIds, np.array([airportId], dtype=self.airportIds.dtype)))
+        self.offsets = np.concatenate((self.offsets, self.offsets[-1:]))
+        self.idToIndex[airportId] = index
+        return index
 
-    def __init__(self, idToAirportMap, routeIdMap, medianCost, medianTime, totalAirports):
-        self.idToAirportMap = idToAirportMap
-        self.routeIdMap = routeIdMap
-        self.srcId = None
-        self.dstId = None
+    def edgeSources(self) -> np.ndarray:
+        # source index of every edge position
+        return np.repeat(np.arange(self.getNumAirports(), dtype=np.int32), np.diff(self.offsets))
+
+    def reversed(self) -> "RouteGraph":
+        # same airports with every route flipped; edge values follow their route
+        order = np.argsort(self.targets, kind="stable")
+        offsets = np.zeros(self.getNumAirports() + 1, dtype=np.int32)
+        np.cumsum(np.bincount(self.targets, minlength=self.getNumAirports()), out=offsets[1:])
+        graph = RouteGraph(self.airportIds, offsets, self.edgeSources()[order], self.cost[order], self.time[order],
+                           self.distance[order])
+        if self.carriers is not None:
+            graph.carriers = self.carriers.permuted(order)
+        return graph
+
+
+class EdgeWeights:
+    # Cost and time of every edge position divided by their medians, computed
+    # once, and the combined SearchParameter weight of every edge position
+    # (cost * w_cost + time * w_time) for the most recently used parameters.
+    # With an airline filter, edges no allowed airline flies weigh inf, which
+    # every engine already skips, so filtered searches need no extra checks.
+
+    def __init__(self, graph: RouteGraph, medianCost, medianTime, maxEntries: int = EDGE_WEIGHT_CACHE_ENTRIES):
+        self.graph = graph
         self.medianCost = medianCost
         self.medianTime = medianTime
-        self.totalAirport = totalAirports
-        self.shortestPath = []
-        self.searchParameter = None
-        self.nodes_visited = 0
+        self.cost = graph.cost / medianCost
+        self.time = graph.time / medianTime
+        self.maxEntries = maxEntries
+        self.weights = OrderedDict()  # (w_cost, w_time, airlines) -> [array, list or None, edge mask or None]
+        self.lock = threading.Lock()
 
-        def __eq__(self, other):
-            return self.currId == other.currId
+    def _entry(self, searchParameter: SearchParameter) -> list:
+        key = (searchParameter.cost, searchParameter.time, searchParameter.airlines)
+        with self.lock:
+            entry = self.weights.get(key)
+            if entry is None:
+                weights = self.cost * searchParameter.cost + self.time * searchParameter.time
+                mask = None
+                if searchParameter.airlines is not None:
+                    mask = self.graph.edgeMask(searchParameter.airlines)
+                    weights[~mask] = math.inf
+                entry = self.weights[key] = [weights, None, mask]
+                while len(self.weights) > self.maxEntries:
+                    self.weights.popitem(last=False)
+            else:
+                self.weights.move_to_end(key)
+            return entry
 
-        def __lt__(self, other):
-            return self.weight < other.weight
+    def asArray(self, searchParameter: SearchParameter) -> np.ndarray:
+        return self._entry(searchParameter)[0]
 
-    def getWeight(self, srcId: int, dstId: int, searchParameter: SearchParameter):
-        route = self.routeIdMap.get(srcId).get(dstId)
-        costWeightage = (route.cost / self.medianCost) * searchParameter.cost
-        timeWeightage = (route.time / self.medianTime) * searchParameter.time
-        weight = costWeightage + timeWeightage
-        return weight
-    
-    def bellmanford(self, srcId: int, dstId: int, searchParameter: SearchParameter):
-        initAirportVertex = {i: Vertex(i, 0, sys.maxsize) for i in self.idToAirportMap}
-        del initAirportVertex[srcId]
-        airportVertex = {srcId: Vertex(srcId, -1, 0.0)}
-        airportVertex.update(initAirportVertex)
-
-        for _ in range(len(airportVertex) - 1):
-            tempVertex = copy.deepcopy(airportVertex)
-            for vertexId in tempVertex:
-                for edges in self.routeIdMap.get(vertexId, {}).values():
-                    self.nodes_visited += 1
-                    if tempVertex[vertexId].weight + self.getWeight(edges.srcId, edges.dstId, searchParameter) < tempVertex[edges.dstId].weight:
-                        tempVertex[edges.dstId].weight = tempVertex[vertexId].weight + self.getWeight(edges.srcId, edges.dstId, searchParameter)
-                        tempVertex[edges.dstId].prevId = vertexId
-            if tempVertex == airportVertex:
-                break
-            else:
-                airportVertex = tempVertex
-    
-        # # Checks for negative cycles, this is not neccessary in this case because our graph does not have any negative edges
-        # for vertexId in airportVertex:
-        #     for edges in self.routeIdMap.get(vertexId, {}).values():
-        #         if airportVertex[vertexId].weight + self.getWeight(edges.srcId, edges.dstId, searchParameter) < airportVertex[edges.dstId].weight:
-        #             print("Negative cycle detected")
-        #             return None
+    def asList(self, searchParameter: SearchParameter) -> list[float]:
+        # python floats index faster than numpy scalars in the search loops;
+        # a concurrent caller may convert too, both lists are equal
+        entry = self._entry(searchParameter)
+        if entry[1] is None:
+            entry[1] = entry[0].tolist()
+        return entry[1]
 
-        # Calculate the total weight of the journey of each airport it visits
+    # The three methods below follow RouteGraph.setRoute / removeRoute, so a
+    # route update costs one edge per cached weighting instead of a rebuild.
 
-        shortest_path = []
-        current_vertex = dstId
-        while current_vertex != -1:
-            if airportVertex[current_vertex].prevId == 0:
-                break
-            shortest_path.append(current_vertex)
-            current_vertex = airportVertex[current_vertex].prevId
+    def setEdge(self, edge: int, cost: float, time: float):
+        with self.lock:
+            self.cost[edge] = cost / self.medianCost
+            self.time[edge] = time / self.medianTime
+            for (costWeight, timeWeight, _), entry in self.weights.items():
+                weight = self.cost[edge] * costWeight + self.time[edge] * timeWeight
+                if entry[2] is not None and not entry[2][edge]:
+                    weight = math.inf
+                entry[0][edge] = weight
+                if entry[1] is not None:
+                    entry[1][edge] = float(weight)
 
-        shortest_path.reverse()
-        self.shortestPath = shortest_path
+    def insertEdge(self, edge: int, cost: float, time: float):
+        with self.lock:
+            self.cost = np.insert(self.cost, edge, cost / self.medianCost)
+            self.time = np.insert(self.time, edge, time / self.medianTime)
+            for (costWeight, timeWeight, _), entry in self.weights.items():
+                weight = self.cost[edge] * costWeight + self.time[edge] * timeWeight
+                if entry[2] is not None:  # no carrier is known for a new route
+                    weight = math.inf
+                    entry[2] = np.insert(entry[2], edge, False)
+                entry[0] = np.insert(entry[0], edge, weight)
+                if entry[1] is not None:
+                    entry[1] = entry[1][:edge] + [float(weight)] + entry[1][edge:]
 
-        return self.shortestPath
+    def removeEdge(self, edge: int):
+        with self.lock:
+            self.cost = np.delete(self.cost, edge)
+            self.time = np.delete(self.time, edge)
+            for entry in self.weights.values():
+                entry[0] = np.delete(entry[0], edge)
+                if entry[1] is not None:
+                    entry[1] = entry[1][:edge] + entry[1][edge + 1:]
+                if entry[2] is not None:
+                    entry[2] = np.delete(entry[2], edge)
 
-def readAirportAndRoutes():
-    # Get the directory of the current script
-    script_directory = os.path.dirname(os.path.abspath(__file__))
 
-#     # Define the relative path to the file within the Data folder
-    airports_path = os.path.join('data', 'airports.dat')
-    routes_path = os.path.join('data', 'routes.dat')
+class GraphSnapshot:
+    # Versioned binary snapshot of a parsed graph: a fixed preamble, a JSON
+    # header, then raw arrays aligned to ALIGNMENT bytes. read() memory-maps the
+    # file, so the arrays are read-only views onto pages that the OS shares
+    # between every process that loads the same snapshot.
+    MAGIC = b"FMRSNAP\0"
+    VERSION = 2
+    ALIGNMENT = 64
 
-    return FlightPathing(airports_path, routes_path)
+    def __init__(self, metadata: dict, arrays: dict):
+        self.metadata = metadata
+        self.arrays = arrays
+
+    @staticmethod
+    def sourceHash(fileLocations: list[str], *extra) -> str:
+        digest = hashlib.sha256()
+        for fileLocation in fileLocations:
+            with open(fileLocation, "rb") as file:
+                for chunk in iter(lambda: file.read(1 << 20), b""):
+                    digest.update(chunk)
+        for value in extra:
+            digest.update(repr(value).encode("utf8"))
+        return digest.hexdigest()
+
+    @classmethod
+    def write(cls, fileLocation: str, metadata: dict, arrays: dict):
+        layout = {}
+        offset = 0
+        for name, array in arrays.items():
+            layout[name] = {"dtype": array.dtype.str, "count": int(array.size), "offset": offset}
+            offset += -(-array.nbytes // cls.ALIGNMENT) * cls.ALIGNMENT
+        header = json.dumps({"metadata": metadata, "arrays": layout}).encode("utf8")
+        preamble = cls.MAGIC + np.array([cls.VERSION, len(header)], dtype="<u8").tobytes()
+        dataStart = -(-(len(preamble) + len(header)) // cls.ALIGNMENT) * cls.ALIGNMENT
+
+        # write to a temporary file first so readers never see a partial snapshot
+        tempLocation = f"{fileLocation}.{os.getpid()}.tmp"
+        with open(tempLocation, "wb") as file:
+            file.write(preamble + header)
+            for name, array in arrays.items():
+                file.seek(dataStart + layout[name]["offset"])
+                file.write(np.ascontiguousarray(array).tobytes())
+            file.truncate(dataStart + offset)
+        os.replace(tempLocation, fileLocation)
+
+    @classmethod
+    def read(cls, fileLocation: str, expectedHash: str) -> "GraphSnapshot":
+        # returns None if the file is missing, from another version, or built
+        # from different source files
+        try:
+            with open(fileLocation, "rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        preambleSize = len(cls.MAGIC) + 16
+        if len(buffer) < preambleSize or buffer[:len(cls.MAGIC)] != cls.MAGIC:
+            return None
+        version, headerSize = np.frombuffer(buffer, dtype="<u8", count=2, offset=len(cls.MAGIC)).tolist()
+        if version != cls.VERSION:
+            return None
+        header = json.loads(buffer[preambleSize:preambleSize + headerSize].decode("utf8"))
+        if header["metadata"].get("sourceHash") != expectedHash:
+            return None
+        dataStart = -(-(preambleSize + headerSize) // cls.ALIGNMENT) * cls.ALIGNMENT
+        arrays = {name: np.frombuffer(buffer, dtype=np.dtype(info["dtype"]), count=info["count"],
+                                      offset=dataStart + info["offset"])
+                  for name, info in header["arrays"].items()}
+        return cls(header["metadata"], arrays)
+
+    @staticmethod
+    def packStrings(values: list[str]) -> np.ndarray:
+        return np.frombuffer("\0".join(values).encode("utf8"), dtype=np.uint8)
+
+    @staticmethod
+    def unpackStrings(array: np.ndarray, count: int) -> list[str]:
+        return array.tobytes().decode("utf8").split("\0") if count else []
+
+
+class AirportIndex:
+    # k-d tree over airport positions as 3D unit vectors. Straight-line (chord)
+    # distance between unit vectors grows monotonically with great-circle
+    # distance, so the usual Euclidean k-d tree pruning is exact on the sphere.
+    # Reported distances are spherical (radius EARTH_RADIUS_KM) in km.
+    LEAF_SIZE = 16
+
+    def __init__(self, airportIds, latitudes, longitudes):
+        lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+        lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+        points = np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+        order = np.arange(len(points))
+        # flat tree: node i covers order[nodeStart[i]:nodeEnd[i]]; inner nodes
+        # split on splitDim at splitValue into children left[i] / right[i]
+        self.nodeStart, self.nodeEnd, self.splitDim, self.splitValue = [], [], [], []
+        self.left, self.right = [], []
+        self._build(points, order, 0, len(order))
+        self.points = points[order]
+        self.airportIds = np.asarray(airportIds, dtype=np.int64)[order]
+
+    def _build(self, points, order, start: int, end: int) -> int:
+        node = len(self.nodeStart)
+        self.nodeStart.append(start)
+        self.nodeEnd.append(end)
+        self.splitDim.append(-1)
+        self.splitValue.append(0.0)
+        self.left.append(-1)
+        self.right.append(-1)
+        if end - start <= self.LEAF_SIZE:
+            return node
+        block = points[order[start:end]]
+        dim = int(np.argmax(block.max(axis=0) - block.min(axis=0)))
+        mid = (end - start) // 2
+        partition = np.argpartition(block[:, dim], mid)
+        order[start:end] = order[start:end][partition]
+        self.splitDim[node] = dim
+        self.splitValue[node] = float(points[order[start + mid], dim])
+        self.left[node] = self._build(points, order, start, start + mid)
+        self.right[node] = self._build(points, order, start + mid, end)
+        return node
+
+    @staticmethod
+    def _unitVector(latitude: float, longitude: float) -> np.ndarray:
+        lat, lon = np.radians(latitude), np.radians(longitude)
+        return np.array([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+    @staticmethod
+    def _chordSq(distanceKm: float) -> float:
+        angle = distanceKm / EARTH_RADIUS_KM
+        return 4.0 if angle >= np.pi else (2 * np.sin(angle / 2)) ** 2
+
+    @staticmethod
+    def _toKm(chordSq: float) -> float:
+        return 2 * EARTH_RADIUS_KM * float(np.arcsin(min(1.0, np.sqrt(chordSq) / 2)))
+
+    def _search(self, query: np.ndarray, limitSq: float, k: int) -> list[tuple[float, int]]:
+        # collects (chordSq, position) within limitSq, keeping only the k closest when k is given
+        found = []  # max-heap on chordSq when k is given
+        stack = [(0, 0.0)]
+        while stack:
+            node, boundSq = stack.pop()
+            if k is not None and len(found) == k:
+                limitSq = min(limitSq, -found[0][0])
+            if boundSq > limitSq:
+                continue
+            dim = self.splitDim[node]
+            if dim == -1:
+                start, end = self.nodeStart[node], self.nodeEnd[node]
+                distSq = ((self.points[start:end] - query) ** 2).sum(axis=1)
+                for position in (np.flatnonzero(distSq <= limitSq) + start).tolist():
+                    entry = float(distSq[position - start])
+                    if k is None:
+                        found.append((entry, position))
+                    elif len(found) < k:
+                        heapq.heappush(found, (-entry, position))
+                    elif entry < -found[0][0]:
+                        heapq.heapreplace(found, (-entry, position))
+                continue
+            diff = float(query[dim]) - self.splitValue[node]
+            near, far = (self.left[node], self.right[node]) if diff < 0 else (self.right[node], self.left[node])
+            stack.append((far, max(boundSq, diff * diff)))
+            stack.append((near, boundSq))
+        if k is not None:
+            found = [(-negSq, position) for negSq, position in found]
+        return found
+
+    def _results(self, found: list) -> list[tuple[float, int]]:
+        results = [(self._toKm(chordSq), int(self.airportIds[position])) for chordSq, position in found]
+        results.sort()
+        return results
+
+    def nearest(self, latitude: float, longitude: float, k: int, radiusKm: float = None) -> list[tuple[float, int]]:
+        # the k closest airports as (distanceKm, airportId), closest first,
+        # optionally only those within radiusKm
+        if k <= 0:
+            return []
+        limitSq = 4.0 if radiusKm is None else self._chordSq(radiusKm)
+        return self._results(self._search(self._unitVector(latitude, longitude), limitSq, k))
+
+    def withinRadius(self, latitude: float, longitude: float, radiusKm: float) -> list[tuple[float, int]]:
+        # every airport within radiusKm as (distanceKm, airportId), closest first
+        return self._results(self._search(self._unitVector(latitude, longitude), self._chordSq(radiusKm), None))
+
+
+_NOT_ALNUM = re.compile(r"[\W_]+")
+
+
+def _searchText(text: str) -> str:
+    # lower case, accents dropped and anything but letters and digits turned
+    # into single spaces, so "Zürich-Kloten" is searched as "zurich kloten"
+    if not text.isascii():
+        text = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+    return " ".join(_NOT_ALNUM.sub(" ", text).lower().split())
+
+
+def _trigrams(text: str) -> set[str]:
+    # every word padded with a space on each side, so word starts and ends count
+    return {padded[i:i + 3] for word in text.split() for padded in (f" {word} ",) for i in range(len(padded) - 2)}
+
+
+class AirportSearchIndex:
+    # Autocomplete over airport name, city, IATA and ICAO, built once at load.
+    # The prefix index is a sorted list of the search text from every word
+    # start on, so "chan" finds "Singapore Changi Airport" and bisect finds
+    # the matching range. If prefixes find fewer than the limit, a trigram
+    # index over name and city fills up with typo-tolerant matches. Results are
+    # ranked by route count, busiest first, as counted when the index was built.
+    SEARCH_FIELDS = ("name", "city", "IATA", "ICAO")
+    FUZZY_FIELDS = ("name", "city")
+    MIN_FUZZY_LENGTH = 3
+    # share of the query trigrams an airport must contain to match fuzzily
+    MIN_SIMILARITY = 0.5
+    # trigrams in more airports than this share, like " ai" from "airport",
+    # say nothing about which airport is meant and are not indexed
+    COMMON_TRIGRAM_SHARE = 0.05
+
+    def __init__(self, airports: AirportTable, routeCounts):
+        self.airports = airports
+        rows = airports.liveRows()
+        # rank 0 is the busiest airport; rankToRow undoes it
+        order = np.lexsort((rows, -np.asarray(routeCounts)[rows]))
+        self.rankToRow = rows[order]
+        rank = np.empty(len(airports.ids), dtype=np.int32)
+        rank[self.rankToRow] = np.arange(len(self.rankToRow), dtype=np.int32)
+        columns = [(field in self.FUZZY_FIELDS, getattr(airports, field)) for field in self.SEARCH_FIELDS]
+        entries = set()
+        postings = {}
+        for row, rowRank in zip(rows.tolist(), rank[rows].tolist()):
+            trigrams = set()
+            for fuzzy, column in columns:
+                text = _searchText(column[row])
+                words = text.split()
+                entries.update((" ".join(words[i:]), row) for i in range(len(words)))
+                if fuzzy:
+                    trigrams |= _trigrams(text)
+            for trigram in trigrams:
+                postings.setdefault(trigram, []).append(rowRank)
+        entries = sorted(entries)
+        self.keys = [key for key, _ in entries]
+        self.keyRanks = rank[np.array([row for _, row in entries], dtype=np.int64)]
+        common = self.COMMON_TRIGRAM_SHARE * len(rows)
+        self.commonTrigrams = {trigram for trigram, ranks in postings.items() if len(ranks) > common}
+        self.postings = {trigram: np.array(ranks, dtype=np.int32) for trigram, ranks in postings.items()
+                         if trigram not in self.commonTrigrams}
+
+    def search(self, text: str, limit: int = AIRPORT_SEARCH_LIMIT) -> list[AirportView]:
+        query = _searchText(text)
+        if not query or limit <= 0:
+            return []
+        start = bisect.bisect_left(self.keys, query)
+        end = bisect.bisect_left(self.keys, query + "\uffff", start)
+        matched = np.zeros(len(self.rankToRow), dtype=bool)
+        matched[self.keyRanks[start:end]] = True
+        ranks = np.flatnonzero(matched)[:limit].astype(np.int32)  # busiest first
+        if len(ranks) < limit and len(query) >= self.MIN_FUZZY_LENGTH:
+            ranks = np.concatenate((ranks, self._fuzzy(query, ranks, limit - len(ranks))))
+        return [AirportView(self.airports, row) for row in self.rankToRow[ranks].tolist()]
+
+    def _fuzzy(self, query: str, exclude: np.ndarray, limit: int) -> np.ndarray:
+        # ranks of up to limit airports sharing the most query trigrams, ties busiest first
+        trigrams = _trigrams(query) - self.commonTrigrams
+        postings = [self.postings[trigram] for trigram in trigrams if trigram in self.postings]
+        if not postings:
+            return np.empty(0, dtype=np.int32)
+        counts = np.bincount(np.concatenate(postings), minlength=len(self.rankToRow))
+        counts[exclude] = 0
+        ranks = np.flatnonzero(counts >= max(self.MIN_SIMILARITY * len(trigrams), 1))
+        return ranks[np.argsort(-counts[ranks], kind="stable")[:limit]].astype(np.int32)
+
+
+class RouteIdMapView(Mapping):
+    # Read-only view of a RouteGraph shaped like the old routeIdMap
+    # (srcId -> dstId -> Route). Route objects are built on access.
+
+    def __init__(self, graph: RouteGraph):
+        self.graph = graph
 
-def main():
+    def __getitem__(self, srcId: int) -> "_OutRoutesView":
+        index = self.graph.idToIndex.get(srcId)
+        if index is None or self.graph.getDegree(index) == 0:
+            raise KeyError(srcId)
+        return _OutRoutesView(self.graph, index)
 
-    #display GUI here first
+    def __iter__(self):
+        for index in np.flatnonzero(np.diff(self.graph.offsets)).tolist():
+            yield int(self.graph.airportIds[index])
 
-    #This is the test function to test functionality of FlightMapRouting.py
+    def __len__(self) -> int:
+        return int(np.count_nonzero(np.diff(self.graph.offsets)))
 
 
-    flight_pathing = readAirportAndRoutes()
-    searchParameter = flight_pathing.createSearchParameter(0.3, 0.7)
-    airportList = list(flight_pathing.idToAirportMap.values())
+class _OutRoutesView(Mapping):
 
-    airport1 = "Tobago-Crown Point Airport"
-    airport2 = "Marau Airport"
-    astarPath = flight_pathing.getShortestPathStr(airport1, airport2, searchParameter, "astar")
-    astarPathId = flight_pathing.astar.shortestPath
-    astarCost = flight_pathing.getTotalCost(astarPathId)
-    astarTime = flight_pathing.getTotalTime(astarPathId)
+    def __init__(self, graph: RouteGraph, srcIndex: int):
+        self.graph = graph
+        self.srcIndex = srcIndex
 
-    print(astarPath)
-    print(astarCost)
-    print(astarTime)
+    def _route(self, edge: int) -> Route:
+        graph = self.graph
+        route = Route(int(graph.airportIds[self.srcIndex]), int(graph.airportIds[graph.targets[edge]]))
+        route.cost = float(graph.cost[edge])
+        route.time = float(graph.time[edge])
+        route.distance = float(graph.distance[edge])
+        return route
 
-    # flight_pathing = readAirportAndRoutes()
-    searchParameter = flight_pathing.createSearchParameter(0.7, 0.3)
-    # airportList = list(flight_pathing.idToAirportMap.values())
+    def __getitem__(self, dstId: int) -> Route:
+        dstIndex = self.graph.idToIndex.get(dstId)
+        edge = -1 if dstIndex is None else self.graph.findEdge(self.srcIndex, dstIndex)
+        if edge == -1:
+            raise KeyError(dstId)
+        return self._route(edge)
 
-    # airport1 = "Tobago-Crown Point Airport"
-    # airport2 = "Marau Airport"
-    astarPath = flight_pathing.getShortestPathStr(airport1, airport2, searchParameter, "astar")
-    astarPathId = flight_pathing.astar.shortestPath
-    astarCost = flight_pathing.getTotalCost(astarPathId)
-    astarTime = flight_pathing.getTotalTime(astarPathId)
+    def __iter__(self):
+        start, end = int(self.graph.offsets[self.srcIndex]), int(self.graph.offsets[self.srcIndex + 1])
+        for dstIndex in self.graph.targets[start:end].tolist():
+            yield int(self.graph.airportIds[dstIndex])
 
-    print(astarPath)
-    print(astarCost)
-    print(astarTime)
+    def __len__(self) -> int:
+        return self.graph.getDegree(self.srcIndex)
 
-    for _ in range(50):
-        airport1 = random.choice(airportList)
-        airport2 = random.choice(airportList)
+    def values(self):
+        start, end = int(self.graph.offsets[self.srcIndex]), int(self.graph.offsets[self.srcIndex + 1])
+        return [self._route(edge) for edge in range(start, end)]
 
-        dijkstraPath = flight_pathing.getShortestPathStr(airport1.name, airport2.name, searchParameter, "dijkstra")
-        astarPath = flight_pathing.getShortestPathStr(airport1.name, airport2.name, searchParameter, "astar")
-        bellmanford = flight_pathing.getShortestPathStr(airport1.name, airport2.name, searchParameter, "bellman-ford")
-        dijkstraNodes = flight_pathing.dijkstra.nodes_visited
-        astarNodes = flight_pathing.astar.nodes_visited
-        bellmanfordNodes = flight_pathing.bellmanford.nodes_visited
 
-        # Cost_dijkstra = flight_pathing.getTotalCost(airport1.name, airport2.name, searchParameter)
-        # Time_dijkstra = flight_pathing.getTotalTime(airport1.name, airport2.name, searchParameter)
+class LoadReport:
+    # What the loader read and what it left out. The skipped dicts map a reason,
+    # e.g. "unknownEndpoint", to the number of rows dropped for it, so a bad
+    # data file shows up as a count instead of silently missing routes.
 
-        if dijkstraPath == []:# or dijkstraWeight == astarWeight:
-            continue
+    def __init__(self):
+        self.airportRows = 0
+        self.routeRows = 0
+        self.duplicateRoutes = 0  # rows that replaced an earlier row for the same route
+        self.skippedAirports = {}
+        self.skippedRoutes = {}
+        self.airlineRows = 0
+        self.skippedAirlines = {}
 
-        print("\nfrom: {0} To: {1}".format(airport1.name, airport2.name))
+    def skipAirport(self, reason: str):
+        self.skippedAirports[reason] = self.skippedAirports.get(reason, 0) + 1
 
-        print("Shortest path for each algorithm")
-        print("Dijkstra:        ", dijkstraPath)
-        print("Astar:           ", astarPath)
-        print("Bellman-Ford:    ", bellmanford)
+    def skipRoute(self, reason: str):
+        self.skippedRoutes[reason] = self.skippedRoutes.get(reason, 0) + 1
 
-        print("Number of nodes visited by each algorithm")
-        print("Dijkstra:     ", dijkstraNodes)
-        print("Astar:        ", astarNodes)
-        print("Bellman-Ford: ", bellmanfordNodes)
+    def skipAirline(self, reason: str):
+        self.skippedAirlines[reason] = self.skippedAirlines.get(reason, 0) + 1
 
+    def asDict(self) -> dict:
+        return {"airportRows": self.airportRows, "routeRows": self.routeRows,
+                "duplicateRoutes": self.duplicateRoutes, "skippedAirports": dict(self.skippedAirports),
+                "skippedRoutes": dict(self.skippedRoutes), "airlineRows": self.airlineRows,
+                "skippedAirlines": dict(self.skippedAirlines)}
 
+    @classmethod
+    def fromDict(cls, values: dict) -> "LoadReport":
+        report = cls()
+        report.airportRows = values.get("airportRows", 0)
+        report.routeRows = values.get("routeRows", 0)
+        report.duplicateRoutes = values.get("duplicateRoutes", 0)
+        report.skippedAirports = dict(values.get("skippedAirports", {}))
+        report.skippedRoutes = dict(values.get("skippedRoutes", {}))
+        report.airlineRows = values.get("airlineRows", 0)
+        report.skippedAirlines = dict(values.get("skippedAirlines", {}))
+        return report
 
-# if __name__ == "__main__":
-#     main()
+
+class FlightPathing:
+    # part of the snapshot key, bump it whenever parsing changes what ends up in the graph
+    LOADER_VERSION = 4
+
+    def __init__(self, airportsFile, routesFile, distanceMode: str = DISTANCE_ELLIPSOIDAL,
+                 useSnapshot: bool = True, snapshotFile: str = None, airlinesFile: str = None,
+                 seed: int = ROUTE_SEED):
+        self.totalAirports = 0
+        # each instance draws from its own generator, so a parse gives the same
+        # graph whether or not other FlightPathings were loaded before it
+        self.random = random.Random(seed)
+        self.airports = AirportTable()
+        self.airlines = AirlineTable()
+        self.graph: RouteGraph = None
+        self.distanceMode = distanceMode
+        # airportsFile may also be a list of sources, merged in order (see parse_airports)
+        airportsFiles = [airportsFile] if isinstance(airportsFile, str) else list(airportsFile)
+        self.loadReport = LoadReport()
+        # the snapshot and airlines.dat sit next to the routes file unless told otherwise
+        self.snapshotFile = snapshotFile or f"{routesFile}.snapshot"
+        if airlinesFile is None:
+            airlinesFile = os.path.join(os.path.dirname(routesFile), "airlines.dat")
+            airlinesFile = airlinesFile if os.path.exists(airlinesFile) else None
+        self.loadTimings = {}  # seconds spent in each load phase, in order
+        clock = perf_counter()
+
+        def phase(name: str):
+            nonlocal clock
+            now = perf_counter()
+            self.loadTimings[name] = now - clock
+            clock = now
+
+        sourceHash = None
+        self.snapshotGraphHash = None  # content hash of the graph in snapshotFile, once read or written
+        if useSnapshot:
+            sourceHash = GraphSnapshot.sourceHash([*airportsFiles, routesFile, *filter(None, [airlinesFile])],
+                                                  distanceMode.upper(), seed,
+                                                  GraphSnapshot.VERSION, self.LOADER_VERSION)
+        self.sourceHash = sourceHash
+        loaded = sourceHash is not None and self._loadSnapshot(sourceHash)
+        phase("snapshotRead")
+        if not loaded:
+            self.parse_airports(airportsFiles)
+            phase("parseAirports")
+            if airlinesFile is not None:
+                self.parse_airlines(airlinesFile)
+                phase("parseAirlines")
+            self.parse_routes(routesFile)
+            phase("parseRoutes")
+            self.median = MedianCostAndTime(self.graph)
+            self.medianCost = self.median.getMedianCost()
+            self.medianTime = self.median.getMedianTime()
+            phase("medians")
+            if sourceHash is not None:
+                self._saveSnapshot(sourceHash)
+                phase("snapshotWrite")
+        self.routeIdMap = RouteIdMapView(self.graph)  # id to route, read-only
+        self.idToAirportMap = AirportIdMapView(self.airports)  # id to airport, read-only
+        self.airportToIdMap = AirportNameMapView(self.airports)  # name to airport, read-only
+        self._buildAirportIndex()
+        phase("airportIndex")
+        self.searchParameter = None
+        self.totalTime = 0
+        self.totalCost = 0
+        self.reverseGraph = self.graph.reversed()
+        phase("reverseGraph")
+        self._buildSearchIndex()
+        phase("searchIndex")
+        self.dijkstra = Dijkstra(self.graph, self.medianCost, self.medianTime, self.reverseGraph)
+        self.astar = Astar(self.airports, self.graph, self.medianCost, self.medianTime)
+        self.bellmanford = bellmanford(self.graph, self.medianCost, self.medianTime)
+        self.alt = ALT(self.airports, self.graph, self.medianCost, self.medianTime,
+                       reverseGraph=self.reverseGraph)
+        # the ALT bounds are tighter than plain A*, which keeps more fronts across route updates
+        self.pareto = ParetoSearch(self.graph, self.alt, self.medianCost, self.medianTime)
+        self.updateLock = threading.Lock()  # one route / airport update at a time
+        # hierarchies are saved beside the graph snapshot, e.g. routes.dat.snapshot.ch-0.3-0.7; after a
+        # live update they are rebuilt in the background while bidirectional Dijkstra answers CH queries
+        self.ch = ContractionHierarchies(self.graph, self.medianCost, self.medianTime,
+                                         self.snapshotFile if useSnapshot else None,
+                                         fallback=self.dijkstra, updateLock=self.updateLock)
+        self.routeCache = RouteCache()
+        self.timetable: "Timetable" = None  # generated on first schedule query, see getTimetable()
+        self.timetableSettings = (TIMETABLE_DAYS, TIMETABLE_SEED)
+        self.queryHooks = ()  # replaced, never mutated, so queries can iterate it while hooks change
+        # getDistanceMatrix() workers, started on first use and stopped by close() or garbage collection
+        self.matrixPool = MatrixWorkerPool()
+        weakref.finalize(self, self.matrixPool.close)
+        phase("engines")
+
+    def _buildAirportIndex(self):
+        rows = self.airports.liveRows()
+        self.airportIndex = AirportIndex(self.airports.ids[rows], self.airports.latitude[rows],
+                                         self.airports.longitude[rows])
+
+    def _buildSearchIndex(self):
+        # rows are graph indices, so the route count of row r is its degree in both directions
+        self.searchIndex = AirportSearchIndex(self.airports,
+                                              np.diff(self.graph.offsets) + np.diff(self.reverseGraph.offsets))
+
+    def parse_airports(self, fileLocations):
+        # Streams each source row by row. Two layouts are understood: OpenFlights
+        # (airports.dat, airports-extended.dat) and DAFIF (airports-dafif.dat).
+        # Sources are merged in order: an airport whose id, or whose ICAO code,
+        # already came from an earlier source is skipped. DAFIF rows carry no id,
+        # so they are added last, under new ids above the largest one seen.
+        if isinstance(fileLocations, str):
+            fileLocations = [fileLocations]
+        report = self.loadReport
+        airportIds = []
+        columns = {field: [] for field in AirportTable.FLOAT_FIELDS + AirportTable.STRING_FIELDS}
+        knownIds = set()
+        knownIcao = set()  # ICAO codes from the sources already merged
+        unnumbered = {}  # ICAO -> DAFIF row waiting for an id
+        for fileLocation in fileLocations:
+            sourceIcao = set()
+            with open(fileLocation, "r", encoding="utf8") as file:
+                for airport in csv.reader(file, delimiter=","):
+                    report.airportRows += 1
+                    if len(airport) == 7:
+                        icao = airport[2]
+                        if not icao or icao in knownIcao or icao in unnumbered:
+                            report.skipAirport("duplicateIcao" if icao else "missingIcao")
+                        else:
+                            unnumbered[icao] = airport
+                        continue
+                    if len(airport) < 14:
+                        report.skipAirport("malformed")
+                        continue
+                    if airport[0] == "\\N":
+                        report.skipAirport("missingId")
+                        continue
+                    if airport[9] == "\\N":
+                        report.skipAirport("missingTimezone")
+                        continue
+                    try:
+                        airportId = int(airport[0])
+                        values = (float(airport[6]), float(airport[7]), float(airport[8]), float(airport[9]))
+                    except ValueError:
+                        report.skipAirport("malformed")
+                        continue
+                    if airportId in knownIds:
+                        report.skipAirport("duplicateId")
+                        continue
+                    icao = airport[5]
+                    if icao in knownIcao:
+                        report.skipAirport("duplicateIcao")
+                        continue
+                    if icao not in ("", "\\N"):
+                        sourceIcao.add(icao)
+                    knownIds.add(airportId)
+                    airportIds.append(airportId)
+                    # name, city, country, IATA, ICAO, latitude, longitude, altitude, timezone, DST, type, source
+                    for field, value in zip(AirportTable.FLOAT_FIELDS, values):
+                        columns[field].append(value)
+                    for field, value in zip(AirportTable.STRING_FIELDS, (*airport[1:6], *airport[11:14])):
+                        columns[field].append(value)
+                    self.totalAirports = max(airportId, self.totalAirports)
+            knownIcao |= sourceIcao
+        for icao, airport in unnumbered.items():
+            if icao in knownIcao:
+                report.skipAirport("duplicateIcao")
+                continue
+            try:
+                # code, name, ICAO, IATA, longitude, latitude, altitude; no city, country or timezone
+                values = (float(airport[5]), float(airport[4]), float(airport[6]), math.nan)
+            except ValueError:
+                report.skipAirport("malformed")
+                continue
+            self.totalAirports += 1
+            airportIds.append(self.totalAirports)
+            for field, value in zip(AirportTable.FLOAT_FIELDS, values):
+                columns[field].append(value)
+            for field, value in zip(AirportTable.STRING_FIELDS,
+                                    (airport[1], "", "", airport[3], icao, "\\N", "airport", "DAFIF")):
+                columns[field].append(value)
+        self.airports = AirportTable(airportIds, columns)
+
+    def parse_airlines(self, fileLocation: str):
+        # airlines.dat: id, name, alias, IATA, ICAO, callsign, country, active
+        report = self.loadReport
+        airlineIds = []
+        columns = {"name": [], "IATA": [], "ICAO": [], "country": [], "active": []}
+        with open(fileLocation, "r", encoding="utf8") as file:
+            for airline in csv.reader(file, delimiter=","):
+                report.airlineRows += 1
+                if len(airline) < 8:
+                    report.skipAirline("malformed")
+                    continue
+                try:
+                    airlineIds.append(int(airline[0]))
+                except ValueError:
+                    report.skipAirline("malformed")
+                    continue
+                for field, value in zip(("name", "IATA", "ICAO", "country"), (airline[1], *airline[3:5], airline[6])):
+                    columns[field].append(value)
+                columns["active"].append(airline[7] == "Y")
+        self.airlines = AirlineTable(airlineIds, columns)
+
+    def parse_routes(self, fileLocation: str):
+        # Streams the routes file, keeping one edge per distinct route plus one
+        # compact carrier row per valid row (airline, codeshare, stops and
+        # equipment), so memory follows the size of the graph, not the file.
+        report = self.loadReport
+        airports = self.airports.idToRow
+        airlines = self.airlines
+        slots = {}  # srcId << 32 | dstId -> route position below, in first-seen order
+        srcIds, dstIds = array("i"), array("i")
+        keptRows = array("q")  # per route, the last valid row for it; that row's cost and time win
+        carrierSlots, carrierAirlines, carrierStops = array("i"), array("i"), array("b")
+        carrierCodeshares = bytearray()
+        carrierEquipment = []
+        validRows = 0
+        with open(fileLocation, "r", encoding="utf8") as file:
+            for route in csv.reader(file, delimiter=","):
+                report.routeRows += 1
+                if len(route) < 6:
+                    report.skipRoute("malformed")
+                    continue
+                if route[3] == "\\N" or route[5] == "\\N":
+                    report.skipRoute("missingId")
+                    continue
+                try:
+                    src_id = int(route[3])
+                    dst_id = int(route[5])
+                except ValueError:
+                    report.skipRoute("malformed")
+                    continue
+                if src_id not in airports or dst_id not in airports:
+                    report.skipRoute("unknownEndpoint")
+                    continue
+                key = src_id << 32 | dst_id
+                slot = slots.get(key)
+                if slot is None:
+                    slots[key] = len(srcIds)
+                    srcIds.append(src_id)
+                    dstIds.append(dst_id)
+                    keptRows.append(validRows)
+                else:
+                    keptRows[slot] = validRows
+                    report.duplicateRoutes += 1
+                carrierSlots.append(slots[key])
+                carrierAirlines.append(airlines.rowForRoute(route[0], route[1]))
+                carrierCodeshares.append(len(route) > 6 and route[6] == "Y")
+                carrierStops.append(int(route[7]) if len(route) > 7 and route[7].isdigit() else 0)
+                carrierEquipment.append(sys.intern(route[8]) if len(route) > 8 else "")
+                validRows += 1
+        del slots
+
+        # all route distances in one vectorised pass over the coordinate columns
+        srcRows = np.array([airports[src_id] for src_id in srcIds], dtype=np.int64)
+        dstRows = np.array([airports[dst_id] for dst_id in dstIds], dtype=np.int64)
+        latitudes, longitudes = self.airports.latitude, self.airports.longitude
+        distances = routeDistances(latitudes[srcRows], longitudes[srcRows], latitudes[dstRows], longitudes[dstRows],
+                                   self.distanceMode).tolist()
+
+        # the random fares and waiting times are drawn once per valid row in file
+        # order, so the graph is the same as drawing them while reading; rows that
+        # a later duplicate replaces still draw, their values are just dropped
+        cost = np.empty(len(srcIds), dtype=np.float64)
+        time = np.empty(len(srcIds), dtype=np.float64)
+        nextRow = 0
+        for slot in sorted(range(len(keptRows)), key=keptRows.__getitem__):
+            for _ in range(keptRows[slot] - nextRow):
+                self._setCost(0.0)
+                self._setTime(0.0)
+            cost[slot] = self._setCost(distances[slot])
+            time[slot] = self._setTime(distances[slot])
+            nextRow = keptRows[slot] + 1
+
+        # carrier rows grouped by route, in file order within each route
+        order = np.argsort(np.frombuffer(carrierSlots, dtype=np.int32), kind="stable")
+        offsets = np.zeros(len(srcIds) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(np.frombuffer(carrierSlots, dtype=np.int32), minlength=len(srcIds)), out=offsets[1:])
+        carriers = RouteCarriers(offsets, np.frombuffer(carrierAirlines, dtype=np.int32)[order],
+                                 np.frombuffer(carrierCodeshares, dtype=bool)[order],
+                                 np.frombuffer(carrierStops, dtype=np.int8)[order],
+                                 [carrierEquipment[row] for row in order.tolist()])
+        self.graph = RouteGraph.fromArrays(self.airports.ids.tolist(), srcIds, dstIds, cost, time, distances,
+                                           carriers)
+
+    def _saveSnapshot(self, sourceHash: str):
+        airports = self.airports  # rows in the same order as the graph indices
+        arrays = self._graphArrays(self.graph)
+        for field in AirportTable.FLOAT_FIELDS:
+            arrays[field] = getattr(airports, field)
+        for field in AirportTable.STRING_FIELDS:
+            arrays[field] = GraphSnapshot.packStrings(getattr(airports, field))
+        airlines = self.airlines
+        arrays.update({"airlineId": airlines.ids, "airlineActive": airlines.active})
+        for field in AirlineTable.STRING_FIELDS:
+            arrays[f"airline{field[0].upper()}{field[1:]}"] = GraphSnapshot.packStrings(getattr(airlines, field))
+        graphHash = self.graph.contentHash()
+        metadata = {"sourceHash": sourceHash, "graphHash": graphHash, "distanceMode": self.distanceMode.upper(),
+                    "totalAirports": self.totalAirports, "medianCost": self.medianCost,
+                    "medianTime": self.medianTime, "loadReport": self.loadReport.asDict()}
+        try:
+            GraphSnapshot.write(self.snapshotFile, metadata, arrays)
+        except OSError:
+            return  # a read-only data directory only costs the next start a re-parse
+        self.snapshotGraphHash = graphHash
+
+    def _loadSnapshot(self, sourceHash: str) -> bool:
+        snapshot = GraphSnapshot.read(self.snapshotFile, sourceHash)
+        if snapshot is None:
+            return False
+        arrays = snapshot.arrays
+        airportIds = arrays["airportId"]
+        count = len(airportIds)
+        columns = {field: arrays[field] for field in AirportTable.FLOAT_FIELDS}
+        for field in AirportTable.STRING_FIELDS:
+            columns[field] = GraphSnapshot.unpackStrings(arrays[field], count)
+        self.airports = AirportTable(airportIds, columns)
+        self.graph = self._graphFromArrays(arrays)
+        airlineCount = len(arrays["airlineId"])
+        columns = {field: GraphSnapshot.unpackStrings(arrays[f"airline{field[0].upper()}{field[1:]}"], airlineCount)
+                   for field in AirlineTable.STRING_FIELDS}
+        columns["active"] = arrays["airlineActive"]
+        self.airlines = AirlineTable(arrays["airlineId"], columns)
+        self.totalAirports = snapshot.metadata["totalAirports"]
+        self.median = None  # the medians come straight from the snapshot
+        self.medianCost = snapshot.metadata["medianCost"]
+        self.medianTime = snapshot.metadata["medianTime"]
+        self.loadReport = LoadReport.fromDict(snapshot.metadata.get("loadReport", {}))
+        self.snapshotGraphHash = snapshot.metadata.get("graphHash")
+        return True
+
+    @staticmethod
+    def _graphArrays(graph: "RouteGraph") -> dict:
+        # the route graph and its carriers as snapshot arrays, see _graphFromArrays()
+        carriers = graph.carriers
+        return {"offsets": graph.offsets, "targets": graph.targets, "cost": graph.cost, "time": graph.time,
+                "distance": graph.distance, "airportId": graph.airportIds,
+                "carrierOffsets": carriers.offsets, "carrierAirline": carriers.airline,
+                "carrierCodeshare": carriers.codeshare, "carrierStops": carriers.stops,
+                "carrierEquipment": GraphSnapshot.packStrings(carriers.equipment)}
+
+    @staticmethod
+    def _graphFromArrays(arrays: dict) -> "RouteGraph":
+        graph = RouteGraph(arrays["airportId"], arrays["offsets"], arrays["targets"], arrays["cost"],
+                           arrays["time"], arrays["distance"])
+        carrierCount = len(arrays["carrierAirline"])
+        graph.carriers = RouteCarriers(arrays["carrierOffsets"], arrays["carrierAirline"],
+                                       arrays["carrierCodeshare"], arrays["carrierStops"],
+                                       GraphSnapshot.unpackStrings(arrays["carrierEquipment"], carrierCount))
+        return graph
+
+    def _setTime(self, dist: float) -> float:
+        waitingTime = round(self.random.uniform(0.5, 4), 2)
+        travellingTime = dist / AIRCRAFT_SPEED
+        return waitingTime + travellingTime
+
+    def _setCost(self, dist: float) -> float:
+        baseFare = round(self.random.uniform(100, 200), 2)
+        fuelCost = round(self.random.uniform(12.7, 17.68), 2) / PASSENGER_SIZE_747 * dist * KM_TO_MILE
+        return baseFare + fuelCost
+
+    def getTotalAirports(self):
+        return self.totalAirports
+
+    def createSearchParameter(self, cost: float, time: float, airlines: AirlineFilter = None) -> SearchParameter:
+        return SearchParameter(cost, time, airlines)
+
+    def airlineFilter(self, include=None, exclude=None, alliances=None, activeOnly: bool = False) -> AirlineFilter:
+        # Airlines a search may fly, for createSearchParameter(). Airlines are
+        # given by OpenFlights id or IATA / ICAO code and alliances by name from
+        # AIRLINE_ALLIANCES. include and alliances together name the allowed
+        # airlines (all of them when neither is given); exclude then removes some.
+        airlines = self.airlines
+
+        def rows(names, kind: str) -> list[int]:
+            found = []
+            for name in names:
+                row = airlines.find(name)
+                if row is None:
+                    raise TypeError(f"Method airlineFilter(): unknown {kind} {name!r}")
+                found.append(row)
+            return found
+
+        if include is None and alliances is None:
+            allowed = np.ones(len(airlines), dtype=bool)
+        else:
+            allowed = np.zeros(len(airlines), dtype=bool)
+            allowed[rows(include or (), "airline")] = True
+            for alliance in alliances or ():
+                if alliance not in AIRLINE_ALLIANCES:
+                    raise TypeError(f"Method airlineFilter(): unknown alliance {alliance!r}")
+                members = [airlines.find(code) for code in AIRLINE_ALLIANCES[alliance]]
+                allowed[[row for row in members if row is not None]] = True
+        allowed[rows(exclude or (), "airline")] = False
+        if activeOnly:
+            allowed &= airlines.active
+        return AirlineFilter(allowed)
+
+    def getRouteCarriers(self, srcId: int, dstId: int) -> list[RouteCarrier]:
+        # the airlines flying srcId -> dstId, empty if there is no such route
+        graph = self.graph
+        srcIndex, dstIndex = graph.idToIndex.get(srcId), graph.idToIndex.get(dstId)
+        edge = -1 if srcIndex is None or dstIndex is None else graph.findEdge(srcIndex, dstIndex)
+        if edge < 0:
+            return []
+        carriers, airlines = graph.carriers, self.airlines
+        result = []
+        for row in range(int(carriers.offsets[edge]), int(carriers.offsets[edge + 1])):
+            airline = int(carriers.airline[row])
+            equipment = carriers.equipment[row]
+            result.append(RouteCarrier(int(airlines.ids[airline]), airlines.code(airline), airlines.name[airline],
+                                       bool(carriers.codeshare[row]), int(carriers.stops[row]),
+                                       tuple(equipment.split()) if equipment else ()))
+        return result
+
+    def _idPathToAirport(self, shortestPath: list[int]) -> list[Airport]:
+        airports = []
+        if shortestPath is not None:
+            for id in shortestPath:
+                airports.append(self.airports.get(id).name)
+        return airports
+
+    # returns airport objects in a list
+    def _idPathtoAirportObjects(self, shortestPath: list[int]) -> list[Airport]:
+        airports = []
+        if shortestPath is not None:
+            for id in shortestPath:
+                airports.append(self.airports.get(id))
+        return airports
+
+    def _airportPathToId(self, shortestPath: list[str]) -> list[int]:
+        if shortestPath is None:
+            return None
+        airports = []
+        for airport in shortestPath:
+            airports.append(self.airportToIdMap.get(airport).airportId)
+        return airports
+
+    def query(self, srcAirport: str | int, dstAirport: str | int, searchParameter: SearchParameter,
+              algorithm: str = "DIJKSTRA") -> "RouteResult":
+        # Stateless route query: reads the graph, never writes to it or to the
+        # engines' shortestPath / nodes_visited, so one FlightPathing can serve
+        # queries from several threads at once. Every registered query hook is
+        # called with the result.
+        start = perf_counter()
+        # Check for valid algorithm: dijkstra/bidirectional-dijkstra/astar/bellmanford/alt/ch/pareto
+        algorithm = algorithm.upper()
+        if algorithm not in ("DIJKSTRA", "BIDIRECTIONAL-DIJKSTRA", "ASTAR", "BELLMAN-FORD", "ALT", "CH", "PARETO"):
+            raise TypeError("No such algorithm supported.")
+
+        # get airport id
+        srcId = self._airportId(srcAirport, "query")
+        dstId = self._airportId(dstAirport, "query")
+
+        self.routeCache.bind(self.graph)
+        key = self.routeCache.key(srcId, dstId, algorithm, searchParameter)
+        shortestPathId = self.routeCache.get(key, [])
+        stats = QueryStats()
+        cached = shortestPathId != []
+        if cached:
+            stats.cacheHits += 1
+        else:
+            # get the shortest path
+            if algorithm == "ASTAR":
+                shortestPathId = self.astar.findPath(srcId, dstId, searchParameter, stats)
+            elif algorithm == "BELLMAN-FORD":
+                shortestPathId = self.bellmanford.findPath(srcId, dstId, searchParameter, stats)
+            elif algorithm == "DIJKSTRA":
+                shortestPathId = self.dijkstra.findPath(srcId, dstId, searchParameter, stats)
+            elif algorithm == "BIDIRECTIONAL-DIJKSTRA":
+                shortestPathId = self.dijkstra.findPath(srcId, dstId, searchParameter, stats, bidirectional=True)
+            elif algorithm == "ALT":
+                shortestPathId = self.alt.findPath(srcId, dstId, searchParameter, stats)
+            elif algorithm == "CH" and searchParameter.airlines is not None:
+                # hierarchies are built over every route; a filtered search runs bidirectionally instead
+                shortestPathId = self.dijkstra.findPath(srcId, dstId, searchParameter, stats, bidirectional=True)
+            elif algorithm == "CH":
+                shortestPathId = self.ch.findPath(srcId, dstId, searchParameter, stats)
+            elif algorithm == "PARETO":
+                shortestPathId = self.pareto.findPath(srcId, dstId, searchParameter, stats)
+            shortestPathId = tuple(shortestPathId) if shortestPathId is not None else None
+            self.routeCache.put(key, shortestPathId)
+
+        path = shortestPathId or ()
+        totalCost, totalTime = float(self.getTotalCost(path)), float(self.getTotalTime(path))
+        stats.wallTime = perf_counter() - start
+        result = RouteResult(srcId, dstId, algorithm, searchParameter.cost, searchParameter.time, path,
+                             totalCost, totalTime, stats.nodesVisited, cached, stats.freeze())
+        for hook in self.queryHooks:
+            hook(result)
+        return result
+
+    def addQueryHook(self, hook):
+        # hook(result: RouteResult) runs after every query(), on the querying
+        # thread; with no hooks registered nothing extra happens per query
+        self.queryHooks = self.queryHooks + (hook,)
+
+    def removeQueryHook(self, hook):
+        self.queryHooks = tuple(registered for registered in self.queryHooks if registered is not hook)
+
+    def getShortestPathId(self, srcAirport: str | int, dstAirport: str | int, searchParameter: SearchParameter, algorithm: str) -> list[int]:
+        return list(self.query(srcAirport, dstAirport, searchParameter, algorithm).path)
+
+    def getShortestPathStr(self, srcAirport: str | int, dstAirport: str | int, searchParameter: SearchParameter, algorithm: str):
+        calculatedPathId = self.getShortestPathId(srcAirport, dstAirport, searchParameter, algorithm)
+        return self._idPathToAirport(calculatedPathId)
+
+    # returns airport objects in a list
+    def getShortestPathWithObjects(self, srcAirport: str | int, dstAirport: str | int, searchParameter: SearchParameter, algorithm: str):
+        calculatedPathId = self.getShortestPathId(srcAirport, dstAirport, searchParameter, algorithm)
+        return self._idPathtoAirportObjects(calculatedPathId)
+    
+    def getParetoFront(self, srcAirport: str | int, dstAirport: str | int) -> "ParetoFront":
+        srcId = self._airportId(srcAirport, "getParetoFront")
+        dstId = self._airportId(dstAirport, "getParetoFront")
+        return self.pareto.getParetoFront(srcId, dstId)
+
+    def getDistanceMatrix(self, srcAirports: list[str | int], dstAirports: list[str | int],
+                          searchParameter: SearchParameter, withPaths: bool = False,
+                          processes: int = None) -> "DistanceMatrix":
+        # One-to-many Dijkstra from every source, stopping once all targets are
+        # settled. With more than one process the sources are split into chunks
+        # over the process pool of _matrixExecutor(), kept between calls.
+        ids = [[self._airportId(airport, "getDistanceMatrix") for airport in airports]
+               for airports in (srcAirports, dstAirports)]
+        srcIndices = [self.graph.idToIndex[srcId] for srcId in ids[0]]
+        dstIndices = [self.graph.idToIndex[dstId] for dstId in ids[1]]
+
+        processes = processes or os.cpu_count() or 1
+        processes = min(processes, len(srcIndices))
+        if processes <= 1:
+            rows = [self.dijkstra.oneToMany(srcIndex, dstIndices, searchParameter, withPaths)
+                    for srcIndex in srcIndices]
+        else:
+            chunkCount = min(len(srcIndices), processes * MATRIX_CHUNKS_PER_PROCESS)
+            chunks = [srcIndices[i::chunkCount] for i in range(chunkCount)]
+            with self.matrixPool.lock:
+                # submitted under the lock, so a later call cannot replace the pool before the chunks are queued
+                executor = self._matrixExecutor(processes)
+                chunkRows = executor.map(_matrixRows, [(chunk, dstIndices, searchParameter, withPaths)
+                                                       for chunk in chunks])
+            chunkRows = list(chunkRows)
+            # undo the round-robin split
+            rows = [None] * len(srcIndices)
+            for i, chunkRow in enumerate(chunkRows):
+                rows[i::chunkCount] = chunkRow
+        return DistanceMatrix(ids[0], ids[1], rows, withPaths)
+
+    def _matrixExecutor(self, processes: int) -> ProcessPoolExecutor:
+        # Called with matrixPool.lock held. The pool is reused until the graph
+        # content hash or the process count changes. Workers map a snapshot
+        # file rather than unpickling the graph: snapshotFile while the graph
+        # is still the one it holds, otherwise a temporary snapshot of the
+        # current graph, written under updateLock so a concurrent route update
+        # cannot leave it half applied.
+        with self.updateLock:
+            graphHash = self.graph.contentHash()
+            if self.matrixPool.key == (graphHash, processes):
+                return self.matrixPool.executor
+            tempFile = None
+            onDisk = graphHash == self.snapshotGraphHash
+            if onDisk and GraphSnapshot.read(self.snapshotFile, self.sourceHash) is not None:
+                fileLocation, snapshotKey = self.snapshotFile, self.sourceHash
+            else:
+                descriptor, tempFile = tempfile.mkstemp(prefix="flightmap-matrix-", suffix=".snapshot")
+                os.close(descriptor)
+                GraphSnapshot.write(tempFile, {"sourceHash": graphHash}, self._graphArrays(self.graph))
+                fileLocation, snapshotKey = tempFile, graphHash
+            medians = (self.medianCost, self.medianTime)
+        self.matrixPool.close()  # waits for chunks other calls already queued
+        self.matrixPool.start((graphHash, processes), processes, (fileLocation, snapshotKey, *medians), tempFile)
+        return self.matrixPool.executor
+
+    def close(self):
+        # stops the distance matrix workers; the instance stays usable and starts new ones on demand
+        with self.matrixPool.lock:
+            self.matrixPool.close()
+
+    def __enter__(self) -> "FlightPathing":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def getShortestPathsFrom(self, srcAirport: str | int, dstAirports: list[str | int],
+                             searchParameter: SearchParameter) -> dict[str, list[int]]:
+        # many destinations from one origin: one full search from srcAirport,
+        # kept for later calls, then each path is read off the tree
+        srcId = self._airportId(srcAirport, "getShortestPathsFrom")
+        shortestPaths = {}
+        for dstAirport in dstAirports:
+            dstId = self._airportId(dstAirport, "getShortestPathsFrom")
+            shortestPaths[dstAirport] = self.dijkstra.findPathFromTree(srcId, dstId, searchParameter)
+        return shortestPaths
+
+    def getAlternativePath(self, srcAirport: str | int, dstAirport: str | int, searchParameter: SearchParameter,
+                           k: int = NEAREST_AIRPORT_COUNT, radiusKm: float = NEAREST_AIRPORT_RADIUS_KM):
+        return self._idPathToAirport(self.getAlternativePathId(srcAirport, dstAirport, searchParameter, k, radiusKm))
+
+    def getAlternativePathId(self, srcAirport: str | int, dstAirport: str | int, searchParameter: SearchParameter,
+                             k: int = NEAREST_AIRPORT_COUNT, radiusKm: float = NEAREST_AIRPORT_RADIUS_KM) -> list[int]:
+        # lightest route from any of the k airports nearest srcAirport to any
+        # of those nearest dstAirport, as airport ids
+        srcIds = self.getNearestAirport(srcAirport, k, radiusKm)
+        dstIds = self.getNearestAirport(dstAirport, k, radiusKm)
+
+        self.routeCache.bind(self.graph)
+        key = self.routeCache.key(srcIds, dstIds, "DIJKSTRA-SETS", searchParameter)
+        shortestPathId = self.routeCache.get(key, [])
+        if shortestPathId == []:
+            shortestPathId = self.dijkstra._dijkstraWithSets(srcIds, dstIds, searchParameter,
+                                                             self.reverseGraph is not None)
+            shortestPathId = tuple(shortestPathId) if shortestPathId is not None else None
+            self.routeCache.put(key, shortestPathId)
+        return list(shortestPathId) if shortestPathId is not None else None
+
+    def getShortestPathWithinHops(self, srcAirport: str | int, dstAirport: str | int, searchParameter: SearchParameter,
+                                  maxHops: int) -> list[int]:
+        # Lightest route of at most maxHops flights, i.e. at most maxHops - 1
+        # connections, as airport ids; None if there is none. A route flown
+        # with intermediate stops counts one flight per leg.
+        if maxHops < 1:
+            raise TypeError("Method getShortestPathWithinHops(): maxHops must be at least 1")
+        srcId = self._airportId(srcAirport, "getShortestPathWithinHops")
+        dstId = self._airportId(dstAirport, "getShortestPathWithinHops")
+
+        self.routeCache.bind(self.graph)
+        key = self.routeCache.key(srcId, dstId, f"HOPS-{maxHops}", searchParameter)
+        shortestPathId = self.routeCache.get(key, [])
+        if shortestPathId == []:
+            shortestPathId = self.bellmanford.findPathWithinHops(srcId, dstId, searchParameter, maxHops)
+            shortestPathId = tuple(shortestPathId) if shortestPathId is not None else None
+            self.routeCache.put(key, shortestPathId)
+        return list(shortestPathId) if shortestPathId is not None else None
+
+    def getShortestPathsByHops(self, srcAirport: str | int, dstAirport: str | int, searchParameter: SearchParameter,
+                               maxHops: int) -> list[list[int]]:
+        # entry h - 1 is the lightest route of at most h flights (or None), for
+        # every h up to maxHops, all from one search
+        if maxHops < 1:
+            raise TypeError("Method getShortestPathsByHops(): maxHops must be at least 1")
+        srcId = self._airportId(srcAirport, "getShortestPathsByHops")
+        dstId = self._airportId(dstAirport, "getShortestPathsByHops")
+        return self.bellmanford.findPathsByHops(srcId, dstId, searchParameter, maxHops)
+
+    # Schedule-based routing. The timetable is generated from the routes by a
+    # reproducible frequency model (Timetable.generate) unless a schedule file
+    # is loaded. Times are minutes from 00:00 UTC on the first day.
+
+    def generateTimetable(self, days: int = TIMETABLE_DAYS, seed: int = TIMETABLE_SEED) -> "Timetable":
+        with self.updateLock:
+            self.timetableSettings = (days, seed)
+            self.timetable = Timetable.generate(self.graph, self.airports, days, seed)
+            return self.timetable
+
+    def loadTimetable(self, fileLocation: str, days: int = TIMETABLE_DAYS) -> "Timetable":
+        # replaces the generated flights with a schedule file, see Timetable.load
+        with self.updateLock:
+            self.timetable = Timetable.load(fileLocation, self.airports, self.airlines, days)
+            return self.timetable
+
+    def getTimetable(self) -> "Timetable":
+        timetable = self.timetable
+        if timetable is None:
+            with self.updateLock:
+                if self.timetable is None:
+                    self.timetable = Timetable.generate(self.graph, self.airports, *self.timetableSettings)
+                timetable = self.timetable
+        return timetable
+
+    def _journey(self, timetable: "Timetable", connections: list[int]) -> list[Connection]:
+        journey = []
+        for connection in connections:
+            airline = int(timetable.airline[connection])
+            journey.append(Connection(int(self.graph.airportIds[timetable.depStop[connection]]),
+                                      int(self.graph.airportIds[timetable.arrStop[connection]]),
+                                      int(timetable.depTime[connection]), int(timetable.arrTime[connection]),
+                                      self.airlines.code(airline) if airline != -1 else ""))
+        return journey
+
+    def getEarliestArrival(self, srcAirport: str | int, dstAirport: str | int, departAfter: int = 0,
+                           airlines: AirlineFilter = None) -> list[Connection]:
+        # the flights of the journey that lands first, leaving no earlier than
+        # departAfter and keeping every minimum connection time; None if the
+        # timetable has no such journey
+        srcIndex = self.graph.idToIndex[self._airportId(srcAirport, "getEarliestArrival")]
+        dstIndex = self.graph.idToIndex[self._airportId(dstAirport, "getEarliestArrival")]
+        timetable = self.getTimetable()
+        connections = ConnectionScan(timetable).earliestArrival(srcIndex, dstIndex, departAfter, airlines)
+        return None if connections is None else self._journey(timetable, connections)
+
+    def getProfile(self, srcAirport: str | int, dstAirport: str | int, start: int = 0, end: int = MINUTES_PER_DAY,
+                   airlines: AirlineFilter = None) -> list[list[Connection]]:
+        # every journey leaving between start and end that is not beaten by one
+        # leaving later and landing no later, earliest departure first
+        srcIndex = self.graph.idToIndex[self._airportId(srcAirport, "getProfile")]
+        dstIndex = self.graph.idToIndex[self._airportId(dstAirport, "getProfile")]
+        timetable = self.getTimetable()
+        journeys = ConnectionScan(timetable).profile(srcIndex, dstIndex, start, end, airlines)
+        return [self._journey(timetable, connections) for connections in journeys]
+
+    def getKShortestPaths(self, srcAirport: str | int, dstAirport: str | int, searchParameter: SearchParameter,
+                          k: int = POSSIBLE_ROUTE_COUNT):
+        # Up to k different routes without repeated airports, lightest first, as
+        # airport id lists. Lazy: each route is only searched for when asked
+        # for, so the first is ready after a single query. k=None lists them all.
+        srcId = self._airportId(srcAirport, "getKShortestPaths")
+        dstId = self._airportId(dstAirport, "getKShortestPaths")
+        return islice(self.dijkstra.kShortestPaths(srcId, dstId, searchParameter), k)
+
+    def getNearestAirport(self, srcAirportName: str | int, k: int = NEAREST_AIRPORT_COUNT,
+                          radiusKm: float = NEAREST_AIRPORT_RADIUS_KM) -> frozenset[int]:
+        # ids of up to k airports within radiusKm of srcAirportName, including itself
+        srcAirport = self.airports.get(self._airportId(srcAirportName, "getNearestAirport"))
+        nearest = self.findNearestAirports(srcAirport.latitude, srcAirport.longitude, k, radiusKm)
+        return frozenset(airportId for _, airportId in nearest)
+
+    def findNearestAirports(self, latitude: float, longitude: float, k: int,
+                            radiusKm: float = None) -> list[tuple[float, int]]:
+        # (distanceKm, airportId) of the k airports closest to a coordinate, closest first
+        return self.airportIndex.nearest(latitude, longitude, k, radiusKm)
+
+    def findAirportsWithinRadius(self, latitude: float, longitude: float, radiusKm: float) -> list[tuple[float, int]]:
+        # (distanceKm, airportId) of every airport within radiusKm of a coordinate, closest first
+        return self.airportIndex.withinRadius(latitude, longitude, radiusKm)
+
+    def searchAirports(self, text: str, limit: int = AIRPORT_SEARCH_LIMIT) -> list[AirportView]:
+        # airports whose name, city, IATA or ICAO code matches text, for autocomplete
+        return self.searchIndex.search(text, limit)
+
+    def findAirport(self, airport) -> AirportView:
+        # The airport given by OpenFlights id, IATA or ICAO code, or name; None
+        # if there is none. Every route entry point accepts all of these. Names
+        # repeat in OpenFlights ("Newcastle Airport" is three airports), so a
+        # name that several airports share raises rather than picking one.
+        return self._findAirport(airport, "findAirport")
+
+    def _findAirport(self, airport, method: str) -> AirportView:
+        if airport is None:
+            raise TypeError(f"Method {method}(): airport cannot be None")
+        if isinstance(airport, (int, np.integer)):
+            return self.airports.get(int(airport))
+        named = self.airports.byName(airport)
+        if len(named) > 1:
+            raise TypeError(f"Method {method}(): {len(named)} airports are named {airport!r} (ids "
+                            f"{', '.join(str(match.airportId) for match in named)}); give an id, IATA or ICAO code")
+        return named[0] if named else self.airports.byCode(airport)
+
+    def _airportId(self, airport, method: str) -> int:
+        found = self._findAirport(airport, method)
+        if found is None:
+            raise TypeError(f"Method {method}(): no airport {airport!r}")
+        return found.airportId
+
+    def existsByAirportName(self, airportName: str) -> bool:
+        if airportName is None:
+            raise TypeError("Method existByAirportName(): Airport name cannot be None")
+        return airportName in self.airportToIdMap
+
+    def existsByAirportId(self, airportName: int) -> bool:
+        if airportName is None:
+            raise TypeError("Method existByAirportId(): Airport name cannot be None")
+        return airportName in self.airports
+
+    def _calculateTotalMetric(self, routePathId: list[int], metric: str) -> float:
+        totalMetric = 0
+
+        if routePathId is not None:
+            for i in range(1, len(routePathId)):
+                currIndex = self.graph.idToIndex[routePathId[i - 1]]
+                nextIndex = self.graph.idToIndex[routePathId[i]]
+                edge = self.graph.findEdge(currIndex, nextIndex)
+                if metric == "cost":
+                    totalMetric += float(self.graph.cost[edge])
+                elif metric == "time":
+                    totalMetric += float(self.graph.time[edge])
+        return totalMetric
+
+    def getTotalCost(self, routePathId: list[int]) -> float:
+        return self._calculateTotalMetric(routePathId, "cost")
+
+    def getTotalTime(self, routePathId: list[int]) -> float:
+        return self._calculateTotalMetric(routePathId, "time")
+
+    # Live updates. Each one changes the graph in place and keeps the medians
+    # and every engine's caches current, dropping only the cached routes, trees,
+    # landmark tables and Pareto fronts the change can affect. Updates are
+    # serialised with each other but not with queries, so apply them between
+    # queries. They are not written back to the data files or the snapshot.
+
+    def setRoute(self, srcId: int, dstId: int, cost: float, time: float):
+        # adds the route srcId -> dstId, or reprices it if it already exists
+        with self.updateLock:
+            if not self.existsByAirportId(srcId) or not self.existsByAirportId(dstId):
+                raise TypeError("Method setRoute(): srcId / dstId is not a known airport")
+            self._trackMedians()
+            graph = self.graph
+            srcIndex, dstIndex = graph.idToIndex[srcId], graph.idToIndex[dstId]
+            edge = graph.findEdge(srcIndex, dstIndex)
+            if edge != -1:
+                distance = float(graph.distance[edge])
+            else:
+                airports = self.airports
+                distance = float(routeDistances(airports.latitude[[srcIndex]], airports.longitude[[srcIndex]],
+                                                airports.latitude[[dstIndex]], airports.longitude[[dstIndex]],
+                                                self.distanceMode)[0])
+            cost, time = float(cost), float(time)
+            old = graph.setRoute(srcIndex, dstIndex, cost, time, distance)
+            self.reverseGraph.setRoute(dstIndex, srcIndex, cost, time, distance)
+            self._routeChanged(srcIndex, dstIndex, old, (cost, time))
+
+    def removeRoute(self, srcId: int, dstId: int) -> bool:
+        # returns False if there was no such route
+        with self.updateLock:
+            if not self.existsByAirportId(srcId) or not self.existsByAirportId(dstId):
+                raise TypeError("Method removeRoute(): srcId / dstId is not a known airport")
+            return self._removeRoute(self.graph.idToIndex[srcId], self.graph.idToIndex[dstId])
+
+    def _removeRoute(self, srcIndex: int, dstIndex: int) -> bool:
+        self._trackMedians()
+        old = self.graph.removeRoute(srcIndex, dstIndex)
+        if old is None:
+            return False
+        self.reverseGraph.removeRoute(dstIndex, srcIndex)
+        self._routeChanged(srcIndex, dstIndex, old, None)
+        return True
+
+    def addAirport(self, airport: Airport):
+        # the airport starts without routes; add them with setRoute()
+        with self.updateLock:
+            if airport is None or self.existsByAirportId(airport.airportId):
+                raise TypeError("Method addAirport(): airport cannot be None or an existing airport id")
+            index = self.graph.addAirport(airport.airportId)
+            self.reverseGraph.addAirport(airport.airportId)
+            self.airports.append(airport)  # lands on the row matching index
+            self.totalAirports = max(self.totalAirports, airport.airportId)
+            for engine in (self.dijkstra, self.astar, self.alt, self.bellmanford, self.pareto, self.ch):
+                engine.airportAdded(index, airport)
+            if self.timetable is not None:
+                self.timetable.addAirport()
+            self._buildAirportIndex()
+            self._buildSearchIndex()
+
+    def removeAirport(self, airportId: int):
+        # Removes every route to and from the airport, then the airport. Its
+        # graph index stays behind without routes, so other indices keep their meaning.
+        with self.updateLock:
+            if not self.existsByAirportId(airportId):
+                raise TypeError("Method removeAirport(): airportId is not a known airport")
+            index = self.graph.idToIndex[airportId]
+            for graph, outgoing in ((self.graph, True), (self.reverseGraph, False)):
+                start, end = int(graph.offsets[index]), int(graph.offsets[index + 1])
+                for other in graph.targets[start:end].tolist():
+                    if outgoing:
+                        self._removeRoute(index, other)
+                    else:
+                        self._removeRoute(other, index)
+            self.airports.remove(airportId)
+            self._buildAirportIndex()
+            self._buildSearchIndex()
+
+    def _trackMedians(self):
+        # a snapshot load takes the medians as stored; sort once before the first update
+        if self.median is None:
+            self.median = MedianCostAndTime(self.graph)
+
+    def _routeChanged(self, srcIndex: int, dstIndex: int, old: tuple, new: tuple):
+        if old == new:
+            return
+        if old is not None:
+            self.median.remove(*old)
+        if new is not None:
+            self.median.add(*new)
+        # the A* / ALT bounds go first: ParetoSearch and the route cache check against them
+        for engine in (self.astar, self.alt, self.dijkstra, self.bellmanford, self.pareto, self.ch):
+            engine.routeChanged(srcIndex, dstIndex, old, new)
+        self._invalidateRoutes(srcIndex, dstIndex, old, new)
+        self._refreshMedians()
+        # flights follow routes, not prices: only an added or removed route changes the timetable
+        if self.timetable is not None and (old is None or new is None):
+            if self.timetable.generated:
+                self.timetable = None  # regenerated on next use; the other routes keep their flights
+            elif new is None:
+                self.timetable.removeRoute(srcIndex, dstIndex)
+
+    def _invalidateRoutes(self, srcIndex: int, dstIndex: int, old: tuple, new: tuple):
+        # Cached routes that use the changed route are dropped if it got dearer
+        # or went away. A new or cheaper route can only displace a cached
+        # path if the best conceivable path through it, using the ALT lower
+        # bounds to and from it, beats that path.
+        graph = self.graph
+        routeSrcId, routeDstId = int(graph.airportIds[srcIndex]), int(graph.airportIds[dstIndex])
+        worse, better = _routeGotWorse(old, new), _routeGotBetter(old, new)
+        step = self.routeCache.weightStep
+
+        def weight(values: tuple, searchParameter: SearchParameter) -> float:
+            return routeWeight(*values, self.medianCost, self.medianTime, searchParameter)
+
+        def indices(airports) -> list[int]:
+            # the key holds one airport id, or a set of them for DIJKSTRA-SETS
+            airports = airports if isinstance(airports, frozenset) else (airports,)
+            return [graph.idToIndex[airportId] for airportId in airports]
+
+        suspects = {}  # SearchParameter -> [(key, path weight)], for the exact check below
+
+        def stale(key: tuple, path: tuple) -> bool:
+            if path and _usesRoute(path, routeSrcId, routeDstId):
+                return worse
+            if not better:
+                return False
+            if not path:
+                return True
+            searchParameter = SearchParameter(key[3] * step, key[4] * step, key[5])
+            if searchParameter.cost < 0 or searchParameter.time < 0:
+                return True  # the lower bounds only hold for non-negative weights
+            bound = (min(self.alt.weightBound(index, srcIndex, searchParameter) for index in indices(key[0]))
+                     + weight(new, searchParameter)
+                     + min(self.alt.weightBound(dstIndex, index, searchParameter) for index in indices(key[1])))
+            pathWeight = 0.0
+            for a, b in zip(path, path[1:]):
+                edge = graph.findEdge(graph.idToIndex[a], graph.idToIndex[b])
+                pathWeight += weight((float(graph.cost[edge]), float(graph.time[edge])), searchParameter)
+            # the cache key rounds the weights, so leave a little room
+            if bound < pathWeight * (1 + 1e-6):
+                suspects.setdefault(searchParameter, []).append((key, pathWeight))
+            return False
+
+        self.routeCache.invalidateWhere(stale)
+        # The bounds cannot clear every path, so the rest are checked against
+        # the real distances to and from the route, searched only as far as
+        # the heaviest of those paths.
+        for searchParameter, entries in suspects.items():
+            maxWeight = max(pathWeight for _, pathWeight in entries) * (1 + 1e-6) - weight(new, searchParameter)
+            toRoute = self.dijkstra._oneToAll([srcIndex], searchParameter, graph=self.reverseGraph,
+                                              maxWeight=maxWeight)[0]
+            fromRoute = self.dijkstra._oneToAll([dstIndex], searchParameter, maxWeight=maxWeight)[0]
+            staleKeys = set()
+            for key, pathWeight in entries:
+                throughRoute = (min(toRoute[index] for index in indices(key[0])) + weight(new, searchParameter)
+                                + min(fromRoute[index] for index in indices(key[1])))
+                if throughRoute < pathWeight * (1 + 1e-6):
+                    staleKeys.add(key)
+            if staleKeys:
+                self.routeCache.invalidateWhere(lambda key, path: key in staleKeys)
+
+    def _refreshMedians(self):
+        # Every edge weight is divided by the medians, so moving them changes
+        # every weight and every cache. The live medians are tracked exactly,
+        # but the engines only switch once they drift past MEDIAN_REFRESH_TOLERANCE.
+        medianCost, medianTime = self.median.getMedianCost(), self.median.getMedianTime()
+        if (abs(medianCost - self.medianCost) <= MEDIAN_REFRESH_TOLERANCE * abs(self.medianCost)
+                and abs(medianTime - self.medianTime) <= MEDIAN_REFRESH_TOLERANCE * abs(self.medianTime)):
+            return
+        self.medianCost, self.medianTime = medianCost, medianTime
+        self.graph.clearEdgeWeights()
+        self.reverseGraph.clearEdgeWeights()
+        for engine in (self.dijkstra, self.astar, self.alt, self.bellmanford, self.pareto, self.ch):
+            engine.setMedians(medianCost, medianTime)
+        self.routeCache.invalidate()
+
+
+class RouteResult(NamedTuple):
+    # Immutable answer to FlightPathing.query(); path is empty when there is no route
+    srcId: int
+    dstId: int
+    algorithm: str
+    costWeight: float
+    timeWeight: float
+    path: tuple[int, ...]
+    totalCost: float
+    totalTime: float
+    nodesVisited: int  # 0 when the route came from the cache
+    cached: bool
+    stats: FrozenQueryStats
+
+    @property
+    def found(self) -> bool:
+        return len(self.path) > 0
+
+
+class DistanceMatrix:
+    # Origin-destination matrices from FlightPathing.getDistanceMatrix(): row i
+    # is srcIds[i], column j is dstIds[j]. weight is inf and cost / time are
+    # nan where there is no route; paths[i][j] is a tuple of airport ids (None
+    # when unreachable), only when requested.
+
+    def __init__(self, srcIds: list[int], dstIds: list[int], rows: list, withPaths: bool):
+        self.srcIds = srcIds
+        self.dstIds = dstIds
+        shape = (len(srcIds), len(dstIds))
+        self.weight = np.array([row[0] for row in rows], dtype=np.float64).reshape(shape)
+        self.cost = np.array([row[1] for row in rows], dtype=np.float64).reshape(shape)
+        self.time = np.array([row[2] for row in rows], dtype=np.float64).reshape(shape)
+        self.paths = [row[3] for row in rows] if withPaths else None
+
+
+class MatrixWorkerPool:
+    # The process pool behind FlightPathing.getDistanceMatrix() and the graph
+    # it was started for. Workers are started with forkserver or spawn, never
+    # fork: forking while query threads hold locks would copy those locks held
+    # into the child.
+
+    def __init__(self):
+        self.lock = threading.Lock()  # held while the pool is checked, replaced or given work
+        self.executor: ProcessPoolExecutor = None
+        self.key = None  # (graph content hash, processes) of the running workers
+        self.tempFile = None  # snapshot written for these workers, removed with them
+
+    def start(self, key: tuple, processes: int, workerArgs: tuple, tempFile: str = None):
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self.executor = ProcessPoolExecutor(processes, context, _initMatrixWorker, workerArgs)
+        self.key, self.tempFile = key, tempFile
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+        if self.tempFile is not None:
+            try:
+                os.remove(self.tempFile)
+            except OSError:
+                pass
+        self.executor = self.key = self.tempFile = None
+
+
+_matrixEngine = None  # per-worker Dijkstra, set by _initMatrixWorker
+
+
+def _initMatrixWorker(fileLocation: str, snapshotKey: str, medianCost: float, medianTime: float):
+    # maps the graph snapshot, so the arrays are pages shared with every other worker
+    global _matrixEngine
+    snapshot = GraphSnapshot.read(fileLocation, snapshotKey)
+    if snapshot is None:
+        raise RuntimeError(f"graph snapshot {fileLocation} was replaced while the matrix workers ran")
+    _matrixEngine = Dijkstra(FlightPathing._graphFromArrays(snapshot.arrays), medianCost, medianTime)
+
+
+def _matrixRows(task: tuple) -> list:
+    srcIndices, dstIndices, searchParameter, withPaths = task
+    return [_matrixEngine.oneToMany(srcIndex, dstIndices, searchParameter, withPaths) for srcIndex in srcIndices]
+
+
+class MedianCostAndTime:
+    # Keeps every route's cost and time in sorted lists. add() / remove()
+    # binary-search their slot, so route updates move the medians without
+    # sorting everything again.
+
+    def __init__(self, graph: RouteGraph):
+        self.costs = []
+        self.time = []
+        self.graph = graph
+        self.calculateMedians()
+
+    def calculateMedians(self):
+        self.costs = sorted(self.graph.cost.tolist())
+        self.time = sorted(self.graph.time.tolist())
+
+    def add(self, cost: float, time: float):
+        bisect.insort(self.costs, cost)
+        bisect.insort(self.time, time)
+
+    def remove(self, cost: float, time: float):
+        del self.costs[bisect.bisect_left(self.costs, cost)]
+        del self.time[bisect.bisect_left(self.time, time)]
+
+    def getMedianCost(self) -> float:
+        median1, median2 = self.getMedianIndices(self.costs)
+        return (self.costs[median1] + self.costs[median2]) / 2
+
+    def getMedianTime(self) -> float:
+        median1, median2 = self.getMedianIndices(self.time)
+        return (self.time[median1] + self.time[median2]) / 2
+
+    def getMedianIndices(self, arr: list) -> tuple[int, int]:
+        # arr is already sorted
+        # if Array is even length, return the average of the two middle elements
+        if len(arr) % 2 == 0:  # 0 - 5, the middle elements are 2 and 3.
+            return len(arr) // 2 - 1, len(arr) // 2
+        # if Array is odd length, return the middle element
+        else:
+            return len(arr) // 2, len(arr) // 2
+
+
+class ShortestPathTree:
+    # Full one-to-all result of a Dijkstra run from one source index: weight of
+    # the shortest path to every index (inf where unreachable) and the
+    # predecessor of every index on it (-1 for the source and unreached ones).
+
+    def __init__(self, srcIndex: int, dist: np.ndarray, predecessors: np.ndarray):
+        self.srcIndex = srcIndex
+        self.dist = dist
+        self.predecessors = predecessors
+
+    @property
+    def nbytes(self) -> int:
+        return self.dist.nbytes + self.predecessors.nbytes
+
+    def pathTo(self, dstIndex: int) -> list[int]:
+        if math.isinf(self.dist[dstIndex]):
+            return None
+        path = [dstIndex]
+        predecessors = self.predecessors
+        while path[-1] != self.srcIndex:
+            path.append(int(predecessors[path[-1]]))
+        path.reverse()
+        return path
+
+
+class ShortestPathTreeCache:
+    # Least recently used shortest-path trees, evicted once their combined
+    # size exceeds maxBytes
+
+    def __init__(self, maxBytes: int):
+        self.maxBytes = maxBytes
+        self.trees = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.trees)
+
+    def get(self, key) -> ShortestPathTree:
+        with self.lock:
+            tree = self.trees.get(key)
+            if tree is not None:
+                self.trees.move_to_end(key)
+            return tree
+
+    def put(self, key, tree: ShortestPathTree):
+        with self.lock:
+            if key in self.trees:
+                self.nbytes -= self.trees.pop(key).nbytes
+            self.trees[key] = tree
+            self.nbytes += tree.nbytes
+            # always keep the newest tree, even if it alone is over budget
+            while self.nbytes > self.maxBytes and len(self.trees) > 1:
+                self.nbytes -= self.trees.popitem(last=False)[1].nbytes
+
+    def clear(self):
+        with self.lock:
+            self.trees.clear()
+            self.nbytes = 0
+
+    def invalidateWhere(self, stale) -> int:
+        # drops every tree for which stale(key, tree) is true
+        with self.lock:
+            keys = [key for key, tree in self.trees.items() if stale(key, tree)]
+            for key in keys:
+                self.nbytes -= self.trees.pop(key).nbytes
+            return len(keys)
+
+
+class RouteCache:
+    # Query results shared by all engines, keyed on (src, dst, algorithm,
+    # quantised weights) and evicted least recently used once either
+    # maxEntries or maxBytes is exceeded. Results belong to the graph passed to
+    # bind(); binding a different graph empties the cache.
+
+    def __init__(self, maxEntries: int = ROUTE_CACHE_ENTRIES, maxBytes: int = ROUTE_CACHE_BYTES,
+                 weightStep: float = ROUTE_CACHE_WEIGHT_STEP):
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.weightStep = weightStep
+        self.entries = OrderedDict()  # key -> (result, size in bytes)
+        self.nbytes = 0
+        self.graph = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def bind(self, graph: RouteGraph):
+        with self.lock:
+            if graph is not self.graph:
+                self.entries.clear()
+                self.nbytes = 0
+                self.graph = graph
+
+    def invalidate(self):
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def invalidateWhere(self, stale) -> int:
+        # drops every entry for which stale(key, result) is true
+        with self.lock:
+            keys = [key for key, (result, _) in self.entries.items() if stale(key, result)]
+            for key in keys:
+                self.nbytes -= self.entries.pop(key)[1]
+            return len(keys)
+
+    def key(self, src, dst, algorithm: str, searchParameter: SearchParameter) -> tuple:
+        return (src, dst, algorithm, round(searchParameter.cost / self.weightStep),
+                round(searchParameter.time / self.weightStep), searchParameter.airlines)
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, result: tuple[int, ...]):
+        # results are shared between callers, so store them immutable; None (no route) is cached too
+        size = sys.getsizeof(result) + (0 if result is None else 8 * len(result))
+        with self.lock:
+            if key in self.entries:
+                self.nbytes -= self.entries.pop(key)[1]
+            self.entries[key] = (result, size)
+            self.nbytes += size
+            while len(self.entries) > 1 and (len(self.entries) > self.maxEntries or self.nbytes > self.maxBytes):
+                self.nbytes -= self.entries.popitem(last=False)[1][1]
+                self.evictions += 1
+
+    @property
+    def hitRate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class Dijkstra:
+
+    def __init__(self, graph: RouteGraph, medianCost, medianTime, reverseGraph: RouteGraph = None,
+                 treeCacheBytes: int = SHORTEST_PATH_TREE_CACHE_BYTES):
+        self.graph = graph
+        self.reverseGraph = reverseGraph  # needed for the bidirectional search only
+        self.trees = ShortestPathTreeCache(treeCacheBytes)
+        self.reverseTrees = ShortestPathTreeCache(treeCacheBytes)  # per target, for kShortestPaths
+        self.medianCost = medianCost
+        self.medianTime = medianTime
+        self.nodes_visited = 0
+
+    def _dijkstra(self, srcIndices: frozenset[int], dstIndices: frozenset[int], searchParameter: SearchParameter,
+                  stats: QueryStats = None) -> list[int]:
+        # Searches from every source index at once and stops at the first target
+        # index settled. Works on dense graph indices, not airport ids.
+        graph = self.graph
+        edgeWeights = graph.edgeWeights(self.medianCost, self.medianTime).asList(searchParameter)
+        weights = [sys.maxsize for i in range(graph.getNumAirports())]
+        edgeTo = {}
+        pq = [Vertex(srcIndex, -1, 0.0) for srcIndex in srcIndices]
+        path = None
+        visited = relaxed = pops = 0
+        while pq:
+            currVertex = heapq.heappop(pq)
+            pops += 1
+            currIndex, currWeight = currVertex.currId, currVertex.weight
+            if currWeight >= weights[currIndex]:
+                continue
+            visited += 1
+            weights[currIndex] = currWeight
+            edgeTo[currIndex] = currVertex.prevId
+            if currIndex in dstIndices:
+                path = self._traverseToSrc(edgeTo, currIndex)
+                break
+            start, end = int(graph.offsets[currIndex]), int(graph.offsets[currIndex + 1])
+            relaxed += end - start
+            for edge, nextIndex in enumerate(graph.targets[start:end].tolist(), start):
+                nextWeight = currWeight + edgeWeights[edge]
+                heapq.heappush(pq, Vertex(nextIndex, currIndex, nextWeight))
+        if stats is not None:
+            stats.nodesVisited += visited
+            stats.edgesRelaxed += relaxed
+            stats.heapPops += pops
+            stats.heapPushes += pops + len(pq)
+        return path
+
+    def _bidirectionalDijkstra(self, srcIndices: frozenset[int], dstIndices: frozenset[int],
+                               searchParameter: SearchParameter, stats: QueryStats = None) -> list[int]:
+        # Forward search from every source on the graph and backward search from
+        # every target on the reverse graph, always expanding the smaller
+        # frontier. best is the lightest source-target path seen while relaxing
+        # edges; once the two smallest queue keys add up to at least best (or a
+        # side runs dry) no lighter path can exist.
+        graphs = (self.graph, self.reverseGraph)
+        edgeWeights = tuple(graph.edgeWeights(self.medianCost, self.medianTime).asList(searchParameter)
+                            for graph in graphs)
+        n = self.graph.getNumAirports()
+        dist = ([math.inf] * n, [math.inf] * n)
+        parent = ({}, {})
+        settled = (bytearray(n), bytearray(n))
+        pqs = ([], [])
+        for side, indices in ((0, srcIndices), (1, dstIndices)):
+            for index in indices:
+                dist[side][index] = 0.0
+                parent[side][index] = -1
+                pqs[side].append((0.0, index))
+        best, meet = math.inf, -1
+        for index in srcIndices & dstIndices:
+            best, meet = 0.0, index
+
+        visited = relaxed = pops = 0
+        while pqs[0] and pqs[1] and pqs[0][0][0] + pqs[1][0][0] < best:
+            side = 0 if len(pqs[0]) <= len(pqs[1]) else 1
+            currWeight, currIndex = heapq.heappop(pqs[side])
+            pops += 1
+            if settled[side][currIndex]:
+                continue
+            settled[side][currIndex] = 1
+            visited += 1
+            graph, weights, ownDist, otherDist = graphs[side], edgeWeights[side], dist[side], dist[1 - side]
+            start, end = int(graph.offsets[currIndex]), int(graph.offsets[currIndex + 1])
+            relaxed += end - start
+            for edge, nextIndex in enumerate(graph.targets[start:end].tolist(), start):
+                nextWeight = currWeight + weights[edge]
+                if nextWeight < ownDist[nextIndex]:
+                    ownDist[nextIndex] = nextWeight
+                    parent[side][nextIndex] = currIndex
+                    heapq.heappush(pqs[side], (nextWeight, nextIndex))
+                    if nextWeight + otherDist[nextIndex] < best:
+                        best, meet = nextWeight + otherDist[nextIndex], nextIndex
+        if stats is not None:
+            stats.nodesVisited += visited
+            stats.edgesRelaxed += relaxed
+            stats.heapPops += pops
+            stats.heapPushes += pops + len(pqs[0]) + len(pqs[1])
+        if meet == -1:
+            return None
+
+        path = self._traverseToSrc(parent[0], meet)
+        currIndex = parent[1][meet]
+        while currIndex != -1:
+            path.append(currIndex)
+            currIndex = parent[1][currIndex]
+        return path
+
+    def _oneToAll(self, srcIndices: list[int], searchParameter: SearchParameter,
+                  stats: QueryStats = None, graph: RouteGraph = None,
+                  maxWeight: float = math.inf) -> tuple[list, list]:
+        # One-to-all: weight of the shortest path from the nearest source index
+        # to every index (inf where unreachable) and the predecessor of every
+        # index on that path. With maxWeight the search stops there; weights
+        # above it are then only upper bounds (or inf).
+        graph = graph or self.graph
+        weights = graph.edgeWeights(self.medianCost, self.medianTime).asList(searchParameter)
+        offsets, targets = graph.offsets.tolist(), graph.targets.tolist()
+        dist = [math.inf] * graph.getNumAirports()
+        predecessors = [-1] * graph.getNumAirports()
+        settled = bytearray(graph.getNumAirports())
+        pq = []
+        for srcIndex in srcIndices:
+            dist[srcIndex] = 0.0
+            pq.append((0.0, srcIndex))
+        heapq.heapify(pq)
+        visited = relaxed = pops = 0
+        while pq:
+            currWeight, currIndex = heapq.heappop(pq)
+            pops += 1
+            if currWeight > maxWeight:
+                break
+            if settled[currIndex]:
+                continue
+            settled[currIndex] = 1
+            visited += 1
+            relaxed += offsets[currIndex + 1] - offsets[currIndex]
+            for edge in range(offsets[currIndex], offsets[currIndex + 1]):
+                nextIndex = targets[edge]
+                nextWeight = currWeight + weights[edge]
+                if nextWeight < dist[nextIndex]:
+                    dist[nextIndex] = nextWeight
+                    predecessors[nextIndex] = currIndex
+                    heapq.heappush(pq, (nextWeight, nextIndex))
+        if stats is not None:
+            stats.nodesVisited += visited
+            stats.edgesRelaxed += relaxed
+            stats.heapPops += pops
+            stats.heapPushes += pops + len(pq)
+        return dist, predecessors
+
+    def distancesFrom(self, srcIndices: list[int], searchParameter: SearchParameter) -> np.ndarray:
+        return np.array(self._oneToAll(srcIndices, searchParameter)[0], dtype=np.float64)
+
+    def oneToMany(self, srcIndex: int, dstIndices: list[int], searchParameter: SearchParameter,
+                  withPaths: bool = False, stats: QueryStats = None) -> tuple[list, list, list, list]:
+        # One row of a distance matrix: weight, total cost and total time of the
+        # shortest path from srcIndex to each of dstIndices (inf / nan / nan when
+        # unreachable), plus the airport id paths when withPaths. Stops as soon
+        # as every target is settled.
+        graph = self.graph
+        weights = graph.edgeWeights(self.medianCost, self.medianTime).asList(searchParameter)
+        offsets, targets = graph.offsets.tolist(), graph.targets.tolist()
+        n = graph.getNumAirports()
+        dist = [math.inf] * n
+        parentEdge = [-1] * n
+        parent = [-1] * n
+        settled = bytearray(n)
+        remaining = set(dstIndices)
+        dist[srcIndex] = 0.0
+        pq = [(0.0, srcIndex)]
+        visited = relaxed = pops = 0
+        while pq and remaining:
+            currWeight, currIndex = heapq.heappop(pq)
+            pops += 1
+            if settled[currIndex]:
+                continue
+            settled[currIndex] = 1
+            visited += 1
+            relaxed += offsets[currIndex + 1] - offsets[currIndex]
+            remaining.discard(currIndex)
+            for edge in range(offsets[currIndex], offsets[currIndex + 1]):
+                nextIndex = targets[edge]
+                nextWeight = currWeight + weights[edge]
+                if nextWeight < dist[nextIndex]:
+                    dist[nextIndex] = nextWeight
+                    parent[nextIndex] = currIndex
+                    parentEdge[nextIndex] = edge
+                    heapq.heappush(pq, (nextWeight, nextIndex))
+        if stats is not None:
+            stats.nodesVisited += visited
+            stats.edgesRelaxed += relaxed
+            stats.heapPops += pops
+            stats.heapPushes += pops + len(pq)
+
+        rowWeight, rowCost, rowTime, rowPaths = [], [], [], []
+        for dstIndex in dstIndices:
+            if not settled[dstIndex]:
+                rowWeight.append(math.inf)
+                rowCost.append(math.nan)
+                rowTime.append(math.nan)
+                rowPaths.append(None)
+                continue
+            edges, path = [], [dstIndex]
+            while path[-1] != srcIndex:
+                edges.append(parentEdge[path[-1]])
+                path.append(parent[path[-1]])
+            rowWeight.append(dist[dstIndex])
+            rowCost.append(float(graph.cost[edges].sum()))
+            rowTime.append(float(graph.time[edges].sum()))
+            if withPaths:
+                path.reverse()
+                rowPaths.append(tuple(graph.pathToIds(path)))
+        return rowWeight, rowCost, rowTime, rowPaths
+
+    def getShortestPathTree(self, srcId: int, searchParameter: SearchParameter,
+                            stats: QueryStats = None) -> ShortestPathTree:
+        srcIndex = self.graph.idToIndex[srcId]
+        key = (srcIndex, searchParameter.cost, searchParameter.time, searchParameter.airlines)
+        tree = self.trees.get(key)
+        if tree is not None and stats is not None:
+            stats.cacheHits += 1
+        if tree is None:
+            dist, predecessors = self._oneToAll([srcIndex], searchParameter, stats)
+            tree = ShortestPathTree(srcIndex, np.array(dist, dtype=np.float64),
+                                    np.array(predecessors, dtype=np.int32))
+            self.trees.put(key, tree)
+        return tree
+
+    def getReverseTree(self, dstIndex: int, searchParameter: SearchParameter,
+                       stats: QueryStats = None) -> ShortestPathTree:
+        # Shortest paths from every index to dstIndex, found on the reverse
+        # graph: dist[i] is the weight left from i and predecessors[i] the next
+        # airport from i towards dstIndex.
+        key = (dstIndex, searchParameter.cost, searchParameter.time, searchParameter.airlines)
+        tree = self.reverseTrees.get(key)
+        if tree is not None and stats is not None:
+            stats.cacheHits += 1
+        if tree is None:
+            dist, predecessors = self._oneToAll([dstIndex], searchParameter, stats,
+                                                graph=self.reverseGraph or self.graph.reversed())
+            tree = ShortestPathTree(dstIndex, np.array(dist, dtype=np.float64),
+                                    np.array(predecessors, dtype=np.int32))
+            self.reverseTrees.put(key, tree)
+        return tree
+
+    def kShortestPaths(self, srcId: int, dstId: int, searchParameter: SearchParameter,
+                       stats: QueryStats = None):
+        # Yen's k shortest loopless paths with Lawler's partition, as a generator
+        # of airport id paths, lightest first; take as many as needed. Each
+        # candidate is a subproblem: a fixed prefix of an earlier path ending in
+        # the spur airport, the next airports it may not go on to, and none of
+        # the prefix airports again. Subproblems sit in the queue under a cheap
+        # lower bound and only get their spur path searched once they reach the
+        # front. The reverse tree to dstId is the exact remaining weight in the
+        # unrestricted graph, so it is both the spur path whenever that avoids
+        # the restrictions and an exact A* heuristic when it does not.
+        # Finish or drop the generator before applying live updates.
+        graph = self.graph
+        srcIndex, dstIndex = graph.idToIndex[srcId], graph.idToIndex[dstId]
+        toDst = self.getReverseTree(dstIndex, searchParameter, stats)
+        if math.isinf(toDst.dist[srcIndex]):
+            return
+        weights = graph.edgeWeights(self.medianCost, self.medianTime).asList(searchParameter)
+        offsets, targets = graph.offsets.tolist(), graph.targets.tolist()
+        remaining, nextHop = toDst.dist.tolist(), toDst.predecessors.tolist()
+        order = count()  # tie-breaker, the queue never compares paths
+
+        def lowerBound(prefix: tuple, prefixWeight: float, banned: frozenset) -> float:
+            spur = prefix[-1]
+            bound = math.inf
+            for edge in range(offsets[spur], offsets[spur + 1]):
+                nextIndex = targets[edge]
+                if nextIndex not in banned and nextIndex not in prefix:
+                    bound = min(bound, weights[edge] + remaining[nextIndex])
+            return prefixWeight + bound
+
+        def spurPath(prefix: tuple, banned: frozenset) -> tuple[float, list[int]]:
+            spur, avoid = prefix[-1], frozenset(prefix)
+            path = [spur]
+            while path[-1] != dstIndex and nextHop[path[-1]] not in avoid:
+                path.append(nextHop[path[-1]])
+            if path[-1] == dstIndex and (len(path) == 1 or path[1] not in banned):
+                return remaining[spur], path
+            best = {spur: 0.0}
+            parent = {spur: -1}
+            pq = [(remaining[spur], 0.0, spur)]
+            visited = relaxed = pops = 0
+            while pq:
+                _, currWeight, currIndex = heapq.heappop(pq)
+                pops += 1
+                if currWeight > best[currIndex]:
+                    continue
+                visited += 1
+                if currIndex == dstIndex:
+                    path = self._traverseToSrc(parent, dstIndex)
+                    break
+                relaxed += offsets[currIndex + 1] - offsets[currIndex]
+                for edge in range(offsets[currIndex], offsets[currIndex + 1]):
+                    nextIndex = targets[edge]
+                    if nextIndex in avoid or (currIndex == spur and nextIndex in banned):
+                        continue
+                    nextWeight = currWeight + weights[edge]
+                    if nextWeight + remaining[nextIndex] < math.inf and nextWeight < best.get(nextIndex, math.inf):
+                        best[nextIndex] = nextWeight
+                        parent[nextIndex] = currIndex
+                        heapq.heappush(pq, (nextWeight + remaining[nextIndex], nextWeight, nextIndex))
+            else:
+                path = None
+            if stats is not None:
+                stats.nodesVisited += visited
+                stats.edgesRelaxed += relaxed
+                stats.heapPops += pops
+                stats.heapPushes += pops + len(pq)
+            return (best[dstIndex], path) if path is not None else (math.inf, None)
+
+        # (weight or lower bound, tie-breaker, prefix, prefix weight, banned, full path once searched)
+        pq = [(remaining[srcIndex], next(order), (srcIndex,), 0.0, frozenset(), None)]
+        while pq:
+            weight, _, prefix, prefixWeight, banned, path = heapq.heappop(pq)
+            if path is None:
+                spurWeight, spur = spurPath(prefix, banned)
+                if spur is not None:
+                    heapq.heappush(pq, (prefixWeight + spurWeight, next(order), prefix, prefixWeight, banned,
+                                        prefix[:-1] + tuple(spur)))
+                continue
+            yield graph.pathToIds(path)
+            # split the rest of this subproblem by where a path first leaves this one
+            rootWeight = prefixWeight
+            for i in range(len(prefix) - 1, len(path) - 1):
+                childPrefix = path[:i + 1]
+                childBanned = banned | {path[i + 1]} if i == len(prefix) - 1 else frozenset([path[i + 1]])
+                bound = lowerBound(childPrefix, rootWeight, childBanned)
+                if bound < math.inf:
+                    heapq.heappush(pq, (bound, next(order), childPrefix, rootWeight, childBanned, None))
+                rootWeight += weights[graph.findEdge(path[i], path[i + 1])]
+
+    def findPathFromTree(self, srcId: int, dstId: int, searchParameter: SearchParameter,
+                         stats: QueryStats = None) -> list[int]:
+        # same path weight as findPath, but answered by walking the cached tree
+        # of srcId so later queries from the same source search nothing
+        shortestPath = self.getShortestPathTree(srcId, searchParameter, stats).pathTo(self.graph.idToIndex[dstId])
+        return None if shortestPath is None else self.graph.pathToIds(shortestPath)
+
+    def getShortestPathFromTree(self, srcId: int, dstId: int, searchParameter: SearchParameter) -> list[int]:
+        self.shortestPath = self.findPathFromTree(srcId, dstId, searchParameter)
+        return self.shortestPath
+
+    def _dijkstraWithSets(self, srcIds: frozenset[int], dstIds: frozenset[int], searchParameter: SearchParameter,
+                          bidirectional: bool = False, stats: QueryStats = None) -> list[int]:
+        srcIndices = frozenset(self.graph.idToIndex[srcId] for srcId in srcIds)
+        dstIndices = frozenset(self.graph.idToIndex[dstId] for dstId in dstIds)
+        if bidirectional:
+            shortestPath = self._bidirectionalDijkstra(srcIndices, dstIndices, searchParameter, stats)
+        else:
+            shortestPath = self._dijkstra(srcIndices, dstIndices, searchParameter, stats)
+        if shortestPath is None:
+            return None
+        return self.graph.pathToIds(shortestPath)
+
+    def findPath(self, srcId: int, dstId: int, searchParameter: SearchParameter, stats: QueryStats = None,
+                 bidirectional: bool = False) -> list[int]:
+        # stateless: safe to call from several threads at once
+        return self._dijkstraWithSets(frozenset([srcId]), frozenset([dstId]), searchParameter, bidirectional, stats)
+
+    def _record(self, shortestPath: list[int], stats: QueryStats) -> list[int]:
+        # shortestPath / nodes_visited keep the last query for single-threaded callers
+        self.shortestPath = shortestPath
+        self.nodes_visited += stats.nodesVisited
+        return shortestPath
+
+    def _traverseToSrc(self, spTree: dict, dstId: int) -> list[int]:
+        res = []
+        currId = dstId
+        while currId != -1:
+            res.append(currId)
+            currId = spTree.get(currId)
+        res.reverse()
+        return res
+
+    def getShortestPath(self, srcId: int, dstId: int, searchParameter: SearchParameter) -> list[int]:
+        # results are cached by FlightPathing.routeCache, not here
+        stats = QueryStats()
+        return self._record(self.findPath(srcId, dstId, searchParameter, stats), stats)
+    
+    def getShortestPathWithSets(self, srcIds: frozenset[int], dstIds: frozenset[int], searchParameter: SearchParameter) -> list[str]:
+        stats = QueryStats()
+        return self._record(self._dijkstraWithSets(srcIds, dstIds, searchParameter,
+                                                   self.reverseGraph is not None, stats), stats)
+
+    def getShortestPathBidirectional(self, srcId: int, dstId: int, searchParameter: SearchParameter) -> list[int]:
+        stats = QueryStats()
+        return self._record(self.findPath(srcId, dstId, searchParameter, stats, bidirectional=True), stats)
+
+    def routeChanged(self, srcIndex: int, dstIndex: int, old: tuple, new: tuple):
+        # A dearer or removed route only matters to trees that use it; a
+        # cheaper or new one only to trees in which it now shortens the path to
+        # dstIndex. Every other cached tree is still exact.
+        worse, better = _routeGotWorse(old, new), _routeGotBetter(old, new)
+
+        def staleOver(fromIndex: int, toIndex: int):
+            def stale(key: tuple, tree: ShortestPathTree) -> bool:
+                if worse and tree.predecessors[toIndex] == fromIndex:
+                    return True
+                if better:
+                    weight = routeWeight(*new, self.medianCost, self.medianTime,
+                                         SearchParameter(key[1], key[2], key[3]))
+                    return tree.dist[fromIndex] + weight < tree.dist[toIndex]
+                return False
+            return stale
+
+        self.trees.invalidateWhere(staleOver(srcIndex, dstIndex))
+        # reverse trees hold the route as dstIndex -> srcIndex
+        self.reverseTrees.invalidateWhere(staleOver(dstIndex, srcIndex))
+
+    def airportAdded(self, index: int, airport: Airport):
+        self.trees.clear()  # sized for the old airport count
+        self.reverseTrees.clear()
+
+    def setMedians(self, medianCost, medianTime):
+        self.medianCost = medianCost
+        self.medianTime = medianTime
+        self.trees.clear()
+        self.reverseTrees.clear()
+
+
+class Astar:
+    def __init__(self, airports: AirportTable, graph: RouteGraph, medianCost, medianTime):
+        self.airports = airports
+        self.graph = graph
+        self.srcId = None
+        self.dstId = None
+        self.medianCost = medianCost
+        self.medianTime = medianTime
+        self.shortestPath = []
+        self.searchParameter = None
+        self.nodes_visited = 0
+        rows = [airports.idToRow[airportId] for airportId in graph.airportIds.tolist()]
+        self.latitudes = airports.latitude[rows]
+        self.longitudes = airports.longitude[rows]
+        self._setLowerBounds()
+
+    def _setLowerBounds(self):
+        # Lower bounds taken from the loaded edges. Every route costs at least
+        # costPerKm per km of its own great-circle length and at least minCost
+        # outright (same for time). Great-circle distance obeys the triangle
+        # inequality, so any path from an airport to the target costs at least
+        # max(costPerKm * distance, minCost), which keeps the heuristic
+        # admissible and consistent.
+        graph = self.graph
+        sources = graph.edgeSources()
+        edgeDistance = haversineDistances(self.latitudes[sources], self.longitudes[sources],
+                                          self.latitudes[graph.targets], self.longitudes[graph.targets])
+        positive = edgeDistance > 0
+        safety = 1 - 1e-9  # keep rounding from nudging a bound above a real edge
+        self.costPerKm = float((graph.cost[positive] / edgeDistance[positive]).min(initial=np.inf)) * safety
+        self.timePerKm = float((graph.time[positive] / edgeDistance[positive]).min(initial=np.inf)) * safety
+        self.minCost = float(graph.cost.min(initial=np.inf)) * safety
+        self.minTime = float(graph.time.min(initial=np.inf)) * safety
+        if not np.isfinite(self.costPerKm) or not np.isfinite(self.timePerKm):
+            self.costPerKm = self.timePerKm = 0.0
+        if not np.isfinite(self.minCost) or not np.isfinite(self.minTime):
+            self.minCost = self.minTime = 0.0
+
+    def routeChanged(self, srcIndex: int, dstIndex: int, old: tuple, new: tuple):
+        # the bounds stay admissible when a route gets dearer or goes away; a
+        # new or cheaper one can undercut them, and then they are recomputed
+        if new is None:
+            return
+        distance = float(haversineDistances(self.latitudes[srcIndex], self.longitudes[srcIndex],
+                                            self.latitudes[dstIndex], self.longitudes[dstIndex]))
+        cost, time = new
+        if (cost < self.minCost or time < self.minTime
+                or cost < self.costPerKm * distance or time < self.timePerKm * distance):
+            self._setLowerBounds()
+
+    def airportAdded(self, index: int, airport: Airport):
+        self.latitudes = np.append(self.latitudes, airport.latitude)
+        self.longitudes = np.append(self.longitudes, airport.longitude)
+
+    def setMedians(self, medianCost, medianTime):
+        self.medianCost = medianCost
+        self.medianTime = medianTime
+
+    def lowerBound(self, srcIndex: int, dstIndex: int) -> tuple[float, float]:
+        # lower bounds on the cost and time of any path from srcIndex to dstIndex
+        if srcIndex == dstIndex:
+            return 0.0, 0.0
+        dist = float(haversineDistances(self.latitudes[srcIndex], self.longitudes[srcIndex],
+                                        self.latitudes[dstIndex], self.longitudes[dstIndex]))
+        return max(dist * self.costPerKm, self.minCost), max(dist * self.timePerKm, self.minTime)
+
+    def weightBound(self, srcIndex: int, dstIndex: int, searchParameter: SearchParameter) -> float:
+        # lower bound on the SearchParameter weight of any path from srcIndex to dstIndex
+        return routeWeight(*self.lowerBound(srcIndex, dstIndex), self.medianCost, self.medianTime, searchParameter)
+
+    def lowerBounds(self, dstIndex: int) -> tuple[np.ndarray, np.ndarray]:
+        # lower bounds on the remaining cost and time from every airport index to dstIndex
+        dist = haversineDistances(self.latitudes[dstIndex], self.longitudes[dstIndex], self.latitudes, self.longitudes)
+        cost = np.maximum(dist * self.costPerKm, self.minCost)
+        time = np.maximum(dist * self.timePerKm, self.minTime)
+        cost[dstIndex] = time[dstIndex] = 0.0
+        return cost, time
+
+    def heuristic_cost_estimate(self, dstIndex: int, searchParameter: SearchParameter) -> np.ndarray:
+        # estimate for every airport index to reach dstIndex, computed once per query
+        cost, time = self.lowerBounds(dstIndex)
+        return (cost / self.medianCost) * searchParameter.cost + (time / self.medianTime) * searchParameter.time
+
+    def getShortestPath(self, srcId: int, dstId: int, searchParameter: SearchParameter) -> list[int]:
+        stats = QueryStats()
+        self.shortestPath = self.findPath(srcId, dstId, searchParameter, stats)
+        self.nodes_visited += stats.nodesVisited
+        return self.shortestPath
+
+    def findPath(self, srcId: int, dstId: int, searchParameter: SearchParameter, stats: QueryStats = None) -> list[int]:
+        # stateless: safe to call from several threads at once
+        graph = self.graph
+        srcIndex, dstIndex = graph.idToIndex[srcId], graph.idToIndex[dstId]
+        start = perf_counter()
+        heuristic = self.heuristic_cost_estimate(dstIndex, searchParameter).tolist()
+        if stats is not None:
+            stats.heuristicTime += perf_counter() - start
+        if heuristic[srcIndex] == math.inf:
+            return []
+        edgeWeights = graph.edgeWeights(self.medianCost, self.medianTime).asList(searchParameter)
+        open_list = [(heuristic[srcIndex], srcIndex)]  # binary heap of (g + h, airport index) to search next
+        came_from = {}  # Dictionary that contains the shortest path so far
+        g_score = [sys.maxsize] * graph.getNumAirports()  # actual cost from the source to each airport found so far
+        g_score[srcIndex] = 0
+        closed = bytearray(graph.getNumAirports())  # the heuristic is consistent, so a settled airport is final
+        path = []
+        visited = relaxed = pops = 0
+
+        while open_list:
+            current_priority, current_index = heapq.heappop(open_list)
+            pops += 1
+            if closed[current_index]:
+                continue
+            closed[current_index] = 1
+            visited += 1
+
+            if current_index == dstIndex:
+                path = [current_index]
+                while current_index in came_from:
+                    current_index = came_from[current_index]
+                    path.append(current_index)
+                path.reverse()
+                path = graph.pathToIds(path)
+                break
+
+            current_g_score = g_score[current_index]
+            start, end = int(graph.offsets[current_index]), int(graph.offsets[current_index + 1])
+            relaxed += end - start
+            for edge, neighbor in enumerate(graph.targets[start:end].tolist(), start):
+                if closed[neighbor]:
+                    continue
+                tentative_g_score = current_g_score + edgeWeights[edge]
+                if tentative_g_score < g_score[neighbor] and heuristic[neighbor] != math.inf:  # inf: cannot reach dstIndex
+                    came_from[neighbor] = current_index
+                    g_score[neighbor] = tentative_g_score
+                    heapq.heappush(open_list, (tentative_g_score + heuristic[neighbor], neighbor))
+        if stats is not None:
+            stats.nodesVisited += visited
+            stats.edgesRelaxed += relaxed
+            stats.heapPops += pops
+            stats.heapPushes += pops + len(open_list)
+        return path
+    
+
+class ALT(Astar):
+    # A* whose heuristic also uses landmark (ALT) bounds. For a landmark L the
+    # triangle inequality gives d(v, t) >= d(L, t) - d(L, v) and
+    # d(v, t) >= d(v, L) - d(t, L), using distance tables from and to every
+    # landmark computed with Dijkstra on the graph and on its reverse.
+    #
+    # The tables depend on the SearchParameter weights. Tables are built (on
+    # first use, or all at once with precompute()) for the SLIDER_STEPS + 1
+    # weightings ui.App can produce: time = step / SLIDER_STEPS, cost = 1 - time.
+    # For any other non-negative weights (cost, time), the bound is scaled by
+    # cost + time and interpolated between the two neighbouring slider steps.
+    # Shortest-path weight is a minimum of functions linear in the weights, so
+    # it is concave in them and the interpolated bound stays admissible and
+    # consistent.
+    LANDMARK_COUNT = 8
+    SLIDER_STEPS = 10
+
+    def __init__(self, airports: AirportTable, graph: RouteGraph, medianCost, medianTime,
+                 landmarkCount: int = LANDMARK_COUNT, reverseGraph: RouteGraph = None):
+        super().__init__(airports, graph, medianCost, medianTime)
+        self.landmarkCount = landmarkCount
+        self.landmarks = None
+        self.forwardDijkstra = Dijkstra(graph, medianCost, medianTime)
+        self.backwardDijkstra = None
+        self.reverseGraph = reverseGraph
+        self.tables = {}  # slider step -> (fromLandmark, toLandmark), each of shape (landmarks, airports)
+        self.lock = threading.Lock()  # tables are built once, even when queries run concurrently
+
+    def selectLandmarks(self) -> list[int]:
+        # Farthest-point selection: start from the airport with the most routes,
+        # then repeatedly take the reachable airport farthest from every landmark
+        # chosen so far, using the balanced slider weighting.
+        searchParameter = self._sliderParameter(self.SLIDER_STEPS // 2)
+        start = int(np.argmax(np.diff(self.graph.offsets)))
+        dist = self.forwardDijkstra.distancesFrom([start], searchParameter)
+        landmarks = []
+        while len(landmarks) < self.landmarkCount:
+            candidates = np.where(np.isfinite(dist), dist, -1.0)
+            if landmarks:
+                candidates[landmarks] = -1.0
+            candidate = int(np.argmax(candidates))
+            if candidates[candidate] <= 0:
+                break
+            landmarks.append(candidate)
+            dist = self.forwardDijkstra.distancesFrom(landmarks, searchParameter)
+        self.landmarks = landmarks
+        return landmarks
+
+    def _sliderParameter(self, step: int) -> SearchParameter:
+        time = step / self.SLIDER_STEPS
+        return SearchParameter(1 - time, time)
+
+    def _tablesFor(self, step: int) -> tuple[np.ndarray, np.ndarray]:
+        tables = self.tables.get(step)
+        if tables is not None:
+            return tables
+        with self.lock:
+            if step not in self.tables:
+                if self.landmarks is None:
+                    self.selectLandmarks()
+                if self.backwardDijkstra is None:
+                    self.backwardDijkstra = Dijkstra(self.reverseGraph or self.graph.reversed(), self.medianCost,
+                                                     self.medianTime)
+                searchParameter = self._sliderParameter(step)
+                fromLandmark = np.array([self.forwardDijkstra.distancesFrom([landmark], searchParameter)
+                                         for landmark in self.landmarks]).reshape(len(self.landmarks), -1)
+                toLandmark = np.array([self.backwardDijkstra.distancesFrom([landmark], searchParameter)
+                                       for landmark in self.landmarks]).reshape(len(self.landmarks), -1)
+                self.tables[step] = (fromLandmark, toLandmark)
+            return self.tables[step]
+
+    def precompute(self):
+        for step in range(self.SLIDER_STEPS + 1):
+            self._tablesFor(step)
+
+    def routeChanged(self, srcIndex: int, dstIndex: int, old: tuple, new: tuple):
+        # A dearer or removed route only makes the stored distances too small,
+        # which keeps the bounds admissible and consistent, so the tables stay.
+        # A new or cheaper route can shorten distances beyond it; those are
+        # lowered in place by a search that only spreads while they drop.
+        super().routeChanged(srcIndex, dstIndex, old, new)
+        if not _routeGotBetter(old, new):
+            return
+        reverseGraph = self.backwardDijkstra.graph if self.backwardDijkstra is not None else None
+        for step, (fromLandmark, toLandmark) in self.tables.items():
+            searchParameter = self._sliderParameter(step)
+            weight = routeWeight(*new, self.medianCost, self.medianTime, searchParameter)
+            for row in range(len(fromLandmark)):
+                if fromLandmark[row, srcIndex] + weight < fromLandmark[row, dstIndex]:
+                    self._lowerDistances(fromLandmark[row], self.graph, searchParameter, dstIndex,
+                                         fromLandmark[row, srcIndex] + weight)
+                if weight + toLandmark[row, dstIndex] < toLandmark[row, srcIndex]:
+                    self._lowerDistances(toLandmark[row], reverseGraph, searchParameter, srcIndex,
+                                         weight + toLandmark[row, dstIndex])
+
+    def _lowerDistances(self, dist: np.ndarray, graph: RouteGraph, searchParameter: SearchParameter,
+                        startIndex: int, startWeight: float):
+        # dist[startIndex] dropped to startWeight: relax outwards from it
+        weights = graph.edgeWeights(self.medianCost, self.medianTime).asArray(searchParameter)
+        offsets, targets = graph.offsets, graph.targets
+        dist[startIndex] = startWeight
+        pq = [(startWeight, startIndex)]
+        while pq:
+            currWeight, currIndex = heapq.heappop(pq)
+            if currWeight > dist[currIndex]:
+                continue
+            for edge in range(int(offsets[currIndex]), int(offsets[currIndex + 1])):
+                nextIndex = int(targets[edge])
+                nextWeight = currWeight + float(weights[edge])
+                if nextWeight < dist[nextIndex]:
+                    dist[nextIndex] = nextWeight
+                    heapq.heappush(pq, (nextWeight, nextIndex))
+
+    def airportAdded(self, index: int, airport: Airport):
+        # the new airport has no routes yet, so no landmark reaches it or is reached from it
+        super().airportAdded(index, airport)
+        self.tables = {step: tuple(np.hstack((table, np.full((len(table), 1), np.inf))) for table in tables)
+                       for step, tables in self.tables.items()}
+
+    def setMedians(self, medianCost, medianTime):
+        super().setMedians(medianCost, medianTime)
+        self.forwardDijkstra.setMedians(medianCost, medianTime)
+        if self.backwardDijkstra is not None:
+            self.backwardDijkstra.setMedians(medianCost, medianTime)
+        self.tables = {}
+
+    def _pairBound(self, srcIndex: int, dstIndex: int, step: int) -> float:
+        # _landmarkBound for one airport pair
+        fromLandmark, toLandmark = self._tablesFor(step)
+        if len(fromLandmark) == 0 or srcIndex == dstIndex:
+            return 0.0
+        with np.errstate(invalid="ignore"):
+            bounds = np.concatenate((fromLandmark[:, dstIndex] - fromLandmark[:, srcIndex],
+                                     toLandmark[:, srcIndex] - toLandmark[:, dstIndex]))
+        return max(float(np.fmax.reduce(bounds)), 0.0)  # fmax skips the nan of inf - inf
+
+    def lowerBound(self, srcIndex: int, dstIndex: int) -> tuple[float, float]:
+        # the all-cost and all-time slider steps bound each criterion on its own
+        cost, time = super().lowerBound(srcIndex, dstIndex)
+        return (max(cost, self.medianCost * self._pairBound(srcIndex, dstIndex, 0)),
+                max(time, self.medianTime * self._pairBound(srcIndex, dstIndex, self.SLIDER_STEPS)))
+
+    def weightBound(self, srcIndex: int, dstIndex: int, searchParameter: SearchParameter) -> float:
+        # same interpolation between slider steps as heuristic_cost_estimate
+        geographic = super().weightBound(srcIndex, dstIndex, searchParameter)
+        scale = searchParameter.cost + searchParameter.time
+        if searchParameter.cost < 0 or searchParameter.time < 0 or scale <= 0:
+            return geographic
+        position = searchParameter.time / scale * self.SLIDER_STEPS
+        lower = min(math.floor(position), self.SLIDER_STEPS - 1)
+        share = lower + 1 - position
+        landmark = share * self._pairBound(srcIndex, dstIndex, lower)
+        if share < 1:
+            landmark += (1 - share) * self._pairBound(srcIndex, dstIndex, lower + 1)
+        return max(geographic, scale * landmark)
+
+    def _landmarkBound(self, dstIndex: int, step: int) -> np.ndarray:
+        fromLandmark, toLandmark = self._tablesFor(step)
+        if len(fromLandmark) == 0:
+            return np.zeros(self.graph.getNumAirports())
+        with np.errstate(invalid="ignore"):
+            bounds = np.concatenate((fromLandmark[:, [dstIndex]] - fromLandmark, toLandmark - toLandmark[:, [dstIndex]]))
+        # inf - inf means neither airport is connected to the landmark: no information
+        bounds[np.isnan(bounds)] = 0.0
+        bound = np.maximum(bounds.max(axis=0), 0.0)
+        bound[dstIndex] = 0.0
+        return bound
+
+    def heuristic_cost_estimate(self, dstIndex: int, searchParameter: SearchParameter) -> np.ndarray:
+        geographic = super().heuristic_cost_estimate(dstIndex, searchParameter)
+        scale = searchParameter.cost + searchParameter.time
+        if searchParameter.cost < 0 or searchParameter.time < 0 or scale <= 0:
+            return geographic
+        position = searchParameter.time / scale * self.SLIDER_STEPS
+        nearest = round(position)
+        if abs(position - nearest) < 1e-9:
+            landmark = self._landmarkBound(dstIndex, nearest)
+        else:
+            lower = math.floor(position)
+            share = lower + 1 - position  # how much of the weighting sits on the lower step
+            landmark = share * self._landmarkBound(dstIndex, lower) + (1 - share) * self._landmarkBound(dstIndex, lower + 1)
+        return np.maximum(geographic, scale * landmark)
+
+
+class ContractionHierarchy:
+    # Contraction Hierarchy of a RouteGraph for one fixed edge weighting.
+    # Airports are contracted in order of edge difference (lazy updates);
+    # contracting an airport adds a shortcut u -> w for every u -> v -> w that
+    # a bounded witness search cannot beat. The result is stored as two upward
+    # CSR graphs: forward holds u -> w with rank[w] > rank[u], backward holds,
+    # at w, the routes u -> w with rank[u] > rank[w]. Every overlay edge keeps
+    # the airport it bypasses (-1 for a real route) so paths can be unpacked.
+    VERSION = 1
+    WITNESS_SETTLE_LIMIT = 32
+    _ARRAYS = ("rank", "forwardOffsets", "forwardTargets", "forwardWeights", "forwardMiddle",
+               "backwardOffsets", "backwardTargets", "backwardWeights", "backwardMiddle")
+
+    def __init__(self, arrays: dict):
+        self.arrays = arrays
+        # the query loops run on plain lists, which index much faster than numpy arrays
+        self.forward = (arrays["forwardOffsets"].tolist(), arrays["forwardTargets"].tolist(),
+                        arrays["forwardWeights"].tolist())
+        self.backward = (arrays["backwardOffsets"].tolist(), arrays["backwardTargets"].tolist(),
+                         arrays["backwardWeights"].tolist())
+        self.middles = {}  # (u, w) -> bypassed airport, for shortcuts only
+        for direction in ("forward", "backward"):
+            offsets, targets, middle = (arrays[f"{direction}Offsets"], arrays[f"{direction}Targets"],
+                                        arrays[f"{direction}Middle"])
+            owners = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+            for edge in np.flatnonzero(middle >= 0).tolist():
+                owner, other = int(owners[edge]), int(targets[edge])
+                key = (owner, other) if direction == "forward" else (other, owner)
+                self.middles[key] = int(middle[edge])
+
+    @classmethod
+    def build(cls, n: int, sources: np.ndarray, targets: np.ndarray, weights: np.ndarray) -> "ContractionHierarchy":
+        # n airports and edge arrays sources -> targets, as RouteGraph.edgeSources() / targets
+        out = [{} for _ in range(n)]  # overlay of the uncontracted airports
+        inn = [{} for _ in range(n)]
+        for u, v, weight in zip(sources.tolist(), targets.tolist(), weights.tolist()):
+            if u != v and weight < out[u].get(v, math.inf):
+                out[u][v] = weight
+                inn[v][u] = weight
+        middle = {}
+        deletedNeighbours = [0] * n
+
+        def witnessDistances(src: int, skip: int, limit: float, targets: dict) -> dict:
+            # bounded Dijkstra from src avoiding skip; stops once every target is
+            # settled, nothing is left under limit, or the settle limit is hit
+            dist = {src: 0.0}
+            pq = [(0.0, src)]
+            settled = 0
+            remaining = len(targets) - (src in targets)
+            while pq and settled < cls.WITNESS_SETTLE_LIMIT and remaining > 0:
+                d, u = heapq.heappop(pq)
+                if d > dist[u]:
+                    continue
+                settled += 1
+                if u != src and u in targets:
+                    remaining -= 1
+                for v, weight in out[u].items():
+                    nd = d + weight
+                    if v != skip and nd <= limit and nd < dist.get(v, math.inf):
+                        dist[v] = nd
+                        heapq.heappush(pq, (nd, v))
+            return dist
+
+        def shortcutsFor(v: int) -> list[tuple[int, int, float]]:
+            shortcuts = []
+            if not out[v]:
+                return shortcuts
+            maxOut = max(out[v].values())
+            for u, inWeight in inn[v].items():
+                if len(out[v]) == 1 and u in out[v]:
+                    continue  # u <-> v only, nothing to bypass
+                dist = witnessDistances(u, v, inWeight + maxOut, out[v])
+                for w, outWeight in out[v].items():
+                    if w != u and dist.get(w, math.inf) > inWeight + outWeight:
+                        shortcuts.append((u, w, inWeight + outWeight))
+            return shortcuts
+
+        def priority(v: int, shortcuts: list) -> int:
+            return len(shortcuts) - len(inn[v]) - len(out[v]) + deletedNeighbours[v]
+
+        rank = np.zeros(n, dtype=np.int32)
+        forwardEdges = [[] for _ in range(n)]  # (target, weight, middle)
+        backwardEdges = [[] for _ in range(n)]
+        pq = [(priority(v, shortcutsFor(v)), v) for v in range(n)]
+        heapq.heapify(pq)
+        contracted = bytearray(n)
+        order = 0
+        while pq:
+            _, v = heapq.heappop(pq)
+            if contracted[v]:
+                continue
+            # lazy update: re-evaluate v and put it back if it is no longer the cheapest
+            shortcuts = shortcutsFor(v)
+            current = priority(v, shortcuts)
+            if pq and current > pq[0][0]:
+                heapq.heappush(pq, (current, v))
+                continue
+            for u, w, weight in shortcuts:
+                if weight < out[u].get(w, math.inf):
+                    out[u][w] = weight
+                    inn[w][u] = weight
+                    middle[(u, w)] = v
+            forwardEdges[v] = [(w, weight, middle.get((v, w), -1)) for w, weight in out[v].items()]
+            backwardEdges[v] = [(u, weight, middle.get((u, v), -1)) for u, weight in inn[v].items()]
+            for u in inn[v]:
+                del out[u][v]
+                deletedNeighbours[u] += 1
+            for w in out[v]:
+                del inn[w][v]
+                deletedNeighbours[w] += 1
+            out[v], inn[v] = {}, {}
+            contracted[v] = 1
+            rank[v] = order
+            order += 1
+
+        arrays = {"rank": rank}
+        for direction, edges in (("forward", forwardEdges), ("backward", backwardEdges)):
+            offsets = np.zeros(n + 1, dtype=np.int32)
+            np.cumsum([len(edgeList) for edgeList in edges], out=offsets[1:])
+            flat = [edge for edgeList in edges for edge in edgeList]
+            arrays[f"{direction}Offsets"] = offsets
+            arrays[f"{direction}Targets"] = np.array([edge[0] for edge in flat], dtype=np.int32)
+            arrays[f"{direction}Weights"] = np.array([edge[1] for edge in flat], dtype=np.float64)
+            arrays[f"{direction}Middle"] = np.array([edge[2] for edge in flat], dtype=np.int32)
+        return cls(arrays)
+
+    def addAirport(self):
+        # an airport without routes is simply never reached
+        for offsets, _, _ in (self.forward, self.backward):
+            offsets.append(offsets[-1])
+
+    def save(self, fileLocation: str, key: str):
+        GraphSnapshot.write(fileLocation, {"sourceHash": key, "chVersion": self.VERSION},
+                            {name: self.arrays[name] for name in self._ARRAYS})
+
+    @classmethod
+    def load(cls, fileLocation: str, key: str) -> "ContractionHierarchy":
+        snapshot = GraphSnapshot.read(fileLocation, key)
+        if snapshot is None or snapshot.metadata.get("chVersion") != cls.VERSION:
+            return None
+        return cls(snapshot.arrays)
+
+    def query(self, srcIndex: int, dstIndex: int, stats: QueryStats = None) -> list[int]:
+        # bidirectional upward Dijkstra; returns the unpacked index path or None
+        if srcIndex == dstIndex:
+            return [srcIndex]
+        dist = ({srcIndex: 0.0}, {dstIndex: 0.0})
+        parent = ({srcIndex: -1}, {dstIndex: -1})
+        pqs = ([(0.0, srcIndex)], [(0.0, dstIndex)])
+        graphs = (self.forward, self.backward)
+        best, meet = math.inf, -1
+        visited = relaxed = pops = 0
+        while (pqs[0] and pqs[0][0][0] < best) or (pqs[1] and pqs[1][0][0] < best):
+            for side in (0, 1):
+                pq = pqs[side]
+                if not pq or pq[0][0] >= best:
+                    continue
+                d, u = heapq.heappop(pq)
+                pops += 1
+                ownDist = dist[side]
+                if d > ownDist[u]:
+                    continue
+                otherDist = dist[1 - side].get(u)
+                if otherDist is not None and d + otherDist < best:
+                    best, meet = d + otherDist, u
+                # stall-on-demand: if a higher airport already reaches u more
+                # cheaply through an edge pointing down to u, u's own search
+                # space cannot lie on a shortest path
+                offsets, targets, weights = graphs[1 - side]
+                stalled = False
+                for edge in range(offsets[u], offsets[u + 1]):
+                    upper = ownDist.get(targets[edge])
+                    if upper is not None and upper + weights[edge] < d:
+                        stalled = True
+                        break
+                if stalled:
+                    continue
+                visited += 1
+                offsets, targets, weights = graphs[side]
+                relaxed += offsets[u + 1] - offsets[u]
+                ownParent = parent[side]
+                for edge in range(offsets[u], offsets[u + 1]):
+                    v = targets[edge]
+                    nd = d + weights[edge]
+                    if nd < ownDist.get(v, math.inf):
+                        ownDist[v] = nd
+                        ownParent[v] = u
+                        heapq.heappush(pq, (nd, v))
+        if stats is not None:
+            stats.nodesVisited += visited
+            stats.edgesRelaxed += relaxed
+            stats.heapPops += pops
+            stats.heapPushes += pops + len(pqs[0]) + len(pqs[1])
+        if meet == -1:
+            return None
+
+        overlayPath = []
+        u = meet
+        while u != -1:
+            overlayPath.append(u)
+            u = parent[0][u]
+        overlayPath.reverse()
+        u = parent[1][meet]
+        while u != -1:
+            overlayPath.append(u)
+            u = parent[1][u]
+        path = [overlayPath[0]]
+        for u, w in zip(overlayPath, overlayPath[1:]):
+            path.extend(self._unpack(u, w)[1:])
+        return path
+
+    def _unpack(self, u: int, w: int) -> list[int]:
+        stack, path = [(u, w)], [u]
+        while stack:
+            a, b = stack.pop()
+            m = self.middles.get((a, b))
+            if m is None:
+                path.append(b)
+            else:
+                stack.append((m, b))
+                stack.append((a, m))
+        return path
+
+
+class ContractionHierarchies:
+    # Query engine that keeps one ContractionHierarchy per SearchParameter. A
+    # hierarchy is loaded from fileLocation (next to the graph data) when a
+    # matching one exists, and otherwise built and saved there.
+    #
+    # Shortcuts and the witness searches that ruled others out depend on every
+    # route weight, so a route update or new medians make every hierarchy
+    # stale. Rebuilding one takes seconds on the full data, so after an update
+    # the hierarchies are rebuilt on a background thread from a copy of the
+    # graph taken under updateLock, and CH queries are answered by the
+    # fallback engine's bidirectional Dijkstra until the rebuild is ready. A
+    # rebuild overtaken by a further update is discarded and started again.
+
+    def __init__(self, graph: RouteGraph, medianCost, medianTime, fileLocation: str = None,
+                 fallback: "Dijkstra" = None, updateLock: threading.Lock = None):
+        self.graph = graph
+        self.medianCost = medianCost
+        self.medianTime = medianTime
+        self.fileLocation = fileLocation
+        self.fallback = fallback
+        self.updateLock = updateLock or threading.Lock()
+        self.hierarchies = {}
+        self.shortestPath = []
+        self.nodes_visited = 0
+        self.graphHash = None
+        self.lock = threading.Lock()  # a hierarchy is built once, even when queries run concurrently
+        self.generation = 0  # graph changes seen; hierarchies built from an older one are stale
+        self.pending = {}  # (w_cost, w_time) -> None, in the order the rebuilds were asked for
+        self.rebuilder: threading.Thread = None
+
+    def getHierarchy(self, searchParameter: SearchParameter) -> ContractionHierarchy:
+        key = (searchParameter.cost, searchParameter.time)
+        hierarchy = self.hierarchies.get(key)
+        if hierarchy is not None:
+            return hierarchy
+        with self.lock:
+            return self._loadOrBuild(key, searchParameter)
+
+    def _loadOrBuild(self, key: tuple, searchParameter: SearchParameter) -> ContractionHierarchy:
+        if key not in self.hierarchies:
+            hierarchy = None
+            fileLocation = None
+            if self.fileLocation is not None:
+                if self.graphHash is None:
+                    self.graphHash = self.graph.contentHash()
+                fileLocation = f"{self.fileLocation}.ch-{searchParameter.cost:g}-{searchParameter.time:g}"
+                cacheKey = f"{self.graphHash}:{self.medianCost!r}:{self.medianTime!r}:{key!r}"
+                hierarchy = ContractionHierarchy.load(fileLocation, cacheKey)
+            if hierarchy is None:
+                weights = self.graph.edgeWeights(self.medianCost, self.medianTime).asArray(searchParameter)
+                hierarchy = ContractionHierarchy.build(self.graph.getNumAirports(), self.graph.edgeSources(),
+                                                       self.graph.targets, weights)
+                if fileLocation is not None:
+                    try:
+                        hierarchy.save(fileLocation, cacheKey)
+                    except OSError:
+                        pass
+            self.hierarchies[key] = hierarchy
+        return self.hierarchies[key]
+
+    def _invalidate(self):
+        # every hierarchy in use goes stale and is rebuilt in the background
+        with self.lock:
+            self.generation += 1
+            self.graphHash = None
+            self._rebuildLater(list(self.hierarchies))
+            self.hierarchies = {}
+
+    def _rebuildLater(self, keys: list):
+        # caller holds self.lock
+        for key in keys:
+            self.pending[key] = None
+        if self.pending and self.rebuilder is None:
+            self.rebuilder = threading.Thread(target=self._rebuildPending, name="ch-rebuild", daemon=True)
+            self.rebuilder.start()
+
+    def _rebuildPending(self):
+        while True:
+            with self.lock:
+                if not self.pending:
+                    self.rebuilder = None
+                    return
+                key = next(iter(self.pending))
+                del self.pending[key]
+            # updates hold updateLock while they change the graph, so the copy is consistent;
+            # self.lock is never held while waiting for updateLock, as updates take them the other way round
+            with self.updateLock:
+                generation = self.generation
+                graph = self.graph
+                weights = graph.edgeWeights(self.medianCost, self.medianTime).asArray(SearchParameter(*key)).copy()
+                n, sources, targets = graph.getNumAirports(), graph.edgeSources(), graph.targets.copy()
+            hierarchy = ContractionHierarchy.build(n, sources, targets, weights)
+            with self.lock:
+                if generation == self.generation:
+                    self.hierarchies[key] = hierarchy
+                else:
+                    self._rebuildLater([key])
+
+    def waitForRebuilds(self, timeout: float = None) -> bool:
+        # blocks until no background rebuild is left; False if timeout ran out first
+        deadline = None if timeout is None else perf_counter() + timeout
+        while True:
+            with self.lock:
+                rebuilder = self.rebuilder
+            if rebuilder is None:
+                return True
+            rebuilder.join(None if deadline is None else max(0.0, deadline - perf_counter()))
+            if rebuilder.is_alive():
+                return False
+
+    def routeChanged(self, srcIndex: int, dstIndex: int, old: tuple, new: tuple):
+        self._invalidate()
+
+    def airportAdded(self, index: int, airport: Airport):
+        # an airport without routes changes no shortest path: ready hierarchies
+        # only grow by one unreachable airport, a running rebuild starts over
+        with self.lock:
+            for hierarchy in self.hierarchies.values():
+                hierarchy.addAirport()
+            self.generation += 1
+            self.graphHash = None
+
+    def setMedians(self, medianCost, medianTime):
+        self.medianCost = medianCost
+        self.medianTime = medianTime
+        self._invalidate()
+
+    def findPath(self, srcId: int, dstId: int, searchParameter: SearchParameter, stats: QueryStats = None) -> list[int]:
+        # stateless apart from the hierarchy cache: safe to call from several threads at once
+        key = (searchParameter.cost, searchParameter.time)
+        hierarchy = self.hierarchies.get(key)
+        if hierarchy is None and self.generation > 0 and self.fallback is not None:
+            # the graph changed since loading: never wait for a build
+            with self.lock:
+                hierarchy = self.hierarchies.get(key)
+                if hierarchy is None:
+                    self._rebuildLater([key])
+            if hierarchy is None:
+                return self.fallback.findPath(srcId, dstId, searchParameter, stats, bidirectional=True)
+        if hierarchy is None:
+            hierarchy = self.getHierarchy(searchParameter)
+        path = hierarchy.query(self.graph.idToIndex[srcId], self.graph.idToIndex[dstId], stats)
+        return self.graph.pathToIds(path) if path is not None else []
+
+    def getShortestPath(self, srcId: int, dstId: int, searchParameter: SearchParameter) -> list[int]:
+        stats = QueryStats()
+        self.shortestPath = self.findPath(srcId, dstId, searchParameter, stats)
+        self.nodes_visited += stats.nodesVisited
+        return self.shortestPath
+
+
+class ParetoFront:
+    # Every Pareto-optimal (total cost, total time) path between two airports,
+    # cheapest first. The best path for any linear SearchParameter weighting is
+    # always on the front, so pick() answers any slider position without
+    # searching the graph again.
+
+    def __init__(self, paths: list[tuple[float, float, list[int]]], medianCost, medianTime):
+        self.paths = paths  # (totalCost, totalTime, airport ids)
+        self.medianCost = medianCost
+        self.medianTime = medianTime
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def pick(self, searchParameter: SearchParameter) -> list[int]:
+        if not self.paths:
+            return []
+        weight = lambda path: ((path[0] / self.medianCost) * searchParameter.cost
+                               + (path[1] / self.medianTime) * searchParameter.time)
+        return min(self.paths, key=weight)[2]
+
+
+class ParetoSearch:
+    # Multi-criteria label-setting search (Martins) over (cost, time). Labels
+    # leave the queue in lexicographic (cost, time) order, so a label that is
+    # not dominated by the labels already settled at its airport is itself
+    # Pareto-optimal. Labels that cannot beat the front found so far at the
+    # target, even with the Astar lower bounds added, are pruned.
+    #
+    # epsilon > 0 treats labels within a factor (1 + epsilon) in both criteria
+    # as dominated, and maxLabelsPerNode caps how many labels an airport keeps.
+    # Both bound the work on large fronts at the price of an approximate front.
+    #
+    # Fronts are cached per (src, dst, airlines) and evicted least recently
+    # used once there are more than maxFronts.
+
+    def __init__(self, graph: RouteGraph, astar: Astar, medianCost, medianTime, epsilon: float = 0.0,
+                 maxLabelsPerNode: int = None, maxFronts: int = PARETO_FRONT_CACHE_ENTRIES):
+        self.graph = graph
+        self.astar = astar
+        self.medianCost = medianCost
+        self.medianTime = medianTime
+        self.epsilon = epsilon
+        self.maxLabelsPerNode = maxLabelsPerNode
+        self.maxFronts = maxFronts
+        self.fronts = OrderedDict()  # (src id, dst id, airlines) -> ParetoFront
+        self.lock = threading.Lock()
+        self.shortestPath = []
+        self.nodes_visited = 0
+
+    def _dominated(self, cost: float, time: float, bag: list) -> bool:
+        factor = 1 + self.epsilon
+        cost, time = cost * factor, time * factor
+        for bagCost, bagTime in bag:
+            if bagCost <= cost and bagTime <= time:
+                return True
+        return False
+
+    def _search(self, srcIndex: int, dstIndex: int, stats: QueryStats = None,
+                airlines: AirlineFilter = None) -> list[tuple[float, float, list[int]]]:
+        graph = self.graph
+        allowed = graph.edgeMask(airlines).tolist() if airlines is not None else None
+        costBound, timeBound = (bound.tolist() for bound in self.astar.lowerBounds(dstIndex))
+        labels = [(0.0, 0.0, srcIndex, -1)]  # (cost, time, airport index, parent label)
+        bags = {}  # airport index -> settled (cost, time) labels
+        targetBag = []
+        found = []
+        pq = [(0.0, 0.0, 0)]
+        visited = relaxed = pops = 0
+        while pq:
+            cost, time, labelId = heapq.heappop(pq)
+            pops += 1
+            index = labels[labelId][2]
+            bag = bags.setdefault(index, [])
+            if self._dominated(cost, time, bag):
+                continue
+            if self._dominated(cost + costBound[index], time + timeBound[index], targetBag):
+                continue
+            if self.maxLabelsPerNode is not None and len(bag) >= self.maxLabelsPerNode:
+                continue
+            bag.append((cost, time))
+            visited += 1
+            if index == dstIndex:
+                targetBag.append((cost, time))
+                found.append(labelId)
+                continue
+            start, end = int(graph.offsets[index]), int(graph.offsets[index + 1])
+            relaxed += end - start
+            for edge, nextIndex in enumerate(graph.targets[start:end].tolist(), start):
+                if allowed is not None and not allowed[edge]:
+                    continue
+                nextCost = cost + float(graph.cost[edge])
+                nextTime = time + float(graph.time[edge])
+                if self._dominated(nextCost, nextTime, bags.get(nextIndex, ())):
+                    continue
+                if self._dominated(nextCost + costBound[nextIndex], nextTime + timeBound[nextIndex], targetBag):
+                    continue
+                labels.append((nextCost, nextTime, nextIndex, labelId))
+                heapq.heappush(pq, (nextCost, nextTime, len(labels) - 1))
+        if stats is not None:
+            stats.nodesVisited += visited
+            stats.edgesRelaxed += relaxed
+            stats.heapPops += pops
+            stats.heapPushes += pops + len(pq)
+
+        paths = []
+        for labelId in found:
+            cost, time = labels[labelId][0], labels[labelId][1]
+            path = []
+            while labelId != -1:
+                path.append(labels[labelId][2])
+                labelId = labels[labelId][3]
+            path.reverse()
+            paths.append((cost, time, graph.pathToIds(path)))
+        return paths
+
+    def getParetoFront(self, srcId: int, dstId: int, stats: QueryStats = None,
+                       airlines: AirlineFilter = None) -> ParetoFront:
+        # two threads asking for the same new front may both search; the fronts are equal
+        key = (srcId, dstId, airlines)
+        with self.lock:
+            front = self.fronts.get(key)
+            if front is not None:
+                self.fronts.move_to_end(key)
+        if front is not None:
+            if stats is not None:
+                stats.cacheHits += 1
+            return front
+        paths = self._search(self.graph.idToIndex[srcId], self.graph.idToIndex[dstId], stats, airlines)
+        front = ParetoFront(paths, self.medianCost, self.medianTime)
+        with self.lock:
+            front = self.fronts.setdefault(key, front)
+            self.fronts.move_to_end(key)
+            while len(self.fronts) > self.maxFronts:
+                self.fronts.popitem(last=False)
+        return front
+
+    def findPath(self, srcId: int, dstId: int, searchParameter: SearchParameter, stats: QueryStats = None) -> list[int]:
+        return self.getParetoFront(srcId, dstId, stats, searchParameter.airlines).pick(searchParameter)
+
+    def routeChanged(self, srcIndex: int, dstIndex: int, old: tuple, new: tuple):
+        # A front that uses the route is dropped. A new or cheaper route can
+        # only join a front when even its lower-bound (cost, time) through the
+        # route is not dominated by a path already on it.
+        graph = self.graph
+        routeSrcId, routeDstId = int(graph.airportIds[srcIndex]), int(graph.airportIds[dstIndex])
+        better = _routeGotBetter(old, new)
+
+        def keep(key: tuple, front: ParetoFront) -> bool:
+            if any(_usesRoute(path[2], routeSrcId, routeDstId) for path in front.paths):
+                return False
+            if not better:
+                return True
+            toRoute = self.astar.lowerBound(graph.idToIndex[key[0]], srcIndex)
+            fromRoute = self.astar.lowerBound(dstIndex, graph.idToIndex[key[1]])
+            cost, time = toRoute[0] + new[0] + fromRoute[0], toRoute[1] + new[1] + fromRoute[1]
+            return any(pathCost <= cost and pathTime <= time for pathCost, pathTime, _ in front.paths)
+
+        with self.lock:
+            for key in [key for key, front in self.fronts.items() if not keep(key, front)]:
+                del self.fronts[key]
+
+    def airportAdded(self, index: int, airport: Airport):
+        pass
+
+    def setMedians(self, medianCost, medianTime):
+        # fronts hold raw cost and time, only the weighting in pick() changes
+        self.medianCost = medianCost
+        self.medianTime = medianTime
+        with self.lock:
+            for key, front in self.fronts.items():
+                self.fronts[key] = ParetoFront(front.paths, medianCost, medianTime)
+
+    def getShortestPath(self, srcId: int, dstId: int, searchParameter: SearchParameter) -> list[int]:
+        stats = QueryStats()
+        self.shortestPath = self.findPath(srcId, dstId, searchParameter, stats)
+        self.nodes_visited += stats.nodesVisited
+        return self.shortestPath
+
+
+class bellmanford: 
+    # Relaxes every edge at once over the CSR edge arrays. Each round takes the
+    # scatter-min of dist[source] + weight into the targets, restricted to edges
+    # whose source improved in the previous round, and the search ends as soon
+    # as a round changes nothing.
+
+    def __init__(self, graph: RouteGraph, medianCost, medianTime):
+        self.graph = graph
+        self.sources = graph.edgeSources()
+        self.srcId = None
+        self.dstId = None
+        self.medianCost = medianCost
+        self.medianTime = medianTime
+        self.shortestPath = []
+        self.searchParameter = None
+        self.negativeCycle = False
+        self.nodes_visited = 0
+        self.hops = {}  # AirlineFilter (or None) -> flights per edge, see edgeHops
+
+    def routeChanged(self, srcIndex: int, dstIndex: int, old: tuple, new: tuple):
+        if old is None or new is None:  # edge positions moved
+            self.sources = self.graph.edgeSources()
+            self.hops = {}
+
+    def airportAdded(self, index: int, airport: Airport):
+        pass
+
+    def setMedians(self, medianCost, medianTime):
+        self.medianCost = medianCost
+        self.medianTime = medianTime
+
+    def getWeights(self, searchParameter: SearchParameter) -> np.ndarray:
+        return self.graph.edgeWeights(self.medianCost, self.medianTime).asArray(searchParameter)
+
+    def distancesFrom(self, srcIndex: int, weights: np.ndarray,
+                      stats: QueryStats = None) -> tuple[np.ndarray, np.ndarray]:
+        # Shortest path weight to every index (inf where unreachable) and the
+        # predecessor of every index (-1 for the source and unreached ones).
+        # weights may be negative; a negative cycle reachable from srcIndex
+        # returns None.
+        n = self.graph.getNumAirports()
+        sources, targets = self.sources, self.graph.targets
+        dist = np.full(n, np.inf)
+        dist[srcIndex] = 0.0
+        predecessors = np.full(n, -1, dtype=np.int32)
+        active = np.zeros(n, dtype=bool)
+        active[srcIndex] = True
+
+        for _ in range(n - 1):
+            edges = np.flatnonzero(active[sources])
+            if stats is not None:
+                stats.nodesVisited += int(np.count_nonzero(active))
+                stats.edgesRelaxed += len(edges)
+            candidates = dist[sources[edges]] + weights[edges]
+            improved = candidates < dist[targets[edges]]
+            if not improved.any():
+                break
+            edges, candidates = edges[improved], candidates[improved]
+            edgeTargets = targets[edges]
+            np.minimum.at(dist, edgeTargets, candidates)
+            # the edge that achieved the minimum becomes the predecessor
+            winners = candidates == dist[edgeTargets]
+            predecessors[edgeTargets[winners]] = sources[edges[winners]]
+            active[:] = False
+            active[edgeTargets] = True
+        else:
+            # a shorter path after n - 1 rounds can only come from a negative cycle
+            edges = np.flatnonzero(active[sources])
+            if (dist[sources[edges]] + weights[edges] < dist[targets[edges]]).any():
+                return None
+        return dist, predecessors
+
+    def edgeHops(self, airlines: AirlineFilter = None) -> np.ndarray:
+        # Flights every edge stands for: a route flown with intermediate stops
+        # (the routes.dat stops column) is one flight per leg, so 1 + the fewest
+        # stops among the airlines allowed to fly it.
+        hops = self.hops.get(airlines)
+        if hops is None:
+            hops = self.graph.carriers.edgeStops(airlines).astype(np.int32) + 1
+            self.hops[airlines] = hops
+        return hops
+
+    def hopLimitedDistances(self, srcIndex: int, weights: np.ndarray, hops: np.ndarray, maxHops: int,
+                            stats: QueryStats = None) -> tuple[np.ndarray, np.ndarray]:
+        # Bellman-Ford stopped after maxHops flights, one layer per flight count
+        # over the same edge arrays. dist[h] is the lightest path weight to every
+        # index with at most h flights and parentEdge[h] the last edge of that
+        # path, or -1 where layer h - 1 is already as light. An edge of k flights
+        # relaxes from layer h - k, and only from sources that improved there;
+        # any other source offered the same weight to layer h - 1. Uses
+        # O(maxHops * airports) memory, not a copy of the graph per layer.
+        n = self.graph.getNumAirports()
+        sources, targets = self.sources, self.graph.targets
+        dist = np.full((maxHops + 1, n), np.inf)
+        dist[0, srcIndex] = 0.0
+        parentEdge = np.full((maxHops + 1, n), -1, dtype=np.int32)
+        improved = np.zeros((maxHops + 1, n), dtype=bool)
+        improved[0, srcIndex] = True
+        edgesByHops = {int(k): np.flatnonzero(hops == k) for k in np.unique(hops)}
+
+        for h in range(1, maxHops + 1):
+            layer = dist[h]
+            layer[:] = dist[h - 1]
+            for k, edges in edgesByHops.items():
+                if k > h or not improved[h - k].any():
+                    continue
+                edges = edges[improved[h - k][sources[edges]]]
+                if stats is not None:
+                    stats.nodesVisited += int(np.count_nonzero(improved[h - k]))
+                    stats.edgesRelaxed += len(edges)
+                candidates = dist[h - k][sources[edges]] + weights[edges]
+                better = candidates < layer[targets[edges]]
+                edges, candidates = edges[better], candidates[better]
+                edgeTargets = targets[edges]
+                np.minimum.at(layer, edgeTargets, candidates)
+                # the edge that achieved the minimum becomes the parent
+                winners = candidates == layer[edgeTargets]
+                parentEdge[h][edgeTargets[winners]] = edges[winners]
+            improved[h] = layer < dist[h - 1]
+        return dist, parentEdge
+
+    def findPathsByHops(self, srcId: int, dstId: int, searchParameter: SearchParameter, maxHops: int,
+                        stats: QueryStats = None) -> list[list[int]]:
+        # The lightest path with at most h flights for every h from 1 to maxHops,
+        # from one layered search; None where there is none. Stateless: safe to
+        # call from several threads at once.
+        graph = self.graph
+        srcIndex, dstIndex = graph.idToIndex[srcId], graph.idToIndex[dstId]
+        hops = self.edgeHops(searchParameter.airlines)
+        dist, parentEdge = self.hopLimitedDistances(srcIndex, self.getWeights(searchParameter), hops, maxHops, stats)
+        sources = self.sources
+        paths = []
+        for h in range(1, maxHops + 1):
+            if math.isinf(dist[h, dstIndex]):
+                paths.append(None)
+                continue
+            path, layer, current = [dstIndex], h, dstIndex
+            while current != srcIndex:
+                edge = int(parentEdge[layer, current])
+                if edge == -1:
+                    layer -= 1
+                    continue
+                current = int(sources[edge])
+                layer -= int(hops[edge])
+                path.append(current)
+            path.reverse()
+            paths.append(graph.pathToIds(path))
+        return paths
+
+    def findPathWithinHops(self, srcId: int, dstId: int, searchParameter: SearchParameter, maxHops: int,
+                           stats: QueryStats = None) -> list[int]:
+        return self.findPathsByHops(srcId, dstId, searchParameter, maxHops, stats)[-1]
+
+    def bellmanford(self, srcId: int, dstId: int, searchParameter: SearchParameter, weights: np.ndarray = None):
+        # weights overrides the SearchParameter edge weights, e.g. with negative ones;
+        # a negative cycle sets negativeCycle and returns None
+        stats = QueryStats()
+        self.shortestPath = self.findPath(srcId, dstId, searchParameter, stats, weights)
+        self.negativeCycle = self.shortestPath is None
+        self.nodes_visited += stats.nodesVisited
+        return self.shortestPath
+
+    def findPath(self, srcId: int, dstId: int, searchParameter: SearchParameter, stats: QueryStats = None,
+                 weights: np.ndarray = None) -> list[int]:
+        # stateless: safe to call from several threads at once
+        graph = self.graph
+        srcIndex, dstIndex = graph.idToIndex[srcId], graph.idToIndex[dstId]
+        if weights is None:
+            weights = self.getWeights(searchParameter)
+        result = self.distancesFrom(srcIndex, weights, stats)
+        if result is None:
+            return None
+        dist, predecessors = result
+
+        shortest_path = []
+        if not math.isinf(dist[dstIndex]):
+            current_vertex = dstIndex
+            while current_vertex != -1:
+                shortest_path.append(current_vertex)
+                current_vertex = int(predecessors[current_vertex])
+        shortest_path.reverse()
+        return graph.pathToIds(shortest_path)
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    # splitmix64 finaliser: the same well-spread 64-bit value for the same key on every platform
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _parseScheduleTime(value: str) -> int:
+    # "HH:MM" or "HH:MM+N" (N days later) to minutes from 00:00 on the first day
+    clock, _, days = value.strip().partition("+")
+    hours, minutes = clock.split(":")
+    return (int(days or 0) * MINUTES_PER_DAY) + int(hours) * 60 + int(minutes)
+
+
+class Timetable:
+    # Scheduled flights as flat arrays sorted by departure: connection c leaves
+    # airport index depStop[c] at depTime[c] and lands at arrStop[c] at
+    # arrTime[c], flown by AirlineTable row airline[c] (-1 when unknown). Times
+    # are minutes from 00:00 UTC on the first day; one day's flights repeat for
+    # `days` days. minConnection[i] is the least time between landing at and
+    # taking off from airport index i. For ConnectionScan's profile queries the
+    # connections are also indexed by departure airport: byStop lists them
+    # ordered by (depStop, depTime) and stopOffsets delimits each airport.
+    FIRST_DEPARTURE = 6 * 60  # local time
+    LAST_DEPARTURE = 23 * 60
+    MAX_DAILY_FLIGHTS = 12
+
+    def __init__(self, depStop, arrStop, depTime, arrTime, airline, numAirports: int, days: int,
+                 generated: bool = False, seed: int = None):
+        order = np.argsort(depTime, kind="stable")
+        self.depStop = np.asarray(depStop, dtype=np.int32)[order]
+        self.arrStop = np.asarray(arrStop, dtype=np.int32)[order]
+        self.depTime = np.asarray(depTime, dtype=np.int64)[order]
+        self.arrTime = np.asarray(arrTime, dtype=np.int64)[order]
+        self.airline = np.asarray(airline, dtype=np.int32)[order]
+        self.days = days
+        self.generated = generated  # from the route graph; False when read from a schedule file
+        self.seed = seed
+        self.skipped = {}  # schedule file rows left out, by reason
+        self.minConnection = np.full(numAirports, MIN_CONNECTION_MINUTES, dtype=np.int64)
+        self._index()
+
+    def _index(self):
+        numAirports = len(self.minConnection)
+        self.byStop = np.lexsort((self.depTime, self.depStop))
+        self.stopOffsets = np.zeros(numAirports + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.depStop, minlength=numAirports), out=self.stopOffsets[1:])
+        self.position = np.empty(len(self.byStop), dtype=np.int64)  # connection -> place in byStop
+        self.position[self.byStop] = np.arange(len(self.byStop))
+        self._onward = None
+
+    def onwardPlaces(self) -> np.ndarray:
+        # per connection, the first byStop place at its arrival airport that
+        # departs after the minimum connection time, or that airport's end
+        # offset when none does; built on first use
+        if self._onward is None:
+            span = np.int64(self.days + 2) * MINUTES_PER_DAY  # above any time, so keys sort airport-major
+            stopKeys = self.depStop[self.byStop].astype(np.int64) * span + self.depTime[self.byStop]
+            keys = self.arrStop.astype(np.int64) * span + self.arrTime + self.minConnection[self.arrStop]
+            order = np.argsort(keys)  # sorted needles make the search cache-friendly
+            self._onward = np.empty(len(keys), dtype=np.int64)
+            self._onward[order] = np.searchsorted(stopKeys, keys[order], side="left")
+        return self._onward
+
+    def __len__(self) -> int:
+        return len(self.depTime)
+
+    @classmethod
+    def generate(cls, graph: RouteGraph, airports: AirportTable, days: int = TIMETABLE_DAYS,
+                 seed: int = TIMETABLE_SEED) -> "Timetable":
+        # A reproducible frequency model over the routes of graph. Each route
+        # gets daily flights per operating (non-codeshare) airline: 3 up to
+        # 1500 km, 2 up to 4000 km and 1 beyond, at most MAX_DAILY_FLIGHTS.
+        # They are spread between FIRST_DEPARTURE and LAST_DEPARTURE local time
+        # at the departure airport, with a jitter hashed from seed and the
+        # route's airport ids, so a route keeps its flights when others change.
+        # The airlines take the flights in turn; block time is the cruise time
+        # plus TIMETABLE_BLOCK_MINUTES.
+        numEdges = graph.getNumRoutes()
+        carriers = graph.carriers
+        rowEdges = carriers.rowEdges()
+        operating = ~carriers.codeshare
+        operating |= np.bincount(rowEdges[operating], minlength=numEdges)[rowEdges] == 0  # only codeshares listed
+        flyRows = np.flatnonzero(operating)
+        flyCount = np.bincount(rowEdges[flyRows], minlength=numEdges)
+        flyOffsets = np.zeros(numEdges + 1, dtype=np.int64)
+        np.cumsum(flyCount, out=flyOffsets[1:])
+
+        distance = graph.distance
+        perAirline = np.where(distance > 4000, 1, np.where(distance > 1500, 2, 3))
+        frequency = np.minimum(np.maximum(flyCount, 1) * perAirline, cls.MAX_DAILY_FLIGHTS)
+        edges = np.repeat(np.arange(numEdges), frequency)
+        starts = np.zeros(numEdges + 1, dtype=np.int64)
+        np.cumsum(frequency, out=starts[1:])
+        flight = np.arange(len(edges)) - starts[edges]  # k-th flight of its route
+
+        sources = graph.edgeSources()[edges]
+        targets = graph.targets[edges]
+        key = _mix64(np.uint64(seed) ^ _mix64(graph.airportIds[sources].astype(np.uint64)))
+        key = _mix64(key ^ graph.airportIds[targets].astype(np.uint64))
+        jitter = (_mix64(key ^ flight.astype(np.uint64)) >> np.uint64(11)) / float(1 << 53)
+        window = cls.LAST_DEPARTURE - cls.FIRST_DEPARTURE
+        local = cls.FIRST_DEPARTURE + ((flight + jitter) * window / frequency[edges]).astype(np.int64)
+        utcOffset = np.rint(np.nan_to_num(airports.timezone[sources]) * 60).astype(np.int64)
+        departure = (local - utcOffset) % MINUTES_PER_DAY
+        block = np.rint(distance[edges] / AIRCRAFT_SPEED * 60).astype(np.int64) + TIMETABLE_BLOCK_MINUTES
+        arrival = departure + np.maximum(block, 1)
+        airline = np.full(len(edges), -1, dtype=np.int32)
+        flown = flyCount[edges] > 0
+        airline[flown] = carriers.airline[flyRows[flyOffsets[edges[flown]] + flight[flown] % flyCount[edges[flown]]]]
+
+        return cls._repeat(sources, targets, departure, arrival, airline, graph.getNumAirports(), days,
+                           generated=True, seed=seed)
+
+    @classmethod
+    def load(cls, fileLocation: str, airports: AirportTable, airlines: AirlineTable,
+             days: int = TIMETABLE_DAYS) -> "Timetable":
+        # One day of flights from a CSV schedule: departure airport, arrival
+        # airport, departure, arrival and optionally the airline. Airports are
+        # OpenFlights ids or IATA / ICAO codes, airlines codes or ids; times are
+        # UTC "HH:MM", with "+N" for N days later. An arrival at or before the
+        # departure is taken to be on the next day.
+        sources, targets, departures, arrivals, flownBy = array("i"), array("i"), array("q"), array("q"), array("i")
+        skipped = {}
+
+        def airportRow(code: str) -> int:
+            code = code.strip()
+            if code.isdigit():
+                return airports.idToRow.get(int(code))
+            return airports.iataToRow.get(code, airports.icaoToRow.get(code))
+
+        with open(fileLocation, "r", encoding="utf8") as file:
+            for row in csv.reader(file, delimiter=","):
+                if not row or row[0].startswith("#"):
+                    continue
+                if len(row) < 4:
+                    skipped["malformed"] = skipped.get("malformed", 0) + 1
+                    continue
+                src, dst = airportRow(row[0]), airportRow(row[1])
+                if src is None or dst is None or not airports.alive[src] or not airports.alive[dst]:
+                    skipped["unknownAirport"] = skipped.get("unknownAirport", 0) + 1
+                    continue
+                try:
+                    departure, arrival = _parseScheduleTime(row[2]), _parseScheduleTime(row[3])
+                except ValueError:
+                    skipped["badTime"] = skipped.get("badTime", 0) + 1
+                    continue
+                while arrival <= departure:
+                    arrival += MINUTES_PER_DAY
+                airline = row[4].strip() if len(row) > 4 else ""
+                airline = airlines.find(int(airline) if airline.isdigit() else airline) if airline else None
+                sources.append(src)
+                targets.append(dst)
+                departures.append(departure)
+                arrivals.append(arrival)
+                flownBy.append(-1 if airline is None else airline)
+        timetable = cls._repeat(np.frombuffer(sources, dtype=np.int32), np.frombuffer(targets, dtype=np.int32),
+                                np.frombuffer(departures, dtype=np.int64), np.frombuffer(arrivals, dtype=np.int64),
+                                np.frombuffer(flownBy, dtype=np.int32), len(airports.ids), days)
+        timetable.skipped = skipped
+        return timetable
+
+    @classmethod
+    def _repeat(cls, sources, targets, departure, arrival, airline, numAirports: int, days: int,
+                generated: bool = False, seed: int = None) -> "Timetable":
+        shift = np.repeat(np.arange(days, dtype=np.int64) * MINUTES_PER_DAY, len(departure))
+        return cls(np.tile(sources, days), np.tile(targets, days), np.tile(departure, days) + shift,
+                   np.tile(arrival, days) + shift, np.tile(airline, days), numAirports, days, generated, seed)
+
+    def setMinConnection(self, index: int, minutes: int):
+        # minimum connection time at airport index, e.g. longer at a hub with terminal changes
+        self.minConnection[index] = minutes
+        self._onward = None
+
+    def removeRoute(self, srcIndex: int, dstIndex: int):
+        keep = (self.depStop != srcIndex) | (self.arrStop != dstIndex)
+        for field in ("depStop", "arrStop", "depTime", "arrTime", "airline"):
+            setattr(self, field, getattr(self, field)[keep])
+        self._index()
+
+    def addAirport(self):
+        self.minConnection = np.append(self.minConnection, np.int64(MIN_CONNECTION_MINUTES))
+        self.stopOffsets = np.append(self.stopOffsets, self.stopOffsets[-1])
+        self._onward = None
+
+    def allowedConnections(self, airlines: AirlineFilter) -> np.ndarray:
+        # flights an airline filter allows; a flight of unknown airline is not allowed
+        return np.append(airlines.allowed, False)[self.airline]
+
+
+class ConnectionScan:
+    # Connection Scan Algorithm over a Timetable. The textbook scan visits
+    # connections one at a time in departure order; here they go in batches of
+    # departures spanning the shortest minimum connection time. No flight can
+    # land and be connected to within its own batch, so each batch is relaxed
+    # at once with NumPy, the same scatter-min as bellmanford. Every flight is
+    # its own trip, so staying aboard never needs tracking. Minutes are int64;
+    # NEVER stands for "not reachable".
+    NEVER = np.int64(1 << 40)
+
+    def __init__(self, timetable: Timetable):
+        self.timetable = timetable
+
+    def _batchWidth(self) -> int:
+        minConnection = self.timetable.minConnection
+        return max(1, int(minConnection.min())) if len(minConnection) else 1
+
+    def earliestArrival(self, srcIndex: int, dstIndex: int, departAfter: int, airlines: AirlineFilter = None,
+                        stats: QueryStats = None) -> list[int]:
+        # connections of the journey leaving srcIndex no earlier than departAfter
+        # that lands at dstIndex first, or None; [] when srcIndex is dstIndex
+        if srcIndex == dstIndex:
+            return []
+        tt = self.timetable
+        depStop, arrStop, depTime, arrTime = tt.depStop, tt.arrStop, tt.depTime, tt.arrTime
+        allowed = tt.allowedConnections(airlines) if airlines is not None else None
+        n = len(tt.minConnection)
+        arrival = np.full(n, self.NEVER)
+        ready = np.full(n, self.NEVER)  # earliest take-off from each airport
+        arrival[srcIndex] = ready[srcIndex] = departAfter
+        inConnection = np.full(n, -1, dtype=np.int64)
+        width = self._batchWidth()
+        start = int(np.searchsorted(depTime, departAfter, side="left"))
+        scanned = 0
+        while start < len(depTime) and depTime[start] < arrival[dstIndex]:
+            end = int(np.searchsorted(depTime, depTime[start] + width, side="left"))
+            taken = depTime[start:end] >= ready[depStop[start:end]]
+            if allowed is not None:
+                taken &= allowed[start:end]
+            scanned += end - start
+            connections = np.flatnonzero(taken) + start
+            landing, stops = arrTime[connections], arrStop[connections]
+            better = landing < arrival[stops]
+            connections, landing, stops = connections[better], landing[better], stops[better]
+            np.minimum.at(arrival, stops, landing)
+            # the connection that achieved the minimum becomes the one flown in
+            winners = landing == arrival[stops]
+            inConnection[stops[winners]] = connections[winners]
+            ready[stops] = arrival[stops] + tt.minConnection[stops]
+            start = end
+        if stats is not None:
+            stats.edgesRelaxed += scanned
+            stats.nodesVisited += int(np.count_nonzero(arrival < self.NEVER))
+        if arrival[dstIndex] == self.NEVER:
+            return None
+        journey = [int(inConnection[dstIndex])]
+        while depStop[journey[-1]] != srcIndex:
+            journey.append(int(inConnection[depStop[journey[-1]]]))
+        journey.reverse()
+        return journey
+
+    def profile(self, srcIndex: int, dstIndex: int, start: int, end: int, airlines: AirlineFilter = None,
+                stats: QueryStats = None) -> list[list[int]]:
+        # Every journey leaving srcIndex between start and end that no other
+        # journey beats by leaving later and landing no later, earliest
+        # departure first. One backward scan computes, for every
+        # connection, the earliest landing at dstIndex when taking it (arrives);
+        # best[p] is the minimum of arrives over byStop places p onwards of the
+        # same airport, i.e. the best landing when ready at that airport by the
+        # departure at p. Batches run backwards for the same reason as above.
+        if srcIndex == dstIndex:
+            return []
+        tt = self.timetable
+        depStop, arrStop, depTime, arrTime = tt.depStop, tt.arrStop, tt.depTime, tt.arrTime
+        byStop, stopOffsets, position = tt.byStop, tt.stopOffsets, tt.position
+        onwardPlaces = tt.onwardPlaces()
+        allowed = tt.allowedConnections(airlines) if airlines is not None else None
+        arrives = np.full(len(depTime), self.NEVER)
+        best = np.full(len(depTime), self.NEVER)
+        width = self._batchWidth()
+        first = int(np.searchsorted(depTime, start, side="left"))
+        hi = len(depTime)
+        while hi > first:
+            lo = max(first, int(np.searchsorted(depTime, depTime[hi - 1] - width, side="right")))
+            stops, landing = arrStop[lo:hi], arrTime[lo:hi]
+            places = onwardPlaces[lo:hi]
+            onward = np.where(places < stopOffsets[stops + 1], best[np.minimum(places, len(best) - 1)], self.NEVER)
+            batch = np.where(stops == dstIndex, landing, onward)
+            if allowed is not None:
+                batch[~allowed[lo:hi]] = self.NEVER
+            arrives[lo:hi] = batch
+
+            # best over each airport's places in this batch, which sit together
+            # right before the places already done: a minimum accumulated from
+            # the back, restarted per airport by lifting every earlier airport's
+            # values above all later ones
+            places = np.sort(position[lo:hi])
+            values = arrives[byStop[places]]
+            owners = depStop[byStop[places]]
+            last = np.flatnonzero(np.append(owners[1:] != owners[:-1], True))
+            following = places[last] + 1
+            carried = np.full(len(last), self.NEVER)
+            inside = following < stopOffsets[owners[last] + 1]
+            carried[inside] = best[following[inside]]
+            values[last] = np.minimum(values[last], carried)
+            group = np.cumsum(np.append(0, owners[1:] != owners[:-1]))
+            lift = group * (2 * self.NEVER)
+            best[places] = np.minimum.accumulate((values + lift)[::-1])[::-1] - lift
+            if stats is not None:
+                stats.edgesRelaxed += hi - lo
+            hi = lo
+
+        journeys = []
+        latest = self.NEVER
+        for place in range(int(stopOffsets[srcIndex + 1]) - 1, int(stopOffsets[srcIndex]) - 1, -1):
+            connection = int(byStop[place])
+            if depTime[connection] >= end or depTime[connection] < start:
+                continue
+            landing = arrives[connection]
+            if landing >= latest:
+                continue
+            latest = landing
+            if journeys and depTime[journeys[-1][0]] == depTime[connection]:
+                journeys.pop()  # leaves at the same time but lands later
+            journey = [connection]
+            while arrStop[journey[-1]] != dstIndex:
+                # of the onward flights that still land at landing, the last to
+                # leave: the shortest wait, and no detour back to this airport
+                candidates = byStop[onwardPlaces[journey[-1]]:stopOffsets[arrStop[journey[-1]] + 1]]
+                journey.append(int(candidates[np.flatnonzero(arrives[candidates] == landing)[-1]]))
+            journeys.append(journey)
+        journeys.reverse()
+        return journeys
+
+
+def readAirportAndRoutes():
+    # Get the directory of the current script
+    script_directory = os.path.dirname(os.path.abspath(__file__))
+
+#     # Define the relative path to the file within the Data folder
+    airports_path = os.path.join('data', 'airports.dat')
+    routes_path = os.path.join('data', 'routes.dat')
+
+    return FlightPathing(airports_path, routes_path)
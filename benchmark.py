@@ -0,0 +1,273 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timezone
+from time import perf_counter
+
+import numpy as np
+
+import FlightMapRouting
+
+# Reproducible benchmark for FlightMapRouting: load phases, per-algorithm
+# query latency, nodes settled, edges relaxed and peak memory over a fixed,
+# stratified query set, written as JSON. "compare" checks a result file
+# against a stored baseline and exits with status 1 on regressions.
+#
+#   python benchmark.py run --output results.json
+#   python benchmark.py run --baseline baseline.json
+#   python benchmark.py compare baseline.json results.json
+
+ALGORITHMS = ("DIJKSTRA", "BIDIRECTIONAL-DIJKSTRA", "ASTAR", "ALT", "CH", "PARETO", "BELLMAN-FORD")
+DEFAULT_SEED = 1108
+DEFAULT_PER_STRATUM = 6
+DEFAULT_TOLERANCE = 0.2
+# candidate pairs drawn while filling the strata before giving up on the rare ones
+MAX_CANDIDATES = 20000
+# queries per algorithm re-run under tracemalloc, which is too slow for the timed pass
+MEMORY_SAMPLE = 10
+# hop counts bounding the short / medium / long strata
+HOP_BUCKETS = ((2, "short"), (4, "medium"), (sys.maxsize, "long"))
+# (metric path, absolute slack) checked by compare; the slack keeps timer noise
+# on very small values from being reported as a regression
+COMPARED_METRICS = ((("latencyMs", "p50"), 0.05), (("latencyMs", "p90"), 0.05), (("nodesSettled", "mean"), 0.5),
+                    (("edgesRelaxed", "mean"), 0.5), (("peakMemoryKb",), 16.0))
+# seed for the route costs FlightPathing draws while parsing, the library default
+ROUTE_SEED = 50
+
+
+def region(airport: FlightMapRouting.Airport) -> str:
+    # first part of the tz database name (kept in Airport.DST), e.g. "Europe"
+    return airport.DST.split("/")[0] if airport.DST and airport.DST != "\\N" else "Unknown"
+
+
+def stratum(flightPathing: FlightMapRouting.FlightPathing, srcId: int, dstId: int) -> str:
+    path = flightPathing.dijkstra.findPath(srcId, dstId, FlightMapRouting.SearchParameter(0.5, 0.5),
+                                           bidirectional=True)
+    if not path:
+        return "unreachable"
+    hops = len(path) - 1
+    length = next(name for limit, name in HOP_BUCKETS if hops <= limit)
+    sameRegion = region(flightPathing.idToAirportMap[srcId]) == region(flightPathing.idToAirportMap[dstId])
+    return f"{length}/{'intra' if sameRegion else 'inter'}-region"
+
+
+def buildQuerySet(flightPathing: FlightMapRouting.FlightPathing, seed: int, perStratum: int) -> dict:
+    # stratum name -> list of distinct (srcId, dstId), perStratum each where the data allows
+    names = ["unreachable"] + [f"{length}/{scope}-region" for _, length in HOP_BUCKETS
+                               for scope in ("intra", "inter")]
+    strata = {name: [] for name in names}
+    seen = set()
+    airportIds = sorted(flightPathing.idToAirportMap)
+    rng = random.Random(seed)
+    for _ in range(MAX_CANDIDATES):
+        if all(len(pairs) >= perStratum for pairs in strata.values()):
+            break
+        pair = (rng.choice(airportIds), rng.choice(airportIds))
+        if pair[0] == pair[1] or pair in seen:
+            continue
+        seen.add(pair)
+        pairs = strata[stratum(flightPathing, *pair)]
+        if len(pairs) < perStratum:
+            pairs.append(pair)
+    return strata
+
+
+def summarize(values: list) -> dict:
+    if not values:
+        return {"mean": None, "p50": None, "p90": None, "p99": None, "max": None}
+    values = np.asarray(values, dtype=np.float64)
+    return {"mean": float(values.mean()), "p50": float(np.percentile(values, 50)),
+            "p90": float(np.percentile(values, 90)), "p99": float(np.percentile(values, 99)),
+            "max": float(values.max())}
+
+
+def engineFor(flightPathing: FlightMapRouting.FlightPathing, algorithm: str):
+    # stateless findPath of each engine, bypassing the route cache
+    engines = {"DIJKSTRA": flightPathing.dijkstra.findPath,
+               "BIDIRECTIONAL-DIJKSTRA": lambda *args: flightPathing.dijkstra.findPath(*args, bidirectional=True),
+               "ASTAR": flightPathing.astar.findPath, "ALT": flightPathing.alt.findPath,
+               "CH": flightPathing.ch.findPath, "PARETO": flightPathing.pareto.findPath,
+               "BELLMAN-FORD": flightPathing.bellmanford.findPath}
+    return engines[algorithm]
+
+
+def benchmarkAlgorithm(flightPathing: FlightMapRouting.FlightPathing, algorithm: str, strata: dict,
+                       weights: list) -> dict:
+    findPath = engineFor(flightPathing, algorithm)
+    queries = [(name, srcId, dstId, FlightMapRouting.SearchParameter(cost, time))
+               for cost, time in weights for name, pairs in strata.items() for srcId, dstId in pairs]
+
+    # the first query of each weighting pays for lazy preprocessing (ALT tables, CH build)
+    start = perf_counter()
+    for cost, time in weights:
+        if queries:
+            findPath(queries[0][1], queries[0][2], FlightMapRouting.SearchParameter(cost, time))
+    preprocessSeconds = perf_counter() - start
+    # the Pareto fronts are cached per pair, so start from an empty cache
+    flightPathing.pareto.fronts.clear()
+
+    latencies, nodes, edges, pops, heuristic, found = [], [], [], [], [], 0
+    byStratum = {}
+    for name, srcId, dstId, searchParameter in queries:
+        stats = FlightMapRouting.QueryStats()
+        start = perf_counter()
+        path = findPath(srcId, dstId, searchParameter, stats)
+        latency = (perf_counter() - start) * 1000
+        latencies.append(latency)
+        nodes.append(stats.nodesVisited)
+        edges.append(stats.edgesRelaxed)
+        pops.append(stats.heapPops)
+        heuristic.append(stats.heuristicTime * 1000)
+        found += bool(path)
+        byStratum.setdefault(name, ([], []))
+        byStratum[name][0].append(latency)
+        byStratum[name][1].append(stats.nodesVisited)
+    flightPathing.pareto.fronts.clear()
+
+    tracemalloc.start()
+    peak = 0
+    for _, srcId, dstId, searchParameter in queries[:MEMORY_SAMPLE]:
+        tracemalloc.reset_peak()
+        findPath(srcId, dstId, searchParameter)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    flightPathing.pareto.fronts.clear()
+
+    return {"preprocessSeconds": preprocessSeconds, "queries": len(queries), "found": found,
+            "latencyMs": summarize(latencies), "nodesSettled": summarize(nodes), "edgesRelaxed": summarize(edges),
+            "heapPops": summarize(pops), "heuristicMs": summarize(heuristic),
+            "peakMemoryKb": peak / 1024,
+            "strata": {name: {"queries": len(values[0]), "latencyMsP50": float(np.percentile(values[0], 50)),
+                              "nodesSettledMean": float(np.mean(values[1]))}
+                       for name, values in byStratum.items()}}
+
+
+def load(airportsFile: str, routesFile: str, **kwargs) -> FlightMapRouting.FlightPathing:
+    return FlightMapRouting.FlightPathing(airportsFile, routesFile, seed=ROUTE_SEED, **kwargs)
+
+
+def loadPhases(flightPathing: FlightMapRouting.FlightPathing) -> dict:
+    phases = dict(flightPathing.loadTimings)
+    phases["total"] = sum(phases.values())
+    return phases
+
+
+def run(args) -> dict:
+    # the snapshot-backed load goes first so a missing snapshot is written from a fresh seed
+    flightPathing = load(args.airports, args.routes)
+    warmPhases = loadPhases(load(args.airports, args.routes))
+    coldPhases = loadPhases(load(args.airports, args.routes, useSnapshot=False))
+    tracemalloc.start()
+    load(args.airports, args.routes, useSnapshot=False)
+    coldPeak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    strata = buildQuerySet(flightPathing, args.seed, args.per_stratum)
+    weights = [(1 - time, time) for time in args.weights]
+    results = {
+        "meta": {"seed": args.seed, "queriesPerStratum": args.per_stratum, "weights": weights,
+                 "graphHash": flightPathing.graph.contentHash(), "airports": flightPathing.graph.getNumAirports(),
+                 "routes": flightPathing.graph.getNumRoutes(), "python": platform.python_version(),
+                 "numpy": np.__version__, "platform": platform.platform(), "cpus": os.cpu_count(),
+                 "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds")},
+        "strata": {name: len(pairs) for name, pairs in strata.items()},
+        "load": {"cold": coldPhases, "warm": warmPhases, "coldPeakMemoryKb": coldPeak / 1024},
+        "algorithms": {},
+    }
+    for algorithm in args.algorithms:
+        print(f"benchmarking {algorithm} ...", file=sys.stderr)
+        results["algorithms"][algorithm] = benchmarkAlgorithm(flightPathing, algorithm.upper(), strata, weights)
+    return results
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    # human-readable regressions of current against baseline, empty when there are none
+    regressions = []
+    if baseline["meta"].get("graphHash") != current["meta"].get("graphHash"):
+        print("warning: the two runs used different route data", file=sys.stderr)
+    for kind in ("cold", "warm"):
+        before, after = baseline["load"][kind]["total"], current["load"][kind]["total"]
+        if after > before * (1 + tolerance) and after - before > 0.01:
+            regressions.append(f"load/{kind} total: {before:.3f}s -> {after:.3f}s")
+    for algorithm, before in baseline["algorithms"].items():
+        after = current["algorithms"].get(algorithm)
+        if after is None:
+            continue
+        for path, slack in COMPARED_METRICS:
+            old, new = before, after
+            for key in path:
+                old, new = old[key], new[key]
+            if old is None or new is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > slack:
+                regressions.append(f"{algorithm} {'.'.join(path)}: {old:.3f} -> {new:.3f} "
+                                   f"(+{(new / old - 1) * 100 if old else float('inf'):.0f}%)")
+    return regressions
+
+
+def report(results: dict):
+    print(f"{'algorithm':<24}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'nodes':>10}{'edges':>11}{'peak KB':>10}")
+    for algorithm, result in results["algorithms"].items():
+        latency = result["latencyMs"]
+        print(f"{algorithm:<24}{latency['p50']:>10.3f}{latency['p90']:>10.3f}{latency['p99']:>10.3f}"
+              f"{result['nodesSettled']['mean']:>10.0f}{result['edgesRelaxed']['mean']:>11.0f}"
+              f"{result['peakMemoryKb']:>10.0f}")
+    print(f"load: cold {results['load']['cold']['total']:.3f}s, warm {results['load']['warm']['total']:.3f}s")
+
+
+def printRegressions(regressions: list[str]) -> int:
+    if not regressions:
+        print("no regressions")
+        return 0
+    print("regressions:")
+    for regression in regressions:
+        print("  " + regression)
+    return 1
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the FlightMapRouting engines.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    runParser = commands.add_parser("run", help="run the benchmark and write the results as JSON")
+    runParser.add_argument("--airports", default=os.path.join("data", "airports.dat"))
+    runParser.add_argument("--routes", default=os.path.join("data", "routes.dat"))
+    runParser.add_argument("--output", default="benchmark-results.json")
+    runParser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    runParser.add_argument("--per-stratum", type=int, default=DEFAULT_PER_STRATUM)
+    runParser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), type=str.upper,
+                           choices=ALGORITHMS)
+    runParser.add_argument("--weights", nargs="+", type=float, default=[0.5],
+                           help="time weights of the SearchParameters to run, cost = 1 - time")
+    runParser.add_argument("--baseline", help="compare against this result file after running")
+    runParser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    compareParser = commands.add_parser("compare", help="compare a result file against a baseline")
+    compareParser.add_argument("baseline")
+    compareParser.add_argument("current")
+    compareParser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline, encoding="utf8") as file:
+            baseline = json.load(file)
+        with open(args.current, encoding="utf8") as file:
+            current = json.load(file)
+        return printRegressions(compare(baseline, current, args.tolerance))
+
+    results = run(args)
+    with open(args.output, "w", encoding="utf8") as file:
+        json.dump(results, file, indent=2)
+    report(results)
+    print(f"results written to {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf8") as file:
+            baseline = json.load(file)
+        return printRegressions(compare(baseline, results, args.tolerance))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
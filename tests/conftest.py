@@ -0,0 +1,112 @@
+import heapq
+import math
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import FlightMapRouting  # noqa: E402
+
+# The Japanese airports of data/airports.dat with the routes and airlines
+# between them: small enough to load in milliseconds, large enough for
+# multi-hop routes, duplicate carrier rows and airports without routes.
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+AIRPORTS_FILE = os.path.join(DATA_DIR, "airports.dat")
+ROUTES_FILE = os.path.join(DATA_DIR, "routes.dat")
+
+ALGORITHMS = ("DIJKSTRA", "BIDIRECTIONAL-DIJKSTRA", "ASTAR", "ALT", "CH", "PARETO", "BELLMAN-FORD")
+WEIGHTINGS = ((0.5, 0.5), (1.0, 0.0), (0.2, 0.8))
+PAIRS = 40
+
+
+def loadFixture(**kwargs) -> FlightMapRouting.FlightPathing:
+    return FlightMapRouting.FlightPathing(AIRPORTS_FILE, ROUTES_FILE, useSnapshot=False, **kwargs)
+
+
+@pytest.fixture
+def flightPathing() -> FlightMapRouting.FlightPathing:
+    # a fresh graph per test, so live updates never leak between tests
+    return loadFixture()
+
+
+@pytest.fixture(scope="module")
+def sharedFlightPathing() -> FlightMapRouting.FlightPathing:
+    # for tests that only query
+    return loadFixture()
+
+
+def routedAirportIds(flightPathing: FlightMapRouting.FlightPathing) -> list[int]:
+    # ids of the airports with at least one route, in graph order
+    graph = flightPathing.graph
+    degree = np.diff(graph.offsets) + np.diff(flightPathing.reverseGraph.offsets)
+    return [int(graph.airportIds[index]) for index in np.flatnonzero(degree)]
+
+
+def edgeWeight(flightPathing: FlightMapRouting.FlightPathing, srcIndex: int, dstIndex: int,
+               costWeight: float, timeWeight: float) -> float:
+    edge = flightPathing.graph.findEdge(srcIndex, dstIndex)
+    assert edge != -1, "the path uses a route that does not exist"
+    graph = flightPathing.graph
+    return (float(graph.cost[edge]) / flightPathing.medianCost * costWeight
+            + float(graph.time[edge]) / flightPathing.medianTime * timeWeight)
+
+
+def pathWeight(flightPathing: FlightMapRouting.FlightPathing, path, costWeight: float, timeWeight: float) -> float:
+    idToIndex = flightPathing.graph.idToIndex
+    return sum(edgeWeight(flightPathing, idToIndex[src], idToIndex[dst], costWeight, timeWeight)
+               for src, dst in zip(path, path[1:]))
+
+
+def referenceDistance(flightPathing: FlightMapRouting.FlightPathing, srcId: int, dstId: int,
+                      costWeight: float, timeWeight: float, bannedIndices=frozenset(), bannedEdges=frozenset()):
+    # textbook Dijkstra straight off the CSR arrays, independent of the
+    # engines and their caches; returns (weight, airport indices) or None
+    graph = flightPathing.graph
+    src, dst = graph.idToIndex[srcId], graph.idToIndex[dstId]
+    offsets, targets = graph.offsets.tolist(), graph.targets.tolist()
+    weights = (graph.cost / flightPathing.medianCost * costWeight
+               + graph.time / flightPathing.medianTime * timeWeight).tolist()
+    distance, parent, heap = {src: 0.0}, {src: -1}, [(0.0, src)]
+    while heap:
+        weight, node = heapq.heappop(heap)
+        if weight > distance[node]:
+            continue
+        if node == dst:
+            path = [dst]
+            while parent[path[-1]] != -1:
+                path.append(parent[path[-1]])
+            return weight, path[::-1]
+        for edge in range(offsets[node], offsets[node + 1]):
+            target = targets[edge]
+            if target in bannedIndices or (node, target) in bannedEdges:
+                continue
+            if weight + weights[edge] < distance.get(target, math.inf):
+                distance[target] = weight + weights[edge]
+                parent[target] = node
+                heapq.heappush(heap, (weight + weights[edge], target))
+    return None
+
+
+def samplePairs(flightPathing, count: int = PAIRS, seed: int = 0) -> list[tuple[int, int]]:
+    rng = random.Random(seed)
+    airportIds = routedAirportIds(flightPathing)
+    return [tuple(rng.sample(airportIds, 2)) for _ in range(count)]
+
+
+def assertOptimal(flightPathing, result, costWeight: float, timeWeight: float):
+    # same weight as a plain Dijkstra; ties may pick a different path
+    reference = referenceDistance(flightPathing, result.srcId, result.dstId, costWeight, timeWeight)
+    if reference is None:
+        assert not result.found, result.algorithm
+        return
+    assert result.found, result.algorithm
+    assert result.path[0] == result.srcId and result.path[-1] == result.dstId
+    assert pathWeight(flightPathing, result.path, costWeight, timeWeight) == pytest.approx(reference[0], rel=1e-9)
+
+
+def name(flightPathing, airportId: int) -> str:
+    return flightPathing.idToAirportMap[airportId].name
@@ -0,0 +1,44 @@
+import pytest
+
+import FlightMapRouting
+from conftest import AIRPORTS_FILE, ROUTES_FILE
+
+
+def testEndpointsAcceptIdsAndCodes(sharedFlightPathing):
+    flightPathing = sharedFlightPathing
+    searchParameter = flightPathing.createSearchParameter(0.5, 0.5)
+    haneda, itami = flightPathing.airports.byIata("HND"), flightPathing.airports.byIata("ITM")
+    byName = flightPathing.query(haneda.name, itami.name, searchParameter)
+    assert byName.found
+    for src, dst in ((haneda.airportId, itami.airportId), ("HND", "ITM"), (haneda.ICAO, itami.ICAO)):
+        assert flightPathing.query(src, dst, searchParameter).path == byName.path
+        assert flightPathing.getShortestPathId(src, dst, searchParameter, "ASTAR") == list(byName.path)
+        assert next(flightPathing.getKShortestPaths(src, dst, searchParameter)) == list(byName.path)
+        assert flightPathing.getEarliestArrival(src, dst) == flightPathing.getEarliestArrival(haneda.name, itami.name)
+        matrix = flightPathing.getDistanceMatrix([src], [dst], searchParameter, processes=1)
+        assert matrix.srcIds == [haneda.airportId] and matrix.dstIds == [itami.airportId]
+
+
+def testUnknownAirportRaises(sharedFlightPathing):
+    searchParameter = sharedFlightPathing.createSearchParameter(0.5, 0.5)
+    with pytest.raises(TypeError):
+        sharedFlightPathing.query("HND", "No Such Airport", searchParameter)
+    with pytest.raises(TypeError):
+        sharedFlightPathing.query(-1, "HND", searchParameter)
+    assert sharedFlightPathing.findAirport("XXXX") is None
+
+
+def testSharedNameRaisesInsteadOfPicking(tmp_path):
+    # a second airport named like Haneda, as "Newcastle Airport" is three airports in OpenFlights
+    airports = tmp_path / "airports.dat"
+    with open(AIRPORTS_FILE, encoding="utf8") as file:
+        rows = file.read()
+    airports.write_text(rows + '99999,"Tokyo Haneda International Airport","Elsewhere","Japan","ZZZ","ZZZZ",'
+                        '10.0,120.0,0,9,"U","Asia/Tokyo","airport","OurAirports"\n', encoding="utf8")
+    flightPathing = FlightMapRouting.FlightPathing(str(airports), ROUTES_FILE, useSnapshot=False)
+    searchParameter = flightPathing.createSearchParameter(0.5, 0.5)
+    with pytest.raises(TypeError, match="2 airports are named"):
+        flightPathing.query("Tokyo Haneda International Airport", "ITM", searchParameter)
+    with pytest.raises(TypeError):
+        flightPathing.getEarliestArrival("Tokyo Haneda International Airport", "ITM")
+    assert flightPathing.query("HND", "ITM", searchParameter).srcId == flightPathing.airports.byIata("HND").airportId
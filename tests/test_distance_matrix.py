@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+
+import FlightMapRouting
+from conftest import AIRPORTS_FILE, ROUTES_FILE, loadFixture, routedAirportIds
+
+
+def matrices(flightPathing, airportIds):
+    searchParameter = flightPathing.createSearchParameter(0.5, 0.5)
+    return [flightPathing.getDistanceMatrix(airportIds, airportIds, searchParameter, processes=processes)
+            for processes in (1, 2)]
+
+
+def assertSameMatrix(serial, parallel):
+    np.testing.assert_allclose(parallel.weight, serial.weight, rtol=1e-12)
+    np.testing.assert_allclose(parallel.cost, serial.cost, rtol=1e-12)
+
+
+def testWorkersFollowRouteUpdates():
+    with loadFixture() as flightPathing:
+        airportIds = routedAirportIds(flightPathing)[:12]
+        assertSameMatrix(*matrices(flightPathing, airportIds))
+        executor, tempFile = flightPathing.matrixPool.executor, flightPathing.matrixPool.tempFile
+        assert os.path.exists(tempFile)  # no snapshot on disk to map
+
+        assertSameMatrix(*matrices(flightPathing, airportIds))
+        assert flightPathing.matrixPool.executor is executor
+
+        flightPathing.setRoute(airportIds[0], airportIds[1], 1.0, 0.1)
+        assertSameMatrix(*matrices(flightPathing, airportIds))
+        assert flightPathing.matrixPool.executor is not executor
+        assert not os.path.exists(tempFile)
+        tempFile = flightPathing.matrixPool.tempFile
+    assert flightPathing.matrixPool.executor is None and not os.path.exists(tempFile)
+
+
+def testWorkersMapTheSnapshotFile(tmp_path):
+    snapshotFile = str(tmp_path / "routes.snapshot")
+    for _ in range(2):  # parsed and written, then read back
+        with FlightMapRouting.FlightPathing(AIRPORTS_FILE, ROUTES_FILE, snapshotFile=snapshotFile) as flightPathing:
+            airportIds = routedAirportIds(flightPathing)[:8]
+            assertSameMatrix(*matrices(flightPathing, airportIds))
+            assert flightPathing.matrixPool.tempFile is None
+            flightPathing.setRoute(airportIds[0], airportIds[1], 1.0, 0.1)  # the snapshot is now stale
+            assertSameMatrix(*matrices(flightPathing, airportIds))
+            assert flightPathing.matrixPool.tempFile is not None
+
@@ -0,0 +1,52 @@
+import pytest
+
+from conftest import ALGORITHMS, WEIGHTINGS, assertOptimal, name, routedAirportIds, samplePairs
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+@pytest.mark.parametrize("costWeight, timeWeight", WEIGHTINGS)
+def testEngineMatchesDijkstra(sharedFlightPathing, algorithm, costWeight, timeWeight):
+    flightPathing = sharedFlightPathing
+    searchParameter = flightPathing.createSearchParameter(costWeight, timeWeight)
+    for srcId, dstId in samplePairs(flightPathing):
+        result = flightPathing.query(name(flightPathing, srcId), name(flightPathing, dstId), searchParameter,
+                                     algorithm)
+        assertOptimal(flightPathing, result, costWeight, timeWeight)
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def testCachedResultMatchesFirstQuery(sharedFlightPathing, algorithm):
+    flightPathing = sharedFlightPathing
+    searchParameter = flightPathing.createSearchParameter(0.5, 0.5)
+    srcId, dstId = samplePairs(flightPathing, 1, seed=7)[0]
+    first = flightPathing.query(name(flightPathing, srcId), name(flightPathing, dstId), searchParameter, algorithm)
+    second = flightPathing.query(name(flightPathing, srcId), name(flightPathing, dstId), searchParameter, algorithm)
+    assert second.cached and second.path == first.path
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def testUnreachableAirport(sharedFlightPathing, algorithm):
+    # airports without any route are loaded but cannot be reached
+    flightPathing = sharedFlightPathing
+    graph = flightPathing.graph
+    isolated = next(int(graph.airportIds[index]) for index in range(graph.getNumAirports())
+                    if graph.getDegree(index) == 0 and flightPathing.reverseGraph.getDegree(index) == 0)
+    srcId = routedAirportIds(flightPathing)[0]
+    result = flightPathing.query(name(flightPathing, srcId), name(flightPathing, isolated),
+                                 flightPathing.createSearchParameter(0.5, 0.5), algorithm)
+    assert not result.found
+
+
+def testAirlineFilterOnlyUsesAllowedCarriers(sharedFlightPathing):
+    flightPathing = sharedFlightPathing
+    airlines = flightPathing.airlineFilter(include=["JL"])
+    searchParameter = flightPathing.createSearchParameter(0.5, 0.5, airlines)
+    found = 0
+    for srcId, dstId in samplePairs(flightPathing):
+        for algorithm in ALGORITHMS:
+            result = flightPathing.query(name(flightPathing, srcId), name(flightPathing, dstId), searchParameter,
+                                         algorithm)
+            for src, dst in zip(result.path, result.path[1:]):
+                assert any(carrier.airline == "JL" for carrier in flightPathing.getRouteCarriers(src, dst))
+            found += result.found
+    assert found > 0
@@ -0,0 +1,62 @@
+import pytest
+
+from conftest import name, pathWeight, referenceDistance, samplePairs
+
+K = 8
+
+
+def naiveYen(flightPathing, srcId: int, dstId: int, k: int, costWeight: float, timeWeight: float) -> list[float]:
+    # Yen's algorithm as published, every spur a fresh Dijkstra; returns the
+    # weights of the k lightest loopless paths
+    graph = flightPathing.graph
+    first = referenceDistance(flightPathing, srcId, dstId, costWeight, timeWeight)
+    if first is None:
+        return []
+    found, candidates = [first[1]], []
+
+    def weight(path: list[int]) -> float:
+        return pathWeight(flightPathing, [int(graph.airportIds[index]) for index in path], costWeight, timeWeight)
+
+    while len(found) < k:
+        previous = found[-1]
+        for i in range(len(previous) - 1):
+            root = previous[:i + 1]
+            bannedEdges = {(path[i], path[i + 1]) for path in found if path[:i + 1] == root}
+            spur = referenceDistance(flightPathing, int(graph.airportIds[previous[i]]), dstId, costWeight,
+                                     timeWeight, frozenset(root[:-1]), frozenset(bannedEdges))
+            if spur is not None:
+                candidate = root[:-1] + spur[1]
+                if candidate not in candidates and candidate not in found:
+                    candidates.append(candidate)
+        if not candidates:
+            break
+        candidates.sort(key=weight)
+        found.append(candidates.pop(0))
+    return [weight(path) for path in found]
+
+
+@pytest.mark.parametrize("costWeight, timeWeight", ((0.5, 0.5), (1.0, 0.0)))
+def testKShortestPathsMatchNaiveYen(sharedFlightPathing, costWeight, timeWeight):
+    flightPathing = sharedFlightPathing
+    searchParameter = flightPathing.createSearchParameter(costWeight, timeWeight)
+    for srcId, dstId in samplePairs(flightPathing, 12, seed=5):
+        paths = list(flightPathing.getKShortestPaths(name(flightPathing, srcId), name(flightPathing, dstId),
+                                                     searchParameter, K))
+        assert len({tuple(path) for path in paths}) == len(paths)
+        for path in paths:
+            assert path[0] == srcId and path[-1] == dstId and len(set(path)) == len(path)
+        weights = [pathWeight(flightPathing, path, costWeight, timeWeight) for path in paths]
+        assert weights == pytest.approx(naiveYen(flightPathing, srcId, dstId, K, costWeight, timeWeight), rel=1e-9)
+
+
+def testKShortestPathsFollowRouteUpdates(flightPathing):
+    searchParameter = flightPathing.createSearchParameter(0.5, 0.5)
+    srcId, dstId = next((src, dst) for src, dst in samplePairs(flightPathing, 40, seed=5)
+                        if referenceDistance(flightPathing, src, dst, 0.5, 0.5) is not None)
+    first = next(flightPathing.getKShortestPaths(name(flightPathing, srcId), name(flightPathing, dstId),
+                                                 searchParameter))
+    flightPathing.removeRoute(first[0], first[1])
+    paths = list(flightPathing.getKShortestPaths(name(flightPathing, srcId), name(flightPathing, dstId),
+                                                 searchParameter, K))
+    weights = [pathWeight(flightPathing, path, 0.5, 0.5) for path in paths]
+    assert weights == pytest.approx(naiveYen(flightPathing, srcId, dstId, K, 0.5, 0.5), rel=1e-9)
@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+import FlightMapRouting
+from conftest import ALGORITHMS, WEIGHTINGS, assertOptimal, name, referenceDistance, samplePairs
+
+UPDATES = ("repriceCheaper", "repriceDearer", "addRoute", "removeRoute", "addAirport", "removeAirport")
+NEW_AIRPORT_ID = 99999
+
+
+def queryAll(flightPathing, pairs) -> None:
+    # every engine and weighting, checked against a plain Dijkstra; also fills the caches
+    for costWeight, timeWeight in WEIGHTINGS:
+        searchParameter = flightPathing.createSearchParameter(costWeight, timeWeight)
+        for srcId, dstId in pairs:
+            if srcId not in flightPathing.airports or dstId not in flightPathing.airports:
+                continue
+            for algorithm in ALGORITHMS:
+                result = flightPathing.query(name(flightPathing, srcId), name(flightPathing, dstId),
+                                             searchParameter, algorithm)
+                assertOptimal(flightPathing, result, costWeight, timeWeight)
+
+
+def multiHopPath(flightPathing, pairs) -> list[int]:
+    # airport ids of the first sampled route with at least one stop
+    graph = flightPathing.graph
+    for srcId, dstId in pairs:
+        reference = referenceDistance(flightPathing, srcId, dstId, 0.5, 0.5)
+        if reference is not None and len(reference[1]) > 2:
+            return [int(graph.airportIds[index]) for index in reference[1]]
+    raise AssertionError("the fixture has no multi-hop route")
+
+
+def applyUpdate(flightPathing, update: str, path: list[int]) -> None:
+    graph = flightPathing.graph
+    src, dst = path[0], path[-1]
+    edge = graph.findEdge(graph.idToIndex[path[0]], graph.idToIndex[path[1]])
+    cost, time = float(graph.cost[edge]), float(graph.time[edge])
+    if update == "repriceCheaper":
+        # a route leaving the origin that the best path does not use
+        srcIndex = graph.idToIndex[src]
+        targets = graph.targets[graph.offsets[srcIndex]:graph.offsets[srcIndex + 1]]
+        other = next(int(graph.airportIds[target]) for target in targets if int(graph.airportIds[target]) != path[1])
+        flightPathing.setRoute(src, other, 1.0, 0.1)
+    elif update == "repriceDearer":
+        flightPathing.setRoute(path[0], path[1], cost * 10, time * 10)
+    elif update == "addRoute":
+        assert graph.findEdge(graph.idToIndex[src], graph.idToIndex[dst]) == -1
+        flightPathing.setRoute(src, dst, 1.0, 0.1)
+    elif update == "removeRoute":
+        assert flightPathing.removeRoute(path[0], path[1])
+    elif update == "addAirport":
+        flightPathing.addAirport(FlightMapRouting.Airport(NEW_AIRPORT_ID, "Test Airport", "Test", "Japan", "TTT",
+                                                          "RJTT", 35.0, 139.0, 0, 9, "U", "Asia/Tokyo", "test"))
+        flightPathing.setRoute(src, NEW_AIRPORT_ID, 1.0, 0.1)
+        flightPathing.setRoute(NEW_AIRPORT_ID, dst, 1.0, 0.1)
+    elif update == "removeAirport":
+        flightPathing.removeAirport(path[1])
+
+
+@pytest.mark.parametrize("update", UPDATES)
+def testEnginesStayCorrectAfterUpdate(flightPathing, update):
+    pairs = samplePairs(flightPathing, 25, seed=3)
+    path = multiHopPath(flightPathing, pairs)
+    pairs.insert(0, (path[0], path[-1]))
+    queryAll(flightPathing, pairs)
+    applyUpdate(flightPathing, update, path)
+    if update == "addAirport":
+        pairs += [(path[0], NEW_AIRPORT_ID), (NEW_AIRPORT_ID, path[-1])]
+    queryAll(flightPathing, pairs)
+
+
+
+def testChQueryDoesNotWaitForRebuild(flightPathing, monkeypatch):
+    # the first CH query after an update is answered while the hierarchy is still being rebuilt
+    pairs = samplePairs(flightPathing, 10, seed=3)
+    path = multiHopPath(flightPathing, pairs)
+    searchParameter = flightPathing.createSearchParameter(0.5, 0.5)
+    src, dst = name(flightPathing, path[0]), name(flightPathing, path[-1])
+    flightPathing.query(src, dst, searchParameter, "CH")
+    release = threading.Event()
+    build = FlightMapRouting.ContractionHierarchy.build
+
+    def slowBuild(*args):
+        assert release.wait(30)
+        return build(*args)
+
+    monkeypatch.setattr(FlightMapRouting.ContractionHierarchy, "build", slowBuild)
+    flightPathing.setRoute(path[0], path[1], 1.0, 0.1)
+    assertOptimal(flightPathing, flightPathing.query(src, dst, searchParameter, "CH"), 0.5, 0.5)
+    assert not flightPathing.ch.hierarchies
+    release.set()
+    assert flightPathing.ch.waitForRebuilds(30)
+    assert (0.5, 0.5) in flightPathing.ch.hierarchies
+    flightPathing.routeCache.invalidate()
+    queryAll(flightPathing, pairs)
@@ -0,0 +1,47 @@
+import random
+import statistics
+
+import numpy as np
+import pytest
+
+import FlightMapRouting
+
+
+@pytest.mark.parametrize("seed", range(5))
+def testMediansFollowAddAndRemove(flightPathing, seed):
+    rng = random.Random(seed)
+    median = FlightMapRouting.MedianCostAndTime(flightPathing.graph)
+    costs, times = flightPathing.graph.cost.tolist(), flightPathing.graph.time.tolist()
+    # shrink to a handful of routes, including the even and odd lengths 1 to 4, then grow again
+    while len(costs) > 1:
+        cost, time = costs.pop(rng.randrange(len(costs))), times.pop(rng.randrange(len(times)))
+        median.remove(cost, time)
+        assert median.getMedianCost() == statistics.median(costs)
+        assert median.getMedianTime() == statistics.median(times)
+    for _ in range(50):
+        cost, time = round(rng.uniform(50, 500), 2), round(rng.uniform(0.5, 12), 2)
+        costs.append(cost)
+        times.append(time)
+        median.add(cost, time)
+        assert median.getMedianCost() == statistics.median(costs)
+        assert median.getMedianTime() == statistics.median(times)
+
+
+def testLoadedMediansAreTheRouteMedians(flightPathing):
+    assert flightPathing.medianCost == statistics.median(flightPathing.graph.cost.tolist())
+    assert flightPathing.medianTime == statistics.median(flightPathing.graph.time.tolist())
+
+
+def testMediansTrackLiveUpdates(flightPathing):
+    rng = random.Random(1)
+    graph = flightPathing.graph
+    for _ in range(40):
+        srcIndex = rng.choice(np.flatnonzero(np.diff(graph.offsets)).tolist())
+        edge = rng.randrange(int(graph.offsets[srcIndex]), int(graph.offsets[srcIndex + 1]))
+        srcId, dstId = int(graph.airportIds[srcIndex]), int(graph.airportIds[graph.targets[edge]])
+        if rng.random() < 0.3:
+            flightPathing.removeRoute(srcId, dstId)
+        else:
+            flightPathing.setRoute(srcId, dstId, float(graph.cost[edge]) * 3, float(graph.time[edge]) * 3)
+        assert flightPathing.median.getMedianCost() == statistics.median(graph.cost.tolist())
+        assert flightPathing.median.getMedianTime() == statistics.median(graph.time.tolist())
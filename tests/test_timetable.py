@@ -0,0 +1,132 @@
+import heapq
+import math
+import random
+
+import pytest
+
+from FlightMapRouting import MINUTES_PER_DAY
+from conftest import name, routedAirportIds
+
+QUERIES = 30
+
+
+def referenceArrival(timetable, srcIndex: int, dstIndex: int, departAfter: int, allowed=None,
+                     departBefore: float = math.inf) -> float:
+    # Time-dependent Dijkstra on arrival time: from an airport reached at time
+    # t, every flight leaving at or after t plus its minimum connection time
+    # (no connection time at the origin, where flights must also leave before
+    # departBefore) can be taken. Returns inf when the timetable has no journey.
+    outgoing = {}
+    for connection in range(len(timetable)):
+        if allowed is None or allowed[connection]:
+            outgoing.setdefault(int(timetable.depStop[connection]), []).append(connection)
+    arrival, heap = {srcIndex: departAfter}, [(departAfter, srcIndex)]
+    while heap:
+        time, stop = heapq.heappop(heap)
+        if time > arrival[stop]:
+            continue
+        if stop == dstIndex:
+            return time
+        ready = time if stop == srcIndex else time + int(timetable.minConnection[stop])
+        for connection in outgoing.get(stop, ()):
+            if stop == srcIndex and timetable.depTime[connection] >= departBefore:
+                continue
+            target, landing = int(timetable.arrStop[connection]), int(timetable.arrTime[connection])
+            if timetable.depTime[connection] >= ready and landing < arrival.get(target, math.inf):
+                arrival[target] = landing
+                heapq.heappush(heap, (landing, target))
+    return math.inf
+
+
+def assertFeasible(flightPathing, timetable, journey, srcId: int, dstId: int, departAfter: int):
+    assert journey[0].srcId == srcId and journey[-1].dstId == dstId and journey[0].departure >= departAfter
+    for landed, onward in zip(journey, journey[1:]):
+        stop = flightPathing.graph.idToIndex[landed.dstId]
+        assert onward.srcId == landed.dstId
+        assert onward.departure >= landed.arrival + timetable.minConnection[stop]
+
+
+def samples(flightPathing, count: int = QUERIES, seed: int = 2):
+    rng = random.Random(seed)
+    airportIds = routedAirportIds(flightPathing)
+    return [(*rng.sample(airportIds, 2), rng.randrange(0, MINUTES_PER_DAY)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("filtered", (False, True))
+def testEarliestArrivalMatchesTimeDependentDijkstra(sharedFlightPathing, filtered):
+    flightPathing = sharedFlightPathing
+    timetable = flightPathing.getTimetable()
+    airlines = flightPathing.airlineFilter(include=["JL", "NH"]) if filtered else None
+    allowed = timetable.allowedConnections(airlines) if filtered else None
+    idToIndex = flightPathing.graph.idToIndex
+    found = 0
+    for srcId, dstId, departAfter in samples(flightPathing):
+        journey = flightPathing.getEarliestArrival(name(flightPathing, srcId), name(flightPathing, dstId),
+                                                   departAfter, airlines)
+        expected = referenceArrival(timetable, idToIndex[srcId], idToIndex[dstId], departAfter, allowed)
+        if journey is None:
+            assert expected == math.inf
+            continue
+        assertFeasible(flightPathing, timetable, journey, srcId, dstId, departAfter)
+        assert journey[-1].arrival == expected
+        found += 1
+    assert found > 0
+
+
+def testLongerMinimumConnectionIsRespected(flightPathing):
+    timetable = flightPathing.getTimetable()
+    idToIndex = flightPathing.graph.idToIndex
+    for index in range(len(timetable.minConnection)):
+        timetable.setMinConnection(index, 120)
+    for srcId, dstId, departAfter in samples(flightPathing, 15):
+        journey = flightPathing.getEarliestArrival(name(flightPathing, srcId), name(flightPathing, dstId),
+                                                   departAfter)
+        expected = referenceArrival(timetable, idToIndex[srcId], idToIndex[dstId], departAfter)
+        assert (journey[-1].arrival if journey else math.inf) == expected
+        if journey:
+            assertFeasible(flightPathing, timetable, journey, srcId, dstId, departAfter)
+
+
+def testProfileJourneysAreEarliestAndNotDominated(sharedFlightPathing):
+    # the profile covers departures up to the end of the first day
+    flightPathing = sharedFlightPathing
+    timetable = flightPathing.getTimetable()
+    idToIndex = flightPathing.graph.idToIndex
+    for srcId, dstId, _ in samples(flightPathing, 10, seed=4):
+        journeys = flightPathing.getProfile(name(flightPathing, srcId), name(flightPathing, dstId))
+        for journey in journeys:
+            assertFeasible(flightPathing, timetable, journey, srcId, dstId, 0)
+            assert journey[-1].arrival == referenceArrival(timetable, idToIndex[srcId], idToIndex[dstId],
+                                                           journey[0].departure, departBefore=MINUTES_PER_DAY)
+        departures = [journey[0].departure for journey in journeys]
+        arrivals = [journey[-1].arrival for journey in journeys]
+        assert departures == sorted(set(departures))
+        assert all(earlier < later for earlier, later in zip(arrivals, arrivals[1:]))
+
+
+def testTimetableFollowsRouteRemoval(flightPathing):
+    srcId, dstId, departAfter = next(sample for sample in samples(flightPathing)
+                                     if flightPathing.getEarliestArrival(name(flightPathing, sample[0]),
+                                                                         name(flightPathing, sample[1]), sample[2]))
+    journey = flightPathing.getEarliestArrival(name(flightPathing, srcId), name(flightPathing, dstId), departAfter)
+    flightPathing.removeRoute(journey[0].srcId, journey[0].dstId)
+    timetable = flightPathing.getTimetable()
+    idToIndex = flightPathing.graph.idToIndex
+    journey = flightPathing.getEarliestArrival(name(flightPathing, srcId), name(flightPathing, dstId), departAfter)
+    expected = referenceArrival(timetable, idToIndex[srcId], idToIndex[dstId], departAfter)
+    assert (journey[-1].arrival if journey else math.inf) == expected
+
+
+def testScheduleLoadedAfterAirportRemoval(flightPathing, tmp_path):
+    # a removed airport keeps its graph index, so the timetable must still cover every index
+    airportIds = routedAirportIds(flightPathing)
+    flightPathing.removeAirport(airportIds[0])
+    graph = flightPathing.graph
+    srcId, dstId = airportIds[1], int(graph.airportIds[graph.getNumAirports() - 1])
+    schedule = tmp_path / "schedule.csv"
+    schedule.write_text(f"{srcId},{dstId},08:00,09:30,JL\n", encoding="utf8")
+    timetable = flightPathing.loadTimetable(str(schedule))
+    assert len(timetable.minConnection) == graph.getNumAirports()
+    journey = flightPathing.getEarliestArrival(name(flightPathing, srcId), name(flightPathing, dstId), 0)
+    assert [(connection.srcId, connection.dstId, connection.departure, connection.arrival)
+            for connection in journey] == [(srcId, dstId, 8 * 60, 9 * 60 + 30)]
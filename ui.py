@@ -2,8 +2,9 @@ import customtkinter
 from CTkMessagebox import CTkMessagebox
 from tkintermapview import TkinterMapView
 import FlightMapRouting
-from ttkwidgets.autocomplete import AutocompleteCombobox
 from collections import deque
+import tkinter as tk
+from tkinter import ttk
 
 import requests
 import random
@@ -11,6 +12,85 @@ import random
 # https://github.com/TomSchimansky/TkinterMapView?tab=readme-ov-file#create-path-from-position-list
 
 customtkinter.set_default_color_theme("blue")
+
+
+class AirportCombobox(ttk.Combobox):
+    """Combobox that completes airport names from FlightPathing's airport search index.
+
+    The typed text is looked up by name, city, IATA or ICAO code, with typo
+    tolerance, and the hits are listed busiest first in the dropdown.
+
+    Args:
+        master: The parent widget.
+        flight_pathing (FlightMapRouting.FlightPathing): Source of the airport search index.
+        completevalues (list[str]): Values listed while nothing typed has a hit.
+        **kwargs: Keyword arguments passed to ttk.Combobox.
+    """
+
+    def __init__(self, master, flight_pathing: FlightMapRouting.FlightPathing, completevalues=(), **kwargs):
+        self.flight_pathing = flight_pathing
+        self.completevalues = list(completevalues)
+        self.hits = []
+        self.hit_index = 0
+        self.position = 0  # end of the typed text; anything after it is the completion
+        super().__init__(master, values=self.completevalues, **kwargs)
+        self.bind("<KeyRelease>", self.handle_keyrelease)
+
+    def autocomplete(self, delta=0):
+        """
+        Autocomplete the typed text with the best matching airport name.
+
+        The name is only completed inline when it starts with the typed text,
+        e.g. not for a city or IATA code match; every hit is still listed in
+        the dropdown.
+
+        Args:
+            delta (int): 0, 1 or -1: how to cycle through the hits.
+        """
+        if delta:  # drop the completion, otherwise it would become part of the typed text
+            self.delete(self.position, tk.END)
+        else:  # the typed text ends where the entry ends
+            self.position = len(self.get())
+        typed = self.get()
+        hits = list(dict.fromkeys(airport.name for airport in self.flight_pathing.searchAirports(typed)))
+        if hits != self.hits:
+            self.hit_index = 0
+            self.hits = hits
+            self.configure(values=hits or self.completevalues)
+        if self.hits:
+            self.hit_index = (self.hit_index + delta) % len(self.hits)
+            hit = self.hits[self.hit_index]
+            if hit.lower().startswith(typed.lower()):
+                self.delete(0, tk.END)
+                self.insert(0, hit)
+                self.select_range(self.position, tk.END)
+
+    def handle_keyrelease(self, event):
+        """
+        Complete after each typed character and keep the completion editable.
+
+        Backspace and Left remove the completed part, Right and Return accept it.
+
+        Args:
+            event (tk.Event): The key release event.
+        """
+        if event.keysym == "BackSpace":
+            self.delete(self.index(tk.INSERT), tk.END)
+            self.position = self.index(tk.END)
+        elif event.keysym == "Left":
+            if self.position < self.index(tk.END):  # remove the completion
+                self.delete(self.position, tk.END)
+            else:  # remove the last typed character
+                self.position = max(self.position - 1, 0)
+                self.delete(self.position, tk.END)
+        elif event.keysym in ("Right", "Return"):
+            self.position = self.index(tk.END)
+            self.icursor(tk.END)
+            self.selection_clear()
+        elif len(event.char) == 1 and event.char.isprintable():
+            self.autocomplete()
+
+
 class App(customtkinter.CTk):
     """Docstring for App.
 
@@ -102,8 +182,8 @@ class App(customtkinter.CTk):
 
         self.getAirports()
         self.source_name = customtkinter.StringVar()
-        self.source_combobox = AutocompleteCombobox(
-            self.frame_right, completevalues=self.airport_list, width=20, height=5, textvariable=self.source_name)
+        self.source_combobox = AirportCombobox(
+            self.frame_right, self.flight_pathing, completevalues=self.airport_list, width=20, height=5, textvariable=self.source_name)
         self.source_combobox.grid(
             column=0, row=2, sticky="EW", padx=5, pady=5, columnspan=2)
 
@@ -113,13 +193,13 @@ class App(customtkinter.CTk):
             column=0, row=3, sticky="EW", padx=5, pady=5, columnspan=2)
 
         self.destination_name = customtkinter.StringVar()
-        self.destination_combobox = AutocompleteCombobox(
-            self.frame_right, completevalues=self.airport_list, width=20, height=5, textvariable=self.destination_name)
+        self.destination_combobox = AirportCombobox(
+            self.frame_right, self.flight_pathing, completevalues=self.airport_list, width=20, height=5, textvariable=self.destination_name)
         self.destination_combobox.grid(
             column=0, row=4, sticky="EW", padx=5, pady=5, columnspan=2)
 
         self.alternate_path_trip_switch = customtkinter.CTkSwitch(self.frame_right,
-                                                                  text="Alternate Path (Only for Dijkstra)", progress_color="red", corner_radius=0, width=10, height=2)
+                                                                  text="Alternate Path (Only for Dijkstra variants)", progress_color="red", corner_radius=0, width=10, height=2)
 
         self.alternate_path_trip_switch.grid(
             column=0, row=5, sticky="EW", padx=5, pady=5)
@@ -184,8 +264,8 @@ class App(customtkinter.CTk):
 
         self.algorthim_selection = customtkinter.StringVar()
         self.algor_dropDownList = customtkinter.CTkComboBox(self.radio_frame, corner_radius=0, fg_color=None, values=[
-                                                            "Astar", "Bellman-Ford", "Dijkstra"], variable=self.algorthim_selection, cursor="hand2", state="readonly")
-        self.algorthim_selection.set("Astar")
+                                                            "Astar", "Bellman-Ford", "Dijkstra", "Bidirectional-Dijkstra", "Pareto"], variable=self.algorthim_selection, cursor="hand2", state="readonly")
+        self.algorthim_selection.set("Bidirectional-Dijkstra")
         self.algor_dropDownList.grid(
             column=0, row=5, sticky="EW", padx=5, pady=10, columnspan=2)
 
@@ -194,11 +274,13 @@ class App(customtkinter.CTk):
         self.search_button.grid(
             column=0, row=7, sticky="EW", padx=5, pady=5, columnspan=2)
 
-        self.airport_list = []
         self.airport_route = []
         self.airport_deque = deque()
         self.total_cost_deque = deque()
         self.total_time_deque = deque()
+        self.route_stream = None
+        self.route_stream_job = None
+        self.route_list_frame = None
         self.toplevel_window = None
 
     def ratio_calculator(self):
@@ -219,13 +301,12 @@ class App(customtkinter.CTk):
 
     def getAirports(self):
         """
-        Retrieves a sorted list of airport names.
+        Retrieves a sorted list of airport names, once at start-up.
 
         Returns:
             list: A sorted list of airport names.
         """
-        self.airport_list = sorted(
-            [airport.name for airport in self.flight_pathing.idToAirportMap.values()])    # temp class
+        self.airport_list = sorted(self.flight_pathing.airportToIdMap)
 
     def search(self):
         """
@@ -241,12 +322,10 @@ class App(customtkinter.CTk):
         self.map_widget.delete_all_path()
         self.map_widget.delete_all_marker()
 
-        airport_alt_route_string = None
         self.airport_route = []
         source = self.source_name.get()
         destination = self.destination_name.get()
 
-        self.getAirports()
         print(source, destination)
 
         if not source or not destination:
@@ -255,8 +334,10 @@ class App(customtkinter.CTk):
             # return
             # for random testing purposes
             random.seed()
-            source = random.choice(self.airport_list)
-            destination = random.choice(self.airport_list)
+            # by id, since a random name may be shared by several airports
+            airport_ids = list(self.flight_pathing.idToAirportMap)
+            source = random.choice(airport_ids)
+            destination = random.choice(airport_ids)
         # elif not self.selected_radiobox.get():
         #     CTkMessagebox(title="Error", message="Please select a preference")
         #     return
@@ -264,17 +345,26 @@ class App(customtkinter.CTk):
             CTkMessagebox(
                 title="Error", message="Source and destination cannot be the same")
             return
-        elif source not in self.airport_list or destination not in self.airport_list:
-            CTkMessagebox(
-                title="Error", message="Invalid source or destination")
-            return
-
-        if (self.algorthim_selection.get() == "Dijkstra" and self.alternate_path_trip_switch.get() == 1):
-            airport_alt_route_string = self.flight_pathing.getAlternativePath(
+        else:
+            # a name several airports share raises; the message asks for a code
+            try:
+                airports = (self.flight_pathing.findAirport(source),
+                            self.flight_pathing.findAirport(destination))
+            except TypeError as error:
+                CTkMessagebox(title="Error", message=str(error))
+                return
+            if None in airports:
+                CTkMessagebox(
+                    title="Error", message="Invalid source or destination")
+                return
+
+        is_dijkstra = self.algorthim_selection.get() in ("Dijkstra", "Bidirectional-Dijkstra")
+        if (is_dijkstra and self.alternate_path_trip_switch.get() == 1):
+            route_ids = self.flight_pathing.getAlternativePathId(
                 source, destination, self.get_slider_value())
-            self.airport_route = self.retrieve_airport(
-                airport_alt_route_string)
-        elif (self.algorthim_selection.get() != "Dijkstra" and self.alternate_path_trip_switch.get() == 1):
+            self.airport_route = [self.flight_pathing.idToAirportMap[airport_id]
+                                  for airport_id in route_ids or ()]
+        elif (not is_dijkstra and self.alternate_path_trip_switch.get() == 1):
             CTkMessagebox(
                 title="Error", message="Alternate path only available for Dijkstra")
             return
@@ -286,47 +376,43 @@ class App(customtkinter.CTk):
             CTkMessagebox(
                 title="Error", message="No routes found")
             return
-        self.airport_deque.append(self.airport_route)
-
-        match self.algorthim_selection.get():
-            case "Astar":
-                self.total_cost_deque.append(self.total_cost(
-                    self.flight_pathing.astar.shortestPath))
-                self.total_time_deque.append(self.total_time(
-                    self.flight_pathing.astar.shortestPath))
-            case "Bellman-Ford":
-                self.total_cost_deque.append(self.total_cost(
-                    self.flight_pathing.bellmanford.shortestPath))
-                self.total_time_deque.append(self.total_time(
-                    self.flight_pathing.bellmanford.shortestPath))
-            case "Dijkstra":
-                self.total_cost_deque.append(self.total_cost(
-                    self.flight_pathing.dijkstra.getShortestPath(self.flight_pathing.airportToIdMap.get(source).airportId, self.flight_pathing.airportToIdMap.get(destination).airportId, self.get_slider_value())))
-                self.total_time_deque.append(self.total_time(
-                    self.flight_pathing.dijkstra.shortestPath))
-
-        if len(self.airport_deque) > 5:
-            self.airport_deque.popleft()
-            self.total_time_deque.popleft()
-            self.total_cost_deque.popleft()
+        # the route found above comes first, then the lightest other routes
+        # between the two airports, each listed as soon as it is found
+        if self.route_stream_job is not None:
+            self.after_cancel(self.route_stream_job)
+            self.route_stream_job = None
+        self.airport_deque.clear()
+        self.total_cost_deque.clear()
+        self.total_time_deque.clear()
+        self.route_stream = self.flight_pathing.getKShortestPaths(
+            source, destination, self.get_slider_value())
 
         print(self.airport_route)
         self.displayFlightResults()
+        self.displayPossibleRoute(self.airport_route)
+        self.route_stream_job = self.after(1, self.streamPossibleRoutes)
 
-    def retrieve_airport(self, airport_name: list[str]) -> list[FlightMapRouting.Airport]:
+    def streamPossibleRoutes(self):
         """
-        Retrieves a list of Airport objects based on the given airport names.
+        Lists the next alternative route, then schedules itself for the one after.
 
-        Args:
-            airport_name (list[str]): A list of airport names.
+        Each call searches for a single route, so the window stays responsive
+        while the list fills up. Stops after FlightMapRouting.POSSIBLE_ROUTE_COUNT
+        routes or when there are no more.
 
         Returns:
-            list[FlightMapRouting.Airport]: A list of Airport objects corresponding to the given airport names.
+            None
         """
-        airport_list = []
-        for name in airport_name:
-            airport_list.append(self.flight_pathing.airportToIdMap[name])
-        return airport_list
+        self.route_stream_job = None
+        shown = [[airport.airportId for airport in route] for route in self.airport_deque]
+        for route_ids in self.route_stream:
+            if route_ids in shown:
+                continue
+            self.displayPossibleRoute(
+                [self.flight_pathing.idToAirportMap[airport_id] for airport_id in route_ids])
+            if len(self.airport_deque) < FlightMapRouting.POSSIBLE_ROUTE_COUNT:
+                self.route_stream_job = self.after(1, self.streamPossibleRoutes)
+            return
 
     def get_slider_value(self) -> FlightMapRouting.SearchParameter:
         """
@@ -365,10 +451,9 @@ class App(customtkinter.CTk):
 
     def displayFlightResults(self):
         """
-        Displays the flight results on the UI.
+        Displays an empty "Possible routes" list on the UI, replacing the previous one.
 
-        Args:
-            airportList (list[FlightMapRouting.Airport]): A list of airports representing the flight route.
+        Routes are added to it one at a time by displayPossibleRoute.
 
         Returns:
             None
@@ -377,65 +462,59 @@ class App(customtkinter.CTk):
             self.frame_bottom, text="Possible routes", font=("Helvetica", 20))
         self.flight_info.grid(column=0, row=0, sticky="EW", padx=5, pady=5)
 
+        if self.route_list_frame is not None:
+            self.route_list_frame.destroy()
         self.route_list_frame = customtkinter.CTkScrollableFrame(
             self.frame_bottom, corner_radius=0)
         self.route_list_frame.grid(
             column=0, row=1, sticky="EW", padx=5, pady=5)
         self.route_list_frame.grid_columnconfigure(0, weight=1)
         self.route_list_frame.grid_columnconfigure(1, weight=7)
-        self.route_list_frame.grid_rowconfigure(0, weight=2)
-        self.route_list_frame.grid_rowconfigure(1, weight=2)
-        self.route_list_frame.grid_rowconfigure(2, weight=2)
-        self.route_list_frame.grid_rowconfigure(3, weight=2)
-        self.route_list_frame.grid_rowconfigure(4, weight=2)
-
-        # self.route_number = customtkinter.CTkLabel(
-        #     self.route_list_frame, text=f"Route {0+1}")
-        # self.route_number.grid(
-        #     column=0, row=0, sticky="EW", padx=5, pady=5, rowspan=2)
-
-        # self.route_frame = customtkinter.CTkFrame(
-        #     self.route_list_frame, corner_radius=0)
-        # self.route_frame.grid(column=1, row=0, sticky="EW",
-        #                       padx=5, pady=5, rowspan=2)
-        # self.route_frame.grid_columnconfigure(0, weight=6)
-        # self.route_frame.grid_columnconfigure(1, weight=1)
-
-        # airport_names = ' -> '.join([airport.name for airport in airportList])
-        # self.route_list = customtkinter.CTkLabel(
-        #     self.route_frame, text=airport_names  )
-        # self.route_list.grid(column=0, row=0, sticky="EW", padx=15, pady=5)
-        # self.more_details_button = customtkinter.CTkButton(
-        #     self.route_frame, text="More details", command=lambda: self.displayRouteDetails(airportList), cursor="hand2")
-        # self.more_details_button.grid(
-        #     column=1, row=0, sticky="EW", padx=5, pady=5)
-
-        for index, airportList in enumerate(reversed(self.airport_deque)):
-            countdown_index = len(self.airport_deque) - 1 - index
-            self.route_number = customtkinter.CTkLabel(
-                self.route_list_frame, text=f"Route {countdown_index+1}")
-            self.route_number.grid(
-                column=0, row=index, sticky="EW", padx=5, pady=5)
-
-            self.route_frame = customtkinter.CTkFrame(
-                self.route_list_frame, corner_radius=0)
-            self.route_frame.grid(column=1, row=index, sticky="EW",
-                                  padx=5, pady=15)
-            self.route_frame.grid_columnconfigure(0, weight=6)
-            self.route_frame.grid_columnconfigure(1, weight=1)
-
-            airport_names = ' -> '.join(
-                [Airport.name for Airport in airportList])
-            self.route_list = customtkinter.CTkLabel(
-                self.route_frame, text=airport_names)
-            self.route_list.grid(column=0, row=0, sticky="E", padx=15, pady=5)
-            self.more_details_button = customtkinter.CTkButton(
-                self.route_frame, text="More details",
-                command=(lambda a=airportList,
-                         index=countdown_index: self.displayRouteDetails(a, index)),
-                cursor="hand2")
-            self.more_details_button.grid(
-                column=1, row=0, sticky="E", padx=5, pady=5)
+        for row in range(FlightMapRouting.POSSIBLE_ROUTE_COUNT):
+            self.route_list_frame.grid_rowconfigure(row, weight=2)
+
+    def displayPossibleRoute(self, airportList: list[FlightMapRouting.Airport]):
+        """
+        Adds a route to the bottom of the "Possible routes" list.
+
+        Args:
+            airportList (list[FlightMapRouting.Airport]): A list of airports representing the flight route.
+
+        Returns:
+            None
+        """
+        self.airport_deque.append(airportList)
+        # totals come from the route itself, the engines may not have run at all
+        # when the route came from the cache
+        route_ids = [airport.airportId for airport in airportList]
+        self.total_cost_deque.append(self.total_cost(route_ids))
+        self.total_time_deque.append(self.total_time(route_ids))
+        index = len(self.airport_deque) - 1
+
+        self.route_number = customtkinter.CTkLabel(
+            self.route_list_frame, text=f"Route {index+1}")
+        self.route_number.grid(
+            column=0, row=index, sticky="EW", padx=5, pady=5)
+
+        self.route_frame = customtkinter.CTkFrame(
+            self.route_list_frame, corner_radius=0)
+        self.route_frame.grid(column=1, row=index, sticky="EW",
+                              padx=5, pady=15)
+        self.route_frame.grid_columnconfigure(0, weight=6)
+        self.route_frame.grid_columnconfigure(1, weight=1)
+
+        airport_names = ' -> '.join(
+            [Airport.name for Airport in airportList])
+        self.route_list = customtkinter.CTkLabel(
+            self.route_frame, text=airport_names)
+        self.route_list.grid(column=0, row=0, sticky="E", padx=15, pady=5)
+        self.more_details_button = customtkinter.CTkButton(
+            self.route_frame, text="More details",
+            command=(lambda a=airportList,
+                     index=index: self.displayRouteDetails(a, index)),
+            cursor="hand2")
+        self.more_details_button.grid(
+            column=1, row=0, sticky="E", padx=5, pady=5)
 
         # for index, airport in enumerate(airportList):
 